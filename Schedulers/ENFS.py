@@ -3,7 +3,13 @@
 import numpy as np
 import random
 import copy
-import csv
+from sim_trace import open_trace, TRACE_EVENTS
+from timeline import Timeline
+from phase_timer import ARRIVAL, SORT, ASSIGN, EXECUTE, LOGGING
+from op_counters import MODEL
+from online_metrics import StreamingMetrics
+from quantile_sketch import PrioritySketches
+from results_store import ResultsWriter
 
 
 CONTEXT_SWITCH_TIME = 1  # in clock cycles
@@ -178,9 +184,12 @@ def nsga2(tasksets, pop_size=20, generations=30, num_cores=NUM_CORES):
 
 # --- Emergency Criterion and Ready List ---
 
-def sort_ready_list_by_emergency(ready_list, app_deadline):
+def sort_ready_list_by_emergency(ready_list, app_deadline, counters=None):
     # Lower (DApp - WCET) is more urgent
-    return sorted(ready_list, key=lambda t: app_deadline - t.burst_time)
+    key = lambda t: app_deadline - t.burst_time
+    if counters:
+        key = counters.sorted_key(key, len(ready_list))
+    return sorted(ready_list, key=key)
 
 # --- Simulation and Evaluation ---
 
@@ -256,26 +265,60 @@ def evaluate_fnn_on_tasksets(tasksets, fnn, num_cores=NUM_CORES):
 
 
 
-def enf_s_simulation(tasksets, fnn, num_cores=NUM_CORES, simulation_time=120):
-    grand_total_deadline_misses = 0
+def select_task(sorted_ready, scheduled, fnn, core_id, time, busy_time, num_cores):
+    """The unscheduled ready task with the lowest FNN score for core `core_id`, or None."""
+    best_task = None
+    best_score = float('inf')
+    for task in sorted_ready:
+        if task.id in scheduled:
+            continue
+        core_util = 0 if time == 0 else busy_time / (time * num_cores)
+        prio_norm = task.priority / 3
+        tightness = max(0.0, min(1.0, (task.deadline - (time + task.burst_time)) / max(1, task.deadline)))
+        dummy_core = Core(core_id)
+        dummy_core.total_busy_time = busy_time
+        dummy_core.available_time = time
+        reliability = calc_reliability(dummy_core)
+        mtbf = calc_mtbf(dummy_core)
+        score = fnn.evaluate(core_util, prio_norm, tightness, reliability, mtbf)
+        if score < best_score:
+            best_score = score
+            best_task = task
+    return best_task
+
+
+def simulate(tasksets, fnn, num_cores=NUM_CORES, simulation_time=120, trace=None, timeline_file=None, verbose=True,
+             timer=None, counters=None, sketches=None):
+    """Run ENF-S over every taskset; returns (summary_log, missed_priorities_log).
+
+    Event-driven: each scheduling step counts as one tick for `timer` and `counters`, and the
+    taskset deep copy is charged to the first step's arrival phase.
+    """
     summary_log = []
     missed_priorities_log = []
+    if counters:
+        counters.watch(fnn, 'evaluate', MODEL)
     taskset_id = -1
 
     for taskset_ in tasksets:
         taskset_id += 1
-        completed_tasks = []
         missed_priorities = []
-        deadline_miss_times = []
-        busy_time = 0
+        metrics = StreamingMetrics(sketches)  # misses, busy cycles, makespan, WCRT and response times
         taskset_size = len(taskset_)
         cores = [Core(i) for i in range(num_cores)]
         core_tasks = [None] * num_cores
         time = 0
+        if timer:
+            timer.start()
         tasks = copy.deepcopy(taskset_)
         completed_ids = set()
         scheduled = set()
-        print(f"\n🔵 ENF-S: Taskset #{taskset_id}\nt  1  |  2\n------|---")
+        if verbose:
+            print(f"\n🔵 ENF-S: Taskset #{taskset_id}")
+        if trace:
+            # Event-driven: no fixed tick horizon for the renderer's core table
+            trace.taskset(taskset_id, taskset_size, num_cores)
+        timeline = Timeline(num_cores) if timeline_file else None
         app_deadline = max(t.deadline for t in tasks)
         while len(completed_ids) < len(tasks):
             ready_list = [t for t in tasks if t.id not in scheduled and t.arrival_time <= time]
@@ -287,26 +330,15 @@ def enf_s_simulation(tasksets, fnn, num_cores=NUM_CORES, simulation_time=120):
                     break
                 time = min(candidates)
                 continue
-            sorted_ready = sort_ready_list_by_emergency(ready_list, app_deadline)
+            if timer:
+                timer.lap(ARRIVAL)
+            sorted_ready = sort_ready_list_by_emergency(ready_list, app_deadline, counters)
+            if timer:
+                timer.lap(SORT)
             for core_id in range(num_cores):
                 if (core_tasks[core_id] is None or time >= getattr(core_tasks[core_id], 'finish_time', 0)) and sorted_ready:
-                    best_task = None
-                    best_score = float('inf')
-                    for task in sorted_ready:
-                        if task.id in scheduled:
-                            continue
-                        core_util = 0 if time == 0 else busy_time / (time * num_cores)
-                        prio_norm = task.priority / 3
-                        tightness = max(0.0, min(1.0, (task.deadline - (time + task.burst_time)) / max(1, task.deadline)))
-                        dummy_core = Core(core_id)
-                        dummy_core.total_busy_time = busy_time
-                        dummy_core.available_time = time
-                        reliability = calc_reliability(dummy_core)
-                        mtbf = calc_mtbf(dummy_core)
-                        score = fnn.evaluate(core_util, prio_norm, tightness, reliability, mtbf)
-                        if score < best_score:
-                            best_score = score
-                            best_task = task
+                    best_task = select_task(sorted_ready, scheduled, fnn, core_id, time, metrics.busy_time,
+                                            num_cores)
                     if best_task:
                         best_task.start_time = time + CONTEXT_SWITCH_TIME
                         best_task.finish_time = best_task.start_time + best_task.burst_time
@@ -314,8 +346,14 @@ def enf_s_simulation(tasksets, fnn, num_cores=NUM_CORES, simulation_time=120):
                         core_tasks[core_id] = best_task
                         cores[core_id].available_time = best_task.finish_time
                         cores[core_id].total_busy_time += best_task.burst_time
-                        busy_time += best_task.burst_time
+                        metrics.busy(best_task.burst_time)
                         scheduled.add(best_task.id)
+                        if trace:
+                            trace.dispatch(time, core_id, best_task)
+                        if timeline is not None:
+                            best_task.segment = timeline.add(core_id, best_task.id, time, best_task.finish_time)
+            if timer:
+                timer.lap(ASSIGN)
             next_times = [cores[i].available_time for i in range(num_cores) if cores[i].available_time > time]
             next_task_arrivals = [t.arrival_time for t in tasks if t.id not in scheduled and t.arrival_time > time]
             candidates = next_times + next_task_arrivals
@@ -325,72 +363,101 @@ def enf_s_simulation(tasksets, fnn, num_cores=NUM_CORES, simulation_time=120):
             for core_id in range(num_cores):
                 task = core_tasks[core_id]
                 if task and task.finish_time == time:
-                    completed_tasks.append(task)
+                    metrics.complete(task, task.finish_time)
                     completed_ids.add(task.id)
+                    if timeline is not None:
+                        timeline.complete(task.segment, task.finish_time)
+                    if trace:
+                        trace.complete(time, core_id, task)
                     if task.finish_time > task.deadline:
+                        metrics.miss()
                         missed_priorities.append(getattr(task, 'priority', 'N/A'))
-                        deadline_miss_times.append(time)
                     core_tasks[core_id] = None
-            core_status = [str(core_tasks[i].id) if core_tasks[i] else "-" for i in range(num_cores)]
-            print(f"{time}  {core_status[0]}  |  {core_status[1]}")
+            if timer:
+                timer.lap(EXECUTE)
+                timer.tick()
+            if counters:
+                counters.tick()
         for task in tasks:
             if task.id not in completed_ids:
+                metrics.miss()
                 missed_priorities.append(getattr(task, 'priority', 'N/A'))
-                deadline_miss_times.append(time)
-                print(f"⚠️ Task {task.id} did not complete and missed deadline.")
-        deadline_misses = len(missed_priorities)
-        # Calculate makespan as the maximum finish_time among all completed tasks
-        if completed_tasks:
-            makespan = max(t.finish_time for t in completed_tasks)
-        else:
-            makespan = 0
-        taskset_utilization = (busy_time / (simulation_time * num_cores)) * 100
-        print(f"\n💥 Total Deadline Misses: {deadline_misses}")
-        print(f"⏱️ Makespan: {makespan} cycles")
-        print(f"⚡ CPU Utilization for this taskset: {taskset_utilization:.2f}%")
-        grand_total_deadline_misses += deadline_misses
+                if trace:
+                    trace.miss(time, task, getattr(task, 'priority', -1))
+        if timeline is not None:
+            timeline.write(timeline_file, taskset_id)
+        # Makespan is the latest finish_time among completed tasks
+        makespan = metrics.makespan
+        taskset_utilization = metrics.utilization(simulation_time, num_cores)
+        if verbose:
+            print(f"\n💥 Total Deadline Misses: {metrics.misses}")
+            print(f"⏱️ Makespan: {makespan} cycles")
+            print(f"⚡ CPU Utilization for this taskset: {taskset_utilization:.2f}%")
         summary_log.append([
             taskset_id,
             taskset_size,
             0,
-            deadline_misses,
+            metrics.misses,
             0,
             f"{taskset_utilization:.2f}",
-            makespan
+            makespan,
+            metrics.wcrt,
+            metrics.mean_response,
+            metrics.response_std,
         ])
         missed_priorities_log.append((taskset_id, missed_priorities))
+        if timer:
+            timer.lap(LOGGING)
+        if counters:
+            counters.end_taskset(taskset_id)
+
+    if counters:
+        counters.unwatch()
+    return summary_log, missed_priorities_log
+
+
+def enf_s_simulation(tasksets, fnn, num_cores=NUM_CORES, simulation_time=120, trace=None, timeline_file=None,
+                     results_db=None):
+    sketches = PrioritySketches()
+    summary_log, missed_priorities_log = simulate(tasksets, fnn, num_cores, simulation_time, trace, timeline_file,
+                                                  sketches=sketches)
+    taskset_utilization = float(summary_log[-1][5]) if summary_log else 0
 
     print("\n🚀 Final Grand Totals for ENF-S:")
-    print(f"💥 Grand Total Deadline Misses: {grand_total_deadline_misses}")
+    print(f"💥 Grand Total Deadline Misses: {sum(row[3] for row in summary_log)}")
     print(f"⚡ Overall CPU Utilization: {taskset_utilization:.2f}%")
     print("\n🧾 Priorities of Missed Deadline Tasks (per Taskset):")
     for tid, plist in missed_priorities_log:
         print(f"Taskset {tid}: Missed Priorities -> {plist}")
-    with open('../enfs_taskset_summary.csv', 'w', newline='') as f:
-        writer = csv.writer(f)
-        writer.writerow([
-            'Taskset_ID',
-            'Taskset Size',
-            'Preemptions',
-            'Deadline_Misses',
-            'Data_Transfers',
-            'CPU_Utilization(%)',
-            'Makespan',
-            'Missed_Task_Priorities'])
+    config = {'num_cores': num_cores, 'context_switch_time': CONTEXT_SWITCH_TIME,
+              'simulation_time': simulation_time, 'tasksets': 'aperiodic_task_sets',
+              'fnn_rule_weights': [float(w) for w in fnn.rule_weights]}
+    with ResultsWriter('enfs', config, db=results_db) as results:
         for summary, (_, priorities) in zip(summary_log, missed_priorities_log):
-            writer.writerow(summary + [','.join(str(p) for p in priorities)])
-print("\n✅ Saved ENF-S taskset summaries with missed priorities and makespan to 'enfs_taskset_summary.csv'")
+            results.append_summary(summary, priorities)
+        results.write_sketches(sketches)
+    print(f"\n✅ Appended ENF-S taskset summaries to '{results.path}' (run {results.run_id})")
+    print(f"✅ Saved ENF-S response-time percentiles to '{results.sketches_path}'")
 
 
 # --- Example Usage ---
 
 if __name__ == "__main__":
     # Each taskset is a list of Task objects, NO predecessors
-    from random_taskset import tasks as train
-    from aperiodic_task_sets import tasks as test
+    from taskset_store import load_tasksets
+    train = load_tasksets('random_taskset')
+    test = load_tasksets('aperiodic_task_sets')
     tasksets = train
     testsets = test
     print("Training FNN with NSGA-II (this may take a minute)...")
     trained_fnn = nsga2(tasksets, pop_size=10, generations=10)
     print("Training complete.\n")
-    enf_s_simulation(testsets, trained_fnn, num_cores=NUM_CORES, simulation_time=120)
\ No newline at end of file
+    # Binary event trace; render it with `python render_trace.py ../enfs_trace.bin`
+    trace = open_trace('../enfs_trace.bin', TRACE_EVENTS)
+    # Run-length encoded core occupancy, one (core, task, start, end) segment per dispatch
+    timeline_file = open('../enfs_timeline.bin', 'wb')
+    enf_s_simulation(testsets, trained_fnn, num_cores=NUM_CORES, simulation_time=120,
+                     trace=trace, timeline_file=timeline_file)
+    timeline_file.close()
+    if trace:
+        trace.close()
\ No newline at end of file
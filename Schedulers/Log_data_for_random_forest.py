@@ -1,8 +1,10 @@
 import csv
-from Schedulers.random_taskset import tasks as tasksML
+from Schedulers.taskset_store import load_tasksets
 from Schedulers.relax_regular3 import get_logged_priority
 from Schedulers.taskset import Task, SIMULATION_TIME
 
+tasksML = load_tasksets('random_taskset')
+
 # Config
 NUM_CORES = 2
 CONTEXT_SWITCH_TIME = 1
@@ -1,5 +1,4 @@
 import heapq
-import csv
 from copy import deepcopy
 
 epsilon = 1e-9
@@ -9,7 +8,25 @@ SIMULATION_TIME = 100
 
 # Import the original Task class and tasks
 from taskset import Task
-from aperiodic_task_sets import tasks as tasks
+from taskset_store import load_tasksets
+from sim_trace import open_trace, TRACE_EVENTS
+from timeline import Timeline
+from phase_timer import PhaseTimer, ARRIVAL, ASSIGN, PREEMPT, EXECUTE, LOGGING
+from op_counters import OpCounter, COMPARISONS, LAXITY
+from online_metrics import StreamingMetrics
+from quantile_sketch import PrioritySketches
+from results_store import ResultsWriter
+
+# Event trace level and core occupancy timeline for runs of this script
+TRACE_LEVEL = TRACE_EVENTS
+RECORD_TIMELINE = True
+# Per-phase wall time of the tick loop, written to ../mllf_phases.json
+PROFILE_PHASES = False
+# Heap, comparison, sort, laxity and model operation counts, written to ../mllf_operations.json
+COUNT_OPERATIONS = False
+
+# Results are always appended to ../results; set to experiment_db.RESULTS_DB to mirror them into SQLite
+RESULTS_DB = None
 
 # ✅ Global current_time used in laxity comparisons
 current_time = 0
@@ -23,6 +40,11 @@ def task_lt(self, other):
 def task_laxity(self):
     return self.deadline - current_time - self.remaining_time
 
+@task_laxity.setter
+def task_laxity(self, value):
+    # Task.__init__ assigns laxity; the live property above is what MLLF reads
+    pass
+
 def task_repr(self):
     return f'Task: {self.id}, Laxity: {self.laxity}, remaining: {self.remaining_time}'
 
@@ -31,180 +53,231 @@ Task.__lt__ = task_lt
 Task.laxity = task_laxity
 Task.__repr__ = task_repr
 
-# --- Global Statistics ---
-grand_total_deadline_misses = 0
-grand_total_preemptions = 0
-grand_total_data_transfers = 0
-
-summary_log = []
-missed_priorities_log = []
-
-taskset_id = -1
-
-for taskset_ in tasks:
-    taskset_id += 1
-    current_time = 0
-    preemptions = 0
-    deadline_misses = 0
-    data_transfer_count = 0
-    busy_time = 0
-    wcrt = 0  # ✅ worst-case response time (max over tasks of completion - arrival)
-    history = []
-    unarrived_tasks = taskset_
-    taskset_size = len(unarrived_tasks)
-
-    tasks = []
-    completed_tasks = []
-    missed_priorities = []
-    deadline_miss_times = []  # Track when deadline misses occur
-
-    cores = [None] * NUM_CORES
-
-    print(f"\n🔵 MLLF: Taskset #{taskset_id}\nt  1  |  2\n------|---")
-
-    for current_time in range(SIMULATION_TIME):
-        # --- Task Arrival ---
-        for task in unarrived_tasks:
-            if task.arrival_time == current_time:
-                heapq.heappush(tasks, task)
-                data_transfer_count += 1
-
-        unarrived_tasks = [task for task in unarrived_tasks if task.arrival_time > current_time]
-
-        # --- Assign to Cores ---
-        for core in range(NUM_CORES):
-            if cores[core] is None and tasks:
-                cores[core] = heapq.heappop(tasks)
-                cores[core].remaining_time += CONTEXT_SWITCH_TIME  # ⬅️ Add this line
-                data_transfer_count += 1
-
-        # --- Preemption Logic ---
-        if tasks:
-            task = tasks[0]
-
-            for core in range(NUM_CORES):
-                if cores[core] is None:
+
+def simulate(tasksets, num_cores=NUM_CORES, simulation_time=SIMULATION_TIME, trace=None, timeline_file=None,
+             verbose=True, timer=None, counters=None, sketches=None):
+    """Run MLLF over every taskset; returns (summary_log, missed_priorities_log)."""
+    # The patched comparisons read the module-level clock
+    global current_time
+    summary_log = []
+    missed_priorities_log = []
+    if counters:
+        counters.watch(Task, '__lt__', COMPARISONS)
+        counters.watch(Task, 'laxity', LAXITY)
+        counters.watch_heap()
+
+    taskset_id = -1
+
+    for taskset_ in tasksets:
+        taskset_id += 1
+        if counters and taskset_:
+            # Tasks from stores and generated modules are Schedulers.taskset.Task, not the Task imported here
+            counters.watch_class(type(taskset_[0]), '__lt__', COMPARISONS)
+            counters.watch_class(type(taskset_[0]), 'laxity', LAXITY)
+        current_time = 0
+        preemptions = 0
+        data_transfer_count = 0
+        metrics = StreamingMetrics(sketches)  # misses, busy cycles, makespan, WCRT and response times
+        unarrived_tasks = taskset_
+        taskset_size = len(unarrived_tasks)
+
+        tasks = []
+        missed_priorities = []
+
+        cores = [None] * num_cores
+
+        if verbose:
+            print(f"\n🔵 MLLF: Taskset #{taskset_id}")
+        if trace:
+            trace.taskset(taskset_id, taskset_size, num_cores, simulation_time)
+        timeline = Timeline(num_cores) if timeline_file else None
+
+        if timer:
+            timer.start()
+
+        for current_time in range(simulation_time):
+            # --- Task Arrival ---
+            for task in unarrived_tasks:
+                if task.arrival_time == current_time:
+                    heapq.heappush(tasks, task)
+                    data_transfer_count += 1
+                    if trace:
+                        trace.arrival(current_time, task)
+
+            unarrived_tasks = [task for task in unarrived_tasks if task.arrival_time > current_time]
+            if timer:
+                timer.lap(ARRIVAL)
+
+            # --- Assign to Cores ---
+            for core in range(num_cores):
+                if cores[core] is None and tasks:
                     cores[core] = heapq.heappop(tasks)
+                    cores[core].remaining_time += CONTEXT_SWITCH_TIME  # ⬅️ Add this line
                     data_transfer_count += 1
-                    break
-
-            worst_core = None
-            max_laxity = -1
-            for core in range(NUM_CORES):
-                if cores[core] is not None and cores[core].laxity > max_laxity:
-                    max_laxity = cores[core].laxity
-                    worst_core = core
-
-            if worst_core is not None and task.laxity < cores[worst_core].laxity:
-                task_out = cores[worst_core]
-                task_in = heapq.heappop(tasks)
-                cores[worst_core] = task_in
-                heapq.heappush(tasks, task_out)
-                preemptions += 1
-                data_transfer_count += 2
-                cores[worst_core].remaining_time += CONTEXT_SWITCH_TIME
-                history.append(f"Time {current_time}: Preempted {task_out.id} with {task_in.id} on Core {worst_core}")
-
-        # --- Task Execution ---
-        for core in range(NUM_CORES):
-            if cores[core] is not None:
-                cores[core].remaining_time -= 1
-                busy_time += 1
-
-                if cores[core].remaining_time <= 0:
-                    cores[core].completion_time = current_time
-                    # ✅ Update WCRT at completion
-                    try:
-                        rt = cores[core].completion_time - cores[core].arrival_time
-                        if rt > wcrt:
-                            wcrt = rt
-                    except Exception:
-                        pass
-
-                    completed_tasks.append(cores[core])
-
-                    if cores[core].completion_time > cores[core].deadline:
-                        deadline_misses += 1
-                        deadline_miss_times.append(current_time)
-                        missed_priorities.append(getattr(cores[core], 'priority', 'N/A'))
-
-                    cores[core] = None
-
-        core_status = [str(cores[i].id) if cores[i] else "-" for i in range(NUM_CORES)]
-        print(f"{current_time}  {core_status[0]}  |  {core_status[1]}")
-
-    # --- Check Incomplete Tasks ---
-    for task in tasks:
-        if task.remaining_time > 0:
-            deadline_misses += 1
-            deadline_miss_times.append(current_time)
-            missed_priorities.append(getattr(task, 'priority', 'N/A'))
-            print(f"⚠️ Task {task.id} did not complete and missed deadline.")
-
-    # --- Makespan Calculation ---
-    makespan = max(task.completion_time for task in completed_tasks) if completed_tasks else 0
-
-    print("\n📜 Preemption History:")
-    for event in history:
-        print(event)
-
-    print("\n🎯 Completion Summary:")
-    for task in completed_tasks:
-        if task.completion_time > task.deadline:
-            print(f"❌ MISS: Task {task.id} completed at {task.completion_time} after deadline {task.deadline}")
-        else:
-            print(f"✅ DONE: Task {task.id} completed at {task.completion_time} before deadline {task.deadline}")
-
-    print(f"\n📈 Total Preemptions: {preemptions}")
-    print(f"💥 Total Deadline Misses: {deadline_misses}")
-    print(f"🔄 Total Data Transfers: {data_transfer_count}")
-    print(f"⏱️ Makespan: {makespan} cycles")
-
-    grand_total_deadline_misses += deadline_misses
-    grand_total_preemptions += preemptions
-    grand_total_data_transfers += data_transfer_count
-    taskset_utilization = (busy_time / (SIMULATION_TIME * NUM_CORES)) * 100
-    missed_priorities_log.append((taskset_id, missed_priorities))
-
-    summary_log.append([
-        taskset_id,
-        taskset_size,
-        preemptions,
-        deadline_misses,
-        data_transfer_count,
-        f"{taskset_utilization:.2f}",
-        makespan,
-        wcrt,  # ✅ append WCRT into the summary row
-    ])
-
-# --- Final Statistics ---
-
-print("\n🚀 Final Grand Totals for MLLF:")
-print(f"💥 Grand Total Deadline Misses: {grand_total_deadline_misses}")
-print(f"🔄 Grand Total Preemptions: {grand_total_preemptions}")
-print(f"🔁 Grand Total Data Transfers: {grand_total_data_transfers}")
-print(f"⚡ Overall CPU Utilization: {taskset_utilization:.2f}%")
-
-print("\n🧾 Priorities of Missed Deadline Tasks (per Taskset):")
-for tid, plist in missed_priorities_log:
-    print(f"Taskset {tid}: Missed Priorities -> {plist}")
-
-with open('../mllf_taskset_summary.csv', 'w', newline='') as f:
-    writer = csv.writer(f)
-    writer.writerow([
-        'Taskset_ID',
-        'Taskset Size',
-        'Preemptions',
-        'Deadline_Misses',
-        'Data_Transfers',
-        'CPU_Utilization(%)',
-        'Makespan',
-        'WCRT',  # ✅ header includes WCRT
-        'Missed_Task_Priorities'
-    ])
-
-    for summary, (_, priorities) in zip(summary_log, missed_priorities_log):
-        # ✅ no extra wcrt here; already in summary
-        writer.writerow(summary + [','.join(str(p) for p in priorities)])
-
-print("\n✅ Saved MLLF taskset summaries with missed priorities to 'mllf_taskset_summary.csv'")
+                    if trace:
+                        trace.dispatch(current_time, core, cores[core])
+
+            if timer:
+                timer.lap(ASSIGN)
+
+            # --- Preemption Logic ---
+            if tasks:
+                task = tasks[0]
+
+                for core in range(num_cores):
+                    if cores[core] is None:
+                        cores[core] = heapq.heappop(tasks)
+                        data_transfer_count += 1
+                        if trace:
+                            trace.dispatch(current_time, core, cores[core])
+                        break
+
+                worst_core = None
+                max_laxity = -1
+                for core in range(num_cores):
+                    if cores[core] is not None and cores[core].laxity > max_laxity:
+                        max_laxity = cores[core].laxity
+                        worst_core = core
+
+                if worst_core is not None and task.laxity < cores[worst_core].laxity:
+                    task_out = cores[worst_core]
+                    task_in = heapq.heappop(tasks)
+                    cores[worst_core] = task_in
+                    heapq.heappush(tasks, task_out)
+                    preemptions += 1
+                    data_transfer_count += 2
+                    cores[worst_core].remaining_time += CONTEXT_SWITCH_TIME
+                    if trace:
+                        trace.preempt(current_time, worst_core, task_in, task_out)
+
+            if timer:
+                timer.lap(PREEMPT)
+
+            if timeline is not None:
+                timeline.observe(current_time, cores)
+            if timer:
+                timer.lap(LOGGING)
+
+            # --- Task Execution ---
+            for core in range(num_cores):
+                if cores[core] is not None:
+                    cores[core].remaining_time -= 1
+                    metrics.busy()
+
+                    if cores[core].remaining_time <= 0:
+                        cores[core].completion_time = current_time
+                        metrics.complete(cores[core], current_time)
+                        if trace:
+                            trace.complete(current_time, core, cores[core])
+
+                        if cores[core].completion_time > cores[core].deadline:
+                            metrics.miss()
+                            missed_priorities.append(getattr(cores[core], 'priority', 'N/A'))
+
+                        cores[core] = None
+
+            if timer:
+                timer.lap(EXECUTE)
+                timer.tick()
+            if counters:
+                counters.tick()
+
+        if timeline is not None:
+            timeline.close(simulation_time)
+            timeline.write(timeline_file, taskset_id)
+
+        # --- Check Incomplete Tasks ---
+        for task in tasks:
+            if task.remaining_time > 0:
+                metrics.miss()
+                missed_priorities.append(getattr(task, 'priority', 'N/A'))
+                if trace:
+                    trace.miss(current_time, task, getattr(task, 'priority', -1))
+
+        # --- Makespan Calculation ---
+        makespan = metrics.makespan
+
+        if verbose:
+            print(f"\n📈 Total Preemptions: {preemptions}")
+            print(f"💥 Total Deadline Misses: {metrics.misses}")
+            print(f"🔄 Total Data Transfers: {data_transfer_count}")
+            print(f"⏱️ Makespan: {makespan} cycles")
+
+        taskset_utilization = metrics.utilization(simulation_time, num_cores)
+        missed_priorities_log.append((taskset_id, missed_priorities))
+        if timer:
+            timer.lap(LOGGING)
+        if counters:
+            counters.end_taskset(taskset_id)
+
+        summary_log.append([
+            taskset_id,
+            taskset_size,
+            preemptions,
+            metrics.misses,
+            data_transfer_count,
+            f"{taskset_utilization:.2f}",
+            makespan,
+            metrics.wcrt,  # ✅ append WCRT into the summary row
+            metrics.mean_response,
+            metrics.response_std,
+        ])
+
+    if counters:
+        counters.unwatch()
+    return summary_log, missed_priorities_log
+
+
+if __name__ == "__main__":
+    tasks = load_tasksets('aperiodic_task_sets')
+
+    # Binary event trace; render it with `python render_trace.py ../mllf_trace.bin`
+    trace = open_trace('../mllf_trace.bin', TRACE_LEVEL)
+    # Run-length encoded core occupancy, one (core, task, start, end) segment per context switch
+    timeline_file = open('../mllf_timeline.bin', 'wb') if RECORD_TIMELINE else None
+    timer = PhaseTimer() if PROFILE_PHASES else None
+    counters = OpCounter() if COUNT_OPERATIONS else None
+    # Response-time and lateness percentiles per priority, saved next to the results
+    sketches = PrioritySketches()
+
+    summary_log, missed_priorities_log = simulate(tasks, trace=trace, timeline_file=timeline_file, timer=timer,
+                                                  counters=counters, sketches=sketches)
+    taskset_utilization = float(summary_log[-1][5]) if summary_log else 0
+
+    print("\n🚀 Final Grand Totals for MLLF:")
+    print(f"💥 Grand Total Deadline Misses: {sum(row[3] for row in summary_log)}")
+    print(f"🔄 Grand Total Preemptions: {sum(row[2] for row in summary_log)}")
+    print(f"🔁 Grand Total Data Transfers: {sum(row[4] for row in summary_log)}")
+    print(f"⚡ Overall CPU Utilization: {taskset_utilization:.2f}%")
+
+    print("\n🧾 Priorities of Missed Deadline Tasks (per Taskset):")
+    for tid, plist in missed_priorities_log:
+        print(f"Taskset {tid}: Missed Priorities -> {plist}")
+
+    config = {'num_cores': NUM_CORES, 'context_switch_time': CONTEXT_SWITCH_TIME,
+              'simulation_time': SIMULATION_TIME, 'tasksets': 'aperiodic_task_sets'}
+    with ResultsWriter('mllf', config, db=RESULTS_DB) as results:
+        for summary, (_, priorities) in zip(summary_log, missed_priorities_log):
+            results.append_summary(summary, priorities)
+        results.write_sketches(sketches)
+
+    print(f"\n✅ Appended MLLF taskset summaries to '{results.path}' (run {results.run_id})")
+    print(f"✅ Saved MLLF response-time percentiles to '{results.sketches_path}'")
+
+    if timeline_file:
+        timeline_file.close()
+        print("✅ Saved core occupancy timeline to 'mllf_timeline.bin'")
+
+    if trace:
+        trace.close()
+        print("✅ Saved MLLF event trace to 'mllf_trace.bin'")
+
+    if timer:
+        timer.print_report('MLLF phase timing')
+        timer.write('../mllf_phases.json', scheduler='mllf')
+        print("✅ Saved MLLF phase timing to 'mllf_phases.json'")
+
+    if counters:
+        counters.print_report('MLLF operation counts')
+        counters.write('../mllf_operations.json', scheduler='mllf')
+        print("✅ Saved MLLF operation counts to 'mllf_operations.json'")
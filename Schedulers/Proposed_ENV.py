@@ -1,29 +1,36 @@
-
-import csv
-from aperiodic_task_sets import tasks as tasksML
+import sys
+from taskset_store import load_tasksets
 from taskset import SIMULATION_TIME
+from sim_trace import open_trace, TRACE_EVENTS
+from timeline import Timeline
+from phase_timer import PhaseTimer, ARRIVAL, DROP, RELAXATION, SORT, ASSIGN, PREEMPT, EXECUTE, LOGGING
+from op_counters import OpCounter, LAXITY, SORTS, SORTED
+from online_metrics import StreamingMetrics
+from quantile_sketch import PrioritySketches
+from results_store import ResultsWriter
+from environment import EnvironmentSchedule
+from laxity_bounds import LaxityBounds
+import ready_kernel
 
 NUM_CORES = 8
 CONTEXT_SWITCH_TIME = 1
 epsilon = 1e-5
 
-def theta_lambda(env_cond):
-    return {'clear': 1.25, 'rainy': 0.84, 'foggy': 0.54}.get(env_cond, 4)
+# Event trace level and core occupancy timeline for runs of this script
+TRACE_LEVEL = TRACE_EVENTS
+RECORD_TIMELINE = True
+# Per-phase wall time of the tick loop, written to ../env_phases.json
+PROFILE_PHASES = False
+# Heap, comparison, sort, laxity and model operation counts, written to ../env_operations.json
+COUNT_OPERATIONS = False
 
-def dynamic_priority(task, env_cond):
-    base = task.base_priority
-    if env_cond == 'rainy':
-        return {1: 3, 3: 1}.get(base, base)
-    elif env_cond == 'foggy':
-        return {1: 2, 2: 3, 3: 1}.get(base, base)
-    return base
+# Environment condition trace (CSV start,end,condition or JSON); None keeps clear/rainy/foggy thirds of the run
+ENV_SCHEDULE = None
+# Ready queues at least this long are re-ranked with array operations instead of per-task Python
+VECTORIZE_MIN = 32
 
-def get_environment_condition(current_time):
-    if current_time < SIMULATION_TIME // 3:
-        return 'clear'
-    elif current_time < 2 * SIMULATION_TIME // 3:
-        return 'rainy'
-    return 'foggy'
+# Results are always appended to ../results; set to experiment_db.RESULTS_DB to mirror them into SQLite
+RESULTS_DB = None
 
 def update_laxity(task, current_time):
     return task.deadline - current_time - task.remaining_time
@@ -31,365 +38,317 @@ def update_laxity(task, current_time):
 def compute_normalized_laxity(laxity, min_lax, max_lax, prange):
     return (laxity - min_lax) * prange / (max_lax - min_lax + epsilon)
 
-# --- Tracking totals
-
-grand_total_deadline_misses = 0
-grand_total_preemptions = 0
-grand_total_data_transfers = 0
-total_busy_time = 0
-
-summary_log = []
-missed_priorities_log = []
-
-for taskset_id, taskset_ in enumerate(tasksML):
-    unarrived_tasks = taskset_.copy()
-    taskset_size = len(unarrived_tasks)
-    current_time = 0
-    preemptions = 0
-    deadline_misses = 0
-    data_transfer_count = 0
-    busy_time = 0
-    wcrt = 0  # Worst-case response time (completion - arrival) for this taskset
-    completed_tasks = []
-    missed_priorities = []
-
-    prange = max((task.priority for task in unarrived_tasks), default=1)
-    for task in unarrived_tasks:
-        task.remaining_time = task.burst_time
-        task.base_priority = task.priority
-        task.completion_time = None
-        task.relaxation = 0.0
-
-    ready_tasks = []
-    cores = [None] * NUM_CORES
-
-    print(f"\nEvaluating Taskset #{taskset_id} with Normalized Laxity + Env Adaptation")
-    print(" t  1  |  2")
-    print("------|---")
-
-    for current_time in range(SIMULATION_TIME):
-        env_cond = get_environment_condition(current_time)
-
-        all_laxities = [update_laxity(t, current_time) for t in unarrived_tasks + ready_tasks]
-        min_laxity = min(all_laxities, default=0)
-        max_laxity = max(all_laxities, default=1)
-
-        # Arrival
-        for task in unarrived_tasks[:]:
-            if task.arrival_time == current_time:
-                task.priority = dynamic_priority(task, env_cond)
-                laxity = update_laxity(task, current_time)
-                norm_lax = compute_normalized_laxity(laxity, min_laxity, max_laxity, prange)
-                task.relaxation = theta_lambda(env_cond) * norm_lax + task.priority
-                ready_tasks.append(task)
-                unarrived_tasks.remove(task)
-                data_transfer_count += 1
-
-        # Drop overdue tasks
-        for task in ready_tasks[:]:
-            if update_laxity(task, current_time) < 0:
-                deadline_misses += 1
-                missed_priorities.append(task.priority)
-                ready_tasks.remove(task)
-                data_transfer_count += 1
-
-        # Sort ready queue
-        for task in ready_tasks:
-            laxity = update_laxity(task, current_time)
-            norm_lax = compute_normalized_laxity(laxity, min_laxity, max_laxity, prange)
-            task.relaxation = theta_lambda(env_cond) * norm_lax + task.priority
-        ready_tasks.sort(key=lambda t: t.relaxation)
-
-        # Assign idle cores
-        for core in range(NUM_CORES):
-            if cores[core] is None and ready_tasks:
-                task = ready_tasks.pop(0)
-                task.remaining_time += CONTEXT_SWITCH_TIME
-                cores[core] = task
-                data_transfer_count += 1
-
-        # Preemption
-        if ready_tasks:
-            incoming = ready_tasks[0]
-            incoming_laxity = update_laxity(incoming, current_time)
-
-            worst_core = max(
-                [(i, t.remaining_time) for i, t in enumerate(cores) if t],
-                default=(None, -1), key=lambda x: x[1]
-            )[0]
-
-            if worst_core is not None and incoming_laxity < cores[worst_core].remaining_time:
-                task_out = cores[worst_core]
-                task_in = ready_tasks.pop(0)
-                task_in.remaining_time += CONTEXT_SWITCH_TIME
-                cores[worst_core] = task_in
-                ready_tasks.append(task_out)
-                preemptions += 1
-                data_transfer_count += 2
-
-        # Run tasks
-        for core in range(NUM_CORES):
-            if cores[core]:
-                cores[core].remaining_time -= 1
-                busy_time += 1
-                if cores[core].remaining_time <= 0:
-                    cores[core].completion_time = current_time
-                    # Update WCRT upon completion
-                    try:
-                        rt = cores[core].completion_time - cores[core].arrival_time
-                        if rt > wcrt:
-                            wcrt = rt
-                    except Exception:
-                        pass
-                    completed_tasks.append(cores[core])
-                    if cores[core].completion_time > cores[core].deadline:
-                        deadline_misses += 1
-                        missed_priorities.append(cores[core].priority)
-                    cores[core] = None
-
-        core_status = [str(cores[i].id) if cores[i] else "-" for i in range(NUM_CORES)]
-        print(f"{current_time}  {core_status[0]}  |  {core_status[1]}")
-
+def rank_ready(ready_tasks, current_time, theta, min_laxity, max_laxity, prange, timer=None, counters=None, k=None):
+    """Rank the ready queue by environment-weighted relaxation in place, lowest first.
+
+    `theta` is the current condition's theta_lambda. With `k` only the k lowest are ranked to
+    the front (the rest keep their order); otherwise the whole queue is sorted. Long queues
+    score every task at once with ready_kernel, in the same operation order as the scalar path
+    so values and ties come out the same.
+    """
+    n = len(ready_tasks)
+    if n >= VECTORIZE_MIN:
+        laxity, priority = ready_kernel.gather(ready_tasks, current_time)
+        relaxation = theta * ((laxity - min_laxity) * prange / (max_laxity - min_laxity + epsilon)) + priority
+        if timer:
+            timer.lap(RELAXATION)
+        relaxation = ready_kernel.rank(ready_tasks, relaxation, k)
+        for task, value in zip(ready_tasks, relaxation.tolist()):
+            task.relaxation = value
+        if counters:
+            counters.add(LAXITY, n)
+            counters.add(SORTS)
+            counters.add(SORTED, n if k is None else min(k, n))
+        if timer:
+            timer.lap(SORT)
+        return
     for task in ready_tasks:
-        if task.remaining_time > 0:
-            deadline_misses += 1
-            missed_priorities.append(task.priority)
-
-    makespan = max((t.completion_time for t in completed_tasks), default=0)
-    taskset_utilization = (busy_time / (SIMULATION_TIME * NUM_CORES)) * 100
-
-    print(f"\n\U0001F4C8 Total Preemptions: {preemptions}")
-    print(f"💥 Total Deadline Misses: {deadline_misses}")
-    print(f"🔄 Total Data Transfers: {data_transfer_count}")
-    print(f"⏱️ Makespan: {makespan} cycles")
-    print(f"⚡ CPU Utilization for this taskset: {taskset_utilization:.2f}%")
-
-    grand_total_deadline_misses += deadline_misses
-    grand_total_preemptions += preemptions
-    grand_total_data_transfers += data_transfer_count
-    total_busy_time += busy_time
-
-    summary_log.append([
-        taskset_id, taskset_size, preemptions, deadline_misses,
-        data_transfer_count, f"{taskset_utilization:.2f}", makespan
-    , wcrt])
-    missed_priorities_log.append((taskset_id, missed_priorities))
-
-# Final Summary
-print("\n\U0001F9FE Priorities of Missed Deadline Tasks (per Taskset):")
-for tid, plist in missed_priorities_log:
-    print(f"Taskset {tid}: Missed Priorities -> {plist}")
-
-grand_total_utilization = (total_busy_time / (SIMULATION_TIME * NUM_CORES * len(tasksML))) * 100
-print("\n\U0001F680 Final Grand Totals:")
-print(f"💥 Grand Total Deadline Misses: {grand_total_deadline_misses}")
-print(f"🔄 Grand Total Preemptions: {grand_total_preemptions}")
-print(f"🔁 Grand Total Data Transfers: {grand_total_data_transfers}")
-print(f"⚡ Overall CPU Utilization: {grand_total_utilization:.2f}%")
-
-
-with open('../normalized_laxity_env_summary.csv', 'w', newline='') as f:
-    writer = csv.writer(f)
-    writer.writerow([
-        'Taskset_ID', 'Taskset Size', 'Preemptions', 'Deadline_Misses',
-        'Data_Transfers', 'CPU_Utilization(%)', 'Makespan', 'WCRT', 'Missed_Task_Priorities'
-    ])
-    for summary, (_, priorities) in zip(summary_log, missed_priorities_log):
-        writer.writerow(summary + [wcrt, ','.join(str(p) for p in priorities)])
-
-print("\n✅ Saved normalized laxity + env-aware taskset summaries to 'normalized_laxity_env_summary.csv'")
-
-def dynamic_priority(task, env_cond):
-    base = task.base_priority
-    if env_cond == 'rainy':
-        return {1: 3, 3: 1}.get(base, base)
-    elif env_cond == 'foggy':
-        return {1: 2, 2: 3, 3: 1}.get(base, base)
-    return base
-
-def get_environment_condition(current_time):
-    if current_time < SIMULATION_TIME // 3:
-        return 'clear'
-    elif current_time < 2 * SIMULATION_TIME // 3:
-        return 'rainy'
-    return 'foggy'
-
-def update_laxity(task, current_time):
-    return task.deadline - current_time - task.remaining_time
-
-def compute_normalized_laxity(laxity, min_lax, max_lax, prange):
-    return (laxity - min_lax) * prange / (max_lax - min_lax + epsilon)
-
-# --- Tracking totals
-
-grand_total_deadline_misses = 0
-grand_total_preemptions = 0
-grand_total_data_transfers = 0
-total_busy_time = 0
-
-summary_log = []
-missed_priorities_log = []
-
-for taskset_id, taskset_ in enumerate(tasksML):
-    unarrived_tasks = taskset_.copy()
-    taskset_size = len(unarrived_tasks)
-    current_time = 0
-    preemptions = 0
-    deadline_misses = 0
-    data_transfer_count = 0
-    busy_time = 0
-    wcrt = 0  # Worst-case response time (completion - arrival) for this taskset
-    completed_tasks = []
-    missed_priorities = []
-
-    prange = max((task.priority for task in unarrived_tasks), default=1)
-    for task in unarrived_tasks:
-        task.remaining_time = task.burst_time
-        task.base_priority = task.priority
-        task.completion_time = None
-        task.relaxation = 0.0
-
-    ready_tasks = []
-    cores = [None] * NUM_CORES
-
-    print(f"\nEvaluating Taskset #{taskset_id} with Normalized Laxity + Env Adaptation")
-    print(" t  1  |  2")
-    print("------|---")
-
-    for current_time in range(SIMULATION_TIME):
-        env_cond = get_environment_condition(current_time)
-
-        all_laxities = [update_laxity(t, current_time) for t in unarrived_tasks + ready_tasks]
-        min_laxity = min(all_laxities, default=0)
-        max_laxity = max(all_laxities, default=1)
-
-        # Arrival
-        for task in unarrived_tasks[:]:
-            if task.arrival_time == current_time:
-                task.priority = dynamic_priority(task, env_cond)
-                laxity = update_laxity(task, current_time)
-                norm_lax = compute_normalized_laxity(laxity, min_laxity, max_laxity, prange)
-                task.relaxation = theta_lambda(env_cond) * norm_lax + task.priority
-                ready_tasks.append(task)
-                unarrived_tasks.remove(task)
-                data_transfer_count += 1
-
-        # Drop overdue tasks
-        for task in ready_tasks[:]:
-            if update_laxity(task, current_time) < 0:
-                deadline_misses += 1
+        laxity = update_laxity(task, current_time)
+        norm_lax = compute_normalized_laxity(laxity, min_laxity, max_laxity, prange)
+        task.relaxation = theta * norm_lax + task.priority
+    if timer:
+        timer.lap(RELAXATION)
+    key = lambda t: t.relaxation
+    if counters:
+        key = counters.sorted_key(key, n)
+    ready_tasks.sort(key=key)
+    if timer:
+        timer.lap(SORT)
+
+def simulate(tasksets, num_cores=NUM_CORES, simulation_time=SIMULATION_TIME, trace=None, timeline_file=None,
+             verbose=True, timer=None, counters=None, sketches=None, schedule=None):
+    """Run the environment-aware scheduler over every taskset; returns (summary_log, missed_priorities_log).
+
+    `schedule` is an environment.EnvironmentSchedule; by default clear, rainy and foggy each
+    last a third of the run.
+    """
+    summary_log = []
+    if schedule is None:
+        schedule = EnvironmentSchedule.thirds(simulation_time)
+    # Condition code per tick and theta per code, looked up instead of recomputed every tick
+    conditions = schedule.codes(simulation_time).tolist()
+    thetas = schedule.theta_table().tolist()
+    missed_priorities_log = []
+    if counters:
+        # update_laxity is looked up in this module's globals on every call
+        counters.watch(sys.modules[__name__], 'update_laxity', LAXITY)
+
+    for taskset_id, taskset_ in enumerate(tasksets):
+        unarrived_tasks = taskset_.copy()
+        taskset_size = len(unarrived_tasks)
+        current_time = 0
+        preemptions = 0
+        data_transfer_count = 0
+        metrics = StreamingMetrics(sketches)  # misses, busy cycles, makespan, WCRT and response times
+        missed_priorities = []
+
+        prange = max((task.priority for task in unarrived_tasks), default=1)
+        # [condition code][base priority] -> priority under that condition
+        priorities = schedule.priority_table(prange).tolist()
+        for task in unarrived_tasks:
+            task.remaining_time = task.burst_time
+            task.base_priority = task.priority
+            task.completion_time = None
+            task.relaxation = 0.0
+            task.dropped = False
+
+        ready_tasks = []
+        # Only the head of the queue is ranked, so drops and leftovers are reported in the order a
+        # fully sorted queue would hold them: ranked tasks by (relaxation, enqueue number), then
+        # tasks queued since the last ranking in enqueue order
+        enqueued = 0
+        ranked = 0
+
+        def queue_order(task):
+            return (0, task.relaxation, task.enqueued) if task.enqueued < ranked else (1, 0, task.enqueued)
+
+        cores = [None] * num_cores
+        # Unarrived and ready tasks together; arriving moves a task between the two without changing its key
+        waiting = LaxityBounds(unarrived_tasks)
+        # Ready tasks only, by the time their laxity runs out
+        expiry = LaxityBounds()
+
+        if verbose:
+            print(f"\nEvaluating Taskset #{taskset_id} with Normalized Laxity + Env Adaptation")
+        if trace:
+            trace.taskset(taskset_id, taskset_size, num_cores, simulation_time)
+        timeline = Timeline(num_cores) if timeline_file else None
+
+        if timer:
+            timer.start()
+
+        for current_time in range(simulation_time):
+            condition = conditions[current_time]
+            theta = thetas[condition]
+
+            min_laxity, max_laxity = waiting.bounds(current_time, update_laxity)
+            if timer:
+                timer.lap(RELAXATION)
+
+            # Arrival
+            for task in unarrived_tasks[:]:
+                if task.arrival_time == current_time:
+                    task.priority = priorities[condition][task.base_priority]
+                    laxity = update_laxity(task, current_time)
+                    norm_lax = compute_normalized_laxity(laxity, min_laxity, max_laxity, prange)
+                    task.relaxation = theta * norm_lax + task.priority
+                    ready_tasks.append(task)
+                    task.enqueued = enqueued
+                    enqueued += 1
+                    expiry.add(task)
+                    unarrived_tasks.remove(task)
+                    data_transfer_count += 1
+                    if trace:
+                        trace.arrival(current_time, task)
+
+            if timer:
+                timer.lap(ARRIVAL)
+
+            # Drop overdue tasks: the expiry heap finds them, so the queue is only filtered on ticks with drops
+            expired = expiry.pop_expired(current_time, update_laxity)
+            for task in expired:
+                task.dropped = True
+                waiting.discard(task)
+            if expired:
+                ready_tasks[:] = [task for task in ready_tasks if not task.dropped]
+                for task in sorted(expired, key=queue_order):
+                    metrics.miss()
+                    missed_priorities.append(task.priority)
+                    data_transfer_count += 1
+                    if trace:
+                        trace.drop(current_time, task, task.priority)
+
+            if timer:
+                timer.lap(DROP)
+
+            # Rank the ready queue: one task per idle core, plus the preemption candidate
+            rank_ready(ready_tasks, current_time, theta, min_laxity, max_laxity, prange, timer, counters,
+                       cores.count(None) + 1)
+            ranked = enqueued
+
+            # Assign idle cores
+            for core in range(num_cores):
+                if cores[core] is None and ready_tasks:
+                    task = ready_tasks.pop(0)
+                    waiting.discard(task)
+                    expiry.discard(task)
+                    task.remaining_time += CONTEXT_SWITCH_TIME
+                    cores[core] = task
+                    data_transfer_count += 1
+                    if trace:
+                        trace.dispatch(current_time, core, task)
+
+            if timer:
+                timer.lap(ASSIGN)
+
+            # Preemption
+            if ready_tasks:
+                incoming = ready_tasks[0]
+                incoming_laxity = update_laxity(incoming, current_time)
+
+                worst_core = max(
+                    [(i, t.remaining_time) for i, t in enumerate(cores) if t],
+                    default=(None, -1), key=lambda x: x[1]
+                )[0]
+
+                if worst_core is not None and incoming_laxity < cores[worst_core].remaining_time:
+                    task_out = cores[worst_core]
+                    task_in = ready_tasks.pop(0)
+                    waiting.discard(task_in)
+                    expiry.discard(task_in)
+                    task_in.remaining_time += CONTEXT_SWITCH_TIME
+                    cores[worst_core] = task_in
+                    ready_tasks.append(task_out)
+                    task_out.enqueued = enqueued
+                    enqueued += 1
+                    waiting.add(task_out)
+                    expiry.add(task_out)
+                    preemptions += 1
+                    data_transfer_count += 2
+                    if trace:
+                        trace.preempt(current_time, worst_core, task_in, task_out)
+
+            if timer:
+                timer.lap(PREEMPT)
+
+            if timeline is not None:
+                timeline.observe(current_time, cores)
+            if timer:
+                timer.lap(LOGGING)
+
+            # Run tasks
+            for core in range(num_cores):
+                if cores[core]:
+                    cores[core].remaining_time -= 1
+                    metrics.busy()
+                    if cores[core].remaining_time <= 0:
+                        cores[core].completion_time = current_time
+                        metrics.complete(cores[core], current_time)
+                        if trace:
+                            trace.complete(current_time, core, cores[core])
+                        if cores[core].completion_time > cores[core].deadline:
+                            metrics.miss()
+                            missed_priorities.append(cores[core].priority)
+                        cores[core] = None
+
+            if timer:
+                timer.lap(EXECUTE)
+                timer.tick()
+            if counters:
+                counters.tick()
+
+        if timeline is not None:
+            timeline.close(simulation_time)
+            timeline.write(timeline_file, taskset_id)
+
+        for task in sorted(ready_tasks, key=queue_order):
+            if task.remaining_time > 0:
+                metrics.miss()
                 missed_priorities.append(task.priority)
-                ready_tasks.remove(task)
-                data_transfer_count += 1
-
-        # Sort ready queue
-        for task in ready_tasks:
-            laxity = update_laxity(task, current_time)
-            norm_lax = compute_normalized_laxity(laxity, min_laxity, max_laxity, prange)
-            task.relaxation = theta_lambda(env_cond) * norm_lax + task.priority
-        ready_tasks.sort(key=lambda t: t.relaxation)
-
-        # Assign idle cores
-        for core in range(NUM_CORES):
-            if cores[core] is None and ready_tasks:
-                task = ready_tasks.pop(0)
-                task.remaining_time += CONTEXT_SWITCH_TIME
-                cores[core] = task
-                data_transfer_count += 1
-
-        # Preemption
-        if ready_tasks:
-            incoming = ready_tasks[0]
-            incoming_laxity = update_laxity(incoming, current_time)
-
-            worst_core = max(
-                [(i, t.remaining_time) for i, t in enumerate(cores) if t],
-                default=(None, -1), key=lambda x: x[1]
-            )[0]
-
-            if worst_core is not None and incoming_laxity < cores[worst_core].remaining_time:
-                task_out = cores[worst_core]
-                task_in = ready_tasks.pop(0)
-                task_in.remaining_time += CONTEXT_SWITCH_TIME
-                cores[worst_core] = task_in
-                ready_tasks.append(task_out)
-                preemptions += 1
-                data_transfer_count += 2
-
-        # Run tasks
-        for core in range(NUM_CORES):
-            if cores[core]:
-                cores[core].remaining_time -= 1
-                busy_time += 1
-                if cores[core].remaining_time <= 0:
-                    cores[core].completion_time = current_time
-                    # Update WCRT upon completion
-                    try:
-                        rt = cores[core].completion_time - cores[core].arrival_time
-                        if rt > wcrt:
-                            wcrt = rt
-                    except Exception:
-                        pass
-                    completed_tasks.append(cores[core])
-                    if cores[core].completion_time > cores[core].deadline:
-                        deadline_misses += 1
-                        missed_priorities.append(cores[core].priority)
-                    cores[core] = None
-
-        core_status = [str(cores[i].id) if cores[i] else "-" for i in range(NUM_CORES)]
-        print(f"{current_time}  {core_status[0]}  |  {core_status[1]}")
-
-    for task in ready_tasks:
-        if task.remaining_time > 0:
-            deadline_misses += 1
-            missed_priorities.append(task.priority)
-
-    makespan = max((t.completion_time for t in completed_tasks), default=0)
-    taskset_utilization = (busy_time / (SIMULATION_TIME * NUM_CORES)) * 100
-
-    print(f"\n\U0001F4C8 Total Preemptions: {preemptions}")
-    print(f"💥 Total Deadline Misses: {deadline_misses}")
-    print(f"🔄 Total Data Transfers: {data_transfer_count}")
-    print(f"⏱️ Makespan: {makespan} cycles")
-    print(f"⚡ CPU Utilization for this taskset: {taskset_utilization:.2f}%")
-
-    grand_total_deadline_misses += deadline_misses
-    grand_total_preemptions += preemptions
-    grand_total_data_transfers += data_transfer_count
-    total_busy_time += busy_time
-
-    summary_log.append([
-        taskset_id, taskset_size, preemptions, deadline_misses,
-        data_transfer_count, f"{taskset_utilization:.2f}", makespan
-    , wcrt])
-    missed_priorities_log.append((taskset_id, missed_priorities))
-
-# Final Summary
-print("\n\U0001F9FE Priorities of Missed Deadline Tasks (per Taskset):")
-for tid, plist in missed_priorities_log:
-    print(f"Taskset {tid}: Missed Priorities -> {plist}")
-
-grand_total_utilization = (total_busy_time / (SIMULATION_TIME * NUM_CORES * len(tasksML))) * 100
-print("\n\U0001F680 Final Grand Totals:")
-print(f"💥 Grand Total Deadline Misses: {grand_total_deadline_misses}")
-print(f"🔄 Grand Total Preemptions: {grand_total_preemptions}")
-print(f"🔁 Grand Total Data Transfers: {grand_total_data_transfers}")
-print(f"⚡ Overall CPU Utilization: {grand_total_utilization:.2f}%")
-
-
-with open('../normalized_laxity_env_summary.csv', 'w', newline='') as f:
-    writer = csv.writer(f)
-    writer.writerow([
-        'Taskset_ID',
-        'Taskset Size',
-        'Preemptions',
-        'Deadline_Misses',
-        'Data_Transfers',
-        'CPU_Utilization(%)',
-        'Makespan', 'WCRT', 'Missed_Task_Priorities'
-    ])
-    for summary, (_, priorities) in zip(summary_log, missed_priorities_log):
-        # Don't add wcrt again; it's already inside `summary`
-        writer.writerow(summary + [','.join(str(p) for p in priorities)])
-
-print("\n✅ Saved normalized laxity + env-aware taskset summaries to 'normalized_laxity_env_summary.csv'")
+                if trace:
+                    trace.miss(current_time, task, task.priority)
+
+        makespan = metrics.makespan
+        taskset_utilization = metrics.utilization(simulation_time, num_cores)
+
+        if verbose:
+            print(f"\n\U0001F4C8 Total Preemptions: {preemptions}")
+            print(f"💥 Total Deadline Misses: {metrics.misses}")
+            print(f"🔄 Total Data Transfers: {data_transfer_count}")
+            print(f"⏱️ Makespan: {makespan} cycles")
+            print(f"⚡ CPU Utilization for this taskset: {taskset_utilization:.2f}%")
+
+        summary_log.append([
+            taskset_id, taskset_size, preemptions, metrics.misses,
+            data_transfer_count, f"{taskset_utilization:.2f}", makespan
+        , metrics.wcrt, metrics.mean_response, metrics.response_std])
+        missed_priorities_log.append((taskset_id, missed_priorities))
+        if timer:
+            timer.lap(LOGGING)
+        if counters:
+            counters.end_taskset(taskset_id)
+
+    if counters:
+        counters.unwatch()
+    return summary_log, missed_priorities_log
+
+
+if __name__ == "__main__":
+    tasksML = load_tasksets('aperiodic_task_sets')
+
+    # Binary event trace; render it with `python render_trace.py ../env_trace.bin`
+    trace = open_trace('../env_trace.bin', TRACE_LEVEL)
+    # Run-length encoded core occupancy, one (core, task, start, end) segment per context switch
+    timeline_file = open('../env_timeline.bin', 'wb') if RECORD_TIMELINE else None
+    timer = PhaseTimer() if PROFILE_PHASES else None
+    counters = OpCounter() if COUNT_OPERATIONS else None
+    # Response-time and lateness percentiles per priority, saved next to the results
+    sketches = PrioritySketches()
+
+    schedule = EnvironmentSchedule.load(ENV_SCHEDULE) if ENV_SCHEDULE else None
+
+    summary_log, missed_priorities_log = simulate(tasksML, trace=trace, timeline_file=timeline_file, timer=timer,
+                                                  counters=counters, sketches=sketches, schedule=schedule)
+
+    # Final Summary
+    print("\n\U0001F9FE Priorities of Missed Deadline Tasks (per Taskset):")
+    for tid, plist in missed_priorities_log:
+        print(f"Taskset {tid}: Missed Priorities -> {plist}")
+
+    grand_total_utilization = sum(float(row[5]) for row in summary_log) / max(len(tasksML), 1)
+    print("\n\U0001F680 Final Grand Totals:")
+    print(f"💥 Grand Total Deadline Misses: {sum(row[3] for row in summary_log)}")
+    print(f"🔄 Grand Total Preemptions: {sum(row[2] for row in summary_log)}")
+    print(f"🔁 Grand Total Data Transfers: {sum(row[4] for row in summary_log)}")
+    print(f"⚡ Overall CPU Utilization: {grand_total_utilization:.2f}%")
+
+    config = {'num_cores': NUM_CORES, 'context_switch_time': CONTEXT_SWITCH_TIME,
+              'simulation_time': SIMULATION_TIME, 'tasksets': 'aperiodic_task_sets',
+              'epsilon': epsilon}
+    if ENV_SCHEDULE:
+        config['env_schedule'] = ENV_SCHEDULE
+    with ResultsWriter('env', config, db=RESULTS_DB) as results:
+        for summary, (_, priorities) in zip(summary_log, missed_priorities_log):
+            results.append_summary(summary, priorities)
+        results.write_sketches(sketches)
+
+    print(f"\n✅ Appended normalized laxity + env-aware taskset summaries to '{results.path}' (run {results.run_id})")
+    print(f"✅ Saved env-aware response-time percentiles to '{results.sketches_path}'")
+
+    if timeline_file:
+        timeline_file.close()
+        print("✅ Saved core occupancy timeline to 'env_timeline.bin'")
+
+    if trace:
+        trace.close()
+        print("✅ Saved env-aware event trace to 'env_trace.bin'")
+
+    if timer:
+        timer.print_report('ENV phase timing')
+        timer.write('../env_phases.json', scheduler='env')
+        print("✅ Saved ENV phase timing to 'env_phases.json'")
+
+    if counters:
+        counters.print_report('ENV operation counts')
+        counters.write('../env_operations.json', scheduler='env')
+        print("✅ Saved ENV operation counts to 'env_operations.json'")
@@ -1,6 +1,14 @@
-import csv
-from aperiodic_task_sets import tasks as tasksML
+from taskset_store import load_tasksets
 from taskset import Task, current_time, SIMULATION_TIME
+from sim_trace import open_trace, TRACE_EVENTS
+from timeline import Timeline
+from phase_timer import PhaseTimer, ARRIVAL, DROP, ASSIGN, PREEMPT, EXECUTE, LOGGING
+from op_counters import OpCounter, LAXITY
+from online_metrics import StreamingMetrics
+from quantile_sketch import PrioritySketches
+from results_store import ResultsWriter
+from ready_queue import ReadyQueue
+from laxity_bounds import LaxityBounds
 
 # Config
 NUM_CORES = 8
@@ -8,25 +16,27 @@ CONTEXT_SWITCH_TIME = 1
 ALPHA = 0.7
 BETA = 0.3
 
-# Totals
-grand_total_deadline_misses = 0
-grand_total_preemptions = 0
-grand_total_data_transfers = 0
-total_busy_time = 0
+# Event trace level and core occupancy timeline for runs of this script
+TRACE_LEVEL = TRACE_EVENTS
+RECORD_TIMELINE = True
+# Per-phase wall time of the tick loop, written to ../relax_phases.json
+PROFILE_PHASES = False
+# Heap, comparison, sort, laxity and model operation counts, written to ../relax_operations.json
+COUNT_OPERATIONS = False
 
-summary_log = []
-missed_priorities_log = []
+# Results are always appended to ../results; set to experiment_db.RESULTS_DB to mirror them into SQLite
+RESULTS_DB = None
 
-def get_environment_condition(current_time):
-    if current_time < SIMULATION_TIME // 3:
+def get_environment_condition(current_time, simulation_time=SIMULATION_TIME):
+    if current_time < simulation_time // 3:
         return 'clear'
-    elif current_time < 2 * SIMULATION_TIME // 3:
+    elif current_time < 2 * simulation_time // 3:
         return 'rainy'
     else:
         return 'foggy'
 
-def get_logged_priority(original_priority):
-    condition = get_environment_condition(current_time)
+def get_logged_priority(original_priority, simulation_time=SIMULATION_TIME):
+    condition = get_environment_condition(current_time, simulation_time)
 
     if condition == 'rainy':
         if original_priority == 3:
@@ -45,160 +55,247 @@ def get_logged_priority(original_priority):
     return original_priority  # No inversion for 'clear' or unmatched cases
 
 
-for taskset_id, taskset_ in enumerate(tasksML):
-    unarrived_tasks = taskset_.copy()
-    taskset_size = len(unarrived_tasks)
-    current_time = 0
-    preemptions = 0
-    deadline_misses = 0
-    data_transfer_count = 0
-    busy_time = 0
-    wcrt = 0  # Worst-case response time (completion - arrival) for this taskset
-    completed_tasks = []
-    missed_priorities = []
-
-    for task in unarrived_tasks:
-        if not hasattr(task, 'laxity'):
-            task.laxity = task.deadline - task.burst_time
-
-    prange = max((task.priority for task in unarrived_tasks), default=1)
-    arrived_tasks = []
-    cores = [None] * NUM_CORES
-
-    print(f"\nEvaluating Taskset #{taskset_id} with Relaxation")
-    print(" t  1  |  2")
-    print("------|---")
-
-    for current_time in range(SIMULATION_TIME):
-        # Update global variables for task class
-        Task.current_time = current_time
-        Task.prange = prange
-
-        # Move arrived tasks
-        for task in unarrived_tasks[:]:
-            if task.arrival_time == current_time:
-                arrived_tasks.append(task)
-                unarrived_tasks.remove(task)
-                data_transfer_count += 1
-
-        # Remove tasks with negative laxity
-        for task in arrived_tasks[:]:
-            if task.update_laxity(current_time) < 0:
-                deadline_misses += 1
-                missed_priorities.append(get_logged_priority(task.priority))
+def ready_queue(alpha=ALPHA, beta=BETA):
+    """An empty ready queue in relaxation order.
+
+    The old sort key was computed inside list.sort(), which empties the list while it sorts,
+    so laxity always normalized to 0.5. A task's key is therefore fixed while it waits.
+    """
+    return ReadyQueue(lambda t: alpha * 0.5 + beta * t.priority)
+
+
+def simulate(tasksets, num_cores=NUM_CORES, simulation_time=SIMULATION_TIME, alpha=ALPHA, beta=BETA,
+             trace=None, timeline_file=None, verbose=True, timer=None, counters=None, sketches=None):
+    """Run the relaxation scheduler over every taskset; returns (summary_log, missed_priorities_log)."""
+    # get_logged_priority() reads the module-level clock
+    global current_time
+    summary_log = []
+    missed_priorities_log = []
+    if counters:
+        counters.watch(Task, 'update_laxity', LAXITY)
+        counters.watch_heap()
+
+    for taskset_id, taskset_ in enumerate(tasksets):
+        if counters and taskset_:
+            # Tasks from stores and generated modules are Schedulers.taskset.Task, not the Task imported here
+            counters.watch_class(type(taskset_[0]), 'update_laxity', LAXITY)
+        unarrived_tasks = taskset_.copy()
+        taskset_size = len(unarrived_tasks)
+        current_time = 0
+        preemptions = 0
+        data_transfer_count = 0
+        metrics = StreamingMetrics(sketches)  # misses, busy cycles, makespan, WCRT and response times
+        missed_priorities = []
+
+        for task in unarrived_tasks:
+            if not hasattr(task, 'laxity'):
+                task.laxity = task.deadline - task.burst_time
+
+        prange = max((task.priority for task in unarrived_tasks), default=1)
+        arrived_tasks = ready_queue(alpha, beta)
+        # The same tasks by the time their laxity runs out
+        expiry = LaxityBounds()
+        cores = [None] * num_cores
+
+        if verbose:
+            print(f"\nEvaluating Taskset #{taskset_id} with Relaxation")
+        if trace:
+            trace.taskset(taskset_id, taskset_size, num_cores, simulation_time)
+        timeline = Timeline(num_cores) if timeline_file else None
+
+        if timer:
+            timer.start()
+
+        for current_time in range(simulation_time):
+            # Update global variables for task class
+            Task.current_time = current_time
+            Task.prange = prange
+
+            # Move arrived tasks
+            for task in unarrived_tasks[:]:
+                if task.arrival_time == current_time:
+                    arrived_tasks.push(task)
+                    expiry.add(task)
+                    unarrived_tasks.remove(task)
+                    data_transfer_count += 1
+                    if trace:
+                        trace.arrival(current_time, task)
+
+            if timer:
+                timer.lap(ARRIVAL)
+
+            # Remove tasks with negative laxity, reported in ready-list order as the old scan did
+            expired = expiry.pop_expired(current_time, lambda t, now: t.update_laxity(now))
+            for task in sorted(expired, key=arrived_tasks.position):
+                metrics.miss()
+                missed_priorities.append(get_logged_priority(task.priority, simulation_time))
                 arrived_tasks.remove(task)
                 data_transfer_count += 1
-
-        # Sort tasks by relaxation
+                if trace:
+                    trace.drop(current_time, task, get_logged_priority(task.priority, simulation_time))
+
+            # Where the ready list used to be sorted
+            arrived_tasks.settle()
+            if timer:
+                timer.lap(DROP)
+
+            # Assign to empty cores
+            for core in range(num_cores):
+                if cores[core] is None and arrived_tasks:
+                    cores[core] = arrived_tasks.pop()
+                    expiry.discard(cores[core])
+                    cores[core].remaining_time += CONTEXT_SWITCH_TIME
+                    data_transfer_count += 1
+                    if trace:
+                        trace.dispatch(current_time, core, cores[core])
+
+            if timer:
+                timer.lap(ASSIGN)
+
+            # Preemption logic
+            if arrived_tasks:
+                task = arrived_tasks.first()
+                worst_core = max(
+                    [(i, t.remaining_time) for i, t in enumerate(cores) if t],
+                    key=lambda x: x[1],
+                    default=(None, -1)
+                )[0]
+
+                if (worst_core is not None and
+                    task.update_laxity(current_time) < cores[worst_core].remaining_time and
+                    task.laxity >= 0):
+                    task_out = cores[worst_core]
+                    task_in = arrived_tasks.pop()
+                    expiry.discard(task_in)
+                    cores[worst_core] = task_in
+                    arrived_tasks.push(task_out)
+                    expiry.add(task_out)
+                    preemptions += 1
+                    data_transfer_count += 2
+                    task_in.remaining_time += CONTEXT_SWITCH_TIME
+                    if trace:
+                        trace.preempt(current_time, worst_core, task_in, task_out)
+
+            if timer:
+                timer.lap(PREEMPT)
+
+            if timeline is not None:
+                timeline.observe(current_time, cores)
+            if timer:
+                timer.lap(LOGGING)
+
+            # Process tasks
+            for core in range(num_cores):
+                if cores[core]:
+                    cores[core].remaining_time -= 1
+                    metrics.busy()
+
+                    if cores[core].remaining_time <= 0:
+                        cores[core].completion_time = current_time
+                        metrics.complete(cores[core], current_time)
+                        if trace:
+                            trace.complete(current_time, core, cores[core])
+                        if cores[core].completion_time > cores[core].deadline:
+                            metrics.miss()
+                            missed_priorities.append(get_logged_priority(cores[core].priority, simulation_time))
+                        cores[core] = None
+
+            if timer:
+                timer.lap(EXECUTE)
+                timer.tick()
+            if counters:
+                counters.tick()
+
+        if timeline is not None:
+            timeline.close(simulation_time)
+            timeline.write(timeline_file, taskset_id)
+
+        # Handle incomplete tasks
         for task in arrived_tasks:
-            task.update_relaxation(arrived_tasks, current_time, alpha=ALPHA, beta=BETA)
-        arrived_tasks.sort(key=lambda t: t.update_relaxation(arrived_tasks, current_time ,alpha=ALPHA, beta=BETA))
-
-
-        # Assign to empty cores
-        for core in range(NUM_CORES):
-            if cores[core] is None and arrived_tasks:
-                cores[core] = arrived_tasks.pop(0)
-                cores[core].remaining_time += CONTEXT_SWITCH_TIME
-                data_transfer_count += 1
-
-        # Preemption logic
-        if arrived_tasks:
-            task = arrived_tasks[0]
-            worst_core = max(
-                [(i, t.remaining_time) for i, t in enumerate(cores) if t],
-                key=lambda x: x[1],
-                default=(None, -1)
-            )[0]
-
-            if (worst_core is not None and
-                task.update_laxity(current_time) < cores[worst_core].remaining_time and
-                task.laxity >= 0):
-                task_out = cores[worst_core]
-                task_in = arrived_tasks.pop(0)
-                cores[worst_core] = task_in
-                arrived_tasks.append(task_out)
-                preemptions += 1
-                data_transfer_count += 2
-                task_in.remaining_time += CONTEXT_SWITCH_TIME
-
-        # Process tasks
-        for core in range(NUM_CORES):
-            if cores[core]:
-                cores[core].remaining_time -= 1
-                busy_time += 1
-
-                if cores[core].remaining_time <= 0:
-                    cores[core].completion_time = current_time
-                    # Update WCRT upon completion
-                    try:
-                        rt = cores[core].completion_time - cores[core].arrival_time
-                        if rt > wcrt:
-                            wcrt = rt
-                    except Exception:
-                        pass
-                    completed_tasks.append(cores[core])
-                    if cores[core].completion_time > cores[core].deadline:
-                        deadline_misses += 1
-                        missed_priorities.append(get_logged_priority(cores[core].priority))
-                    cores[core] = None
-
-        core_status = [str(t.id) if t else "-" for t in cores]
-        print(f"{current_time}  {core_status[0]}  |  {core_status[1]}")
-
-    # Handle incomplete tasks
-    for task in arrived_tasks:
-        if task.remaining_time > 0:
-            deadline_misses += 1
-            missed_priorities.append(get_logged_priority(task.priority))
-            print(f"⚠️ Task {task.id} did not complete and missed its deadline.")
-
-    makespan = max((t.completion_time or 0) for t in completed_tasks) if completed_tasks else 0
-    utilization = (busy_time / (SIMULATION_TIME * NUM_CORES)) * 100
-
-    print(f"\n📈 Total Preemptions: {preemptions}")
-    print(f"💥 Total Deadline Misses: {deadline_misses}")
-    print(f"🔄 Total Data Transfers: {data_transfer_count}")
-    print(f"⏱️ Makespan: {makespan}")
-    print(f"⚡ CPU Utilization: {utilization:.2f}%")
-
-    grand_total_deadline_misses += deadline_misses
-    grand_total_preemptions += preemptions
-    grand_total_data_transfers += data_transfer_count
-    total_busy_time += busy_time
-
-    summary_log.append([taskset_id, taskset_size, preemptions, deadline_misses,
-                        data_transfer_count, f"{utilization:.2f}", makespan, wcrt])
-    missed_priorities_log.append((taskset_id, missed_priorities))
-
-# Final reporting
-overall_util = (total_busy_time / (SIMULATION_TIME * NUM_CORES * len(tasksML))) * 100
-
-print("\n🧾 Priorities of Missed Deadline Tasks:")
-for tid, plist in missed_priorities_log:
-    print(f"Taskset {tid}: {plist}")
-
-print("\n🚀 Grand Totals:")
-print(f"💥 Deadline Misses: {grand_total_deadline_misses}")
-print(f"🔄 Preemptions: {grand_total_preemptions}")
-print(f"🔁 Data Transfers: {grand_total_data_transfers}")
-print(f"⚡ Utilization: {overall_util:.2f}%")
-
-# Save CSV
-with open('../relax_taskset_summary.csv', 'w', newline='') as f:
-    writer = csv.writer(f)
-    writer.writerow([
-        'Taskset_ID',
-        'Taskset Size',
-        'Preemptions',
-        'Deadline_Misses',
-        'Data_Transfers',
-        'CPU_Utilization(%)',
-        'Makespan', 'WCRT', 'Missed_Task_Priorities'
-    ])
-    for summary, (_, priorities) in zip(summary_log, missed_priorities_log):
-        # Don't add wcrt again; it's already inside `summary`
-        writer.writerow(summary + [','.join(str(p) for p in priorities)])
-
-
-print("\n✅ Summary saved to 'relax_taskset_summary.csv'")
+            if task.remaining_time > 0:
+                metrics.miss()
+                missed_priorities.append(get_logged_priority(task.priority, simulation_time))
+                if trace:
+                    trace.miss(current_time, task, get_logged_priority(task.priority, simulation_time))
+
+        makespan = metrics.makespan
+        utilization = metrics.utilization(simulation_time, num_cores)
+
+        if verbose:
+            print(f"\n📈 Total Preemptions: {preemptions}")
+            print(f"💥 Total Deadline Misses: {metrics.misses}")
+            print(f"🔄 Total Data Transfers: {data_transfer_count}")
+            print(f"⏱️ Makespan: {makespan}")
+            print(f"⚡ CPU Utilization: {utilization:.2f}%")
+
+        summary_log.append([taskset_id, taskset_size, preemptions, metrics.misses,
+                            data_transfer_count, f"{utilization:.2f}", makespan, metrics.wcrt,
+                            metrics.mean_response, metrics.response_std])
+        missed_priorities_log.append((taskset_id, missed_priorities))
+        if timer:
+            timer.lap(LOGGING)
+        if counters:
+            counters.end_taskset(taskset_id)
+
+    if counters:
+        counters.unwatch()
+    return summary_log, missed_priorities_log
+
+
+if __name__ == "__main__":
+    tasksML = load_tasksets('aperiodic_task_sets')
+
+    # Binary event trace; render it with `python render_trace.py ../relax_trace.bin`
+    trace = open_trace('../relax_trace.bin', TRACE_LEVEL)
+    # Run-length encoded core occupancy, one (core, task, start, end) segment per context switch
+    timeline_file = open('../relax_timeline.bin', 'wb') if RECORD_TIMELINE else None
+    timer = PhaseTimer() if PROFILE_PHASES else None
+    counters = OpCounter() if COUNT_OPERATIONS else None
+    # Response-time and lateness percentiles per priority, saved next to the results
+    sketches = PrioritySketches()
+
+    summary_log, missed_priorities_log = simulate(tasksML, trace=trace, timeline_file=timeline_file, timer=timer,
+                                                  counters=counters, sketches=sketches)
+
+    # Final reporting
+    overall_util = sum(float(row[5]) for row in summary_log) / max(len(tasksML), 1)
+
+    print("\n🧾 Priorities of Missed Deadline Tasks:")
+    for tid, plist in missed_priorities_log:
+        print(f"Taskset {tid}: {plist}")
+
+    print("\n🚀 Grand Totals:")
+    print(f"💥 Deadline Misses: {sum(row[3] for row in summary_log)}")
+    print(f"🔄 Preemptions: {sum(row[2] for row in summary_log)}")
+    print(f"🔁 Data Transfers: {sum(row[4] for row in summary_log)}")
+    print(f"⚡ Utilization: {overall_util:.2f}%")
+
+    # Save CSV
+    config = {'num_cores': NUM_CORES, 'context_switch_time': CONTEXT_SWITCH_TIME,
+              'simulation_time': SIMULATION_TIME, 'tasksets': 'aperiodic_task_sets',
+              'alpha': ALPHA, 'beta': BETA}
+    with ResultsWriter('relax', config, db=RESULTS_DB) as results:
+        for summary, (_, priorities) in zip(summary_log, missed_priorities_log):
+            results.append_summary(summary, priorities)
+        results.write_sketches(sketches)
+
+    print(f"\n✅ Appended relaxation taskset summaries to '{results.path}' (run {results.run_id})")
+    print(f"✅ Saved relaxation response-time percentiles to '{results.sketches_path}'")
+
+    if timeline_file:
+        timeline_file.close()
+        print("✅ Saved core occupancy timeline to 'relax_timeline.bin'")
+
+    if trace:
+        trace.close()
+        print("✅ Saved relaxation event trace to 'relax_trace.bin'")
+
+    if timer:
+        timer.print_report('Relaxation phase timing')
+        timer.write('../relax_phases.json', scheduler='relax')
+        print("✅ Saved Relaxation phase timing to 'relax_phases.json'")
+
+    if counters:
+        counters.print_report('Relaxation operation counts')
+        counters.write('../relax_operations.json', scheduler='relax')
+        print("✅ Saved Relaxation operation counts to 'relax_operations.json'")
@@ -1,179 +1,263 @@
-import joblib
-import csv
 import warnings
-from aperiodic_task_sets import tasks as tasks
+from taskset_store import load_tasksets
 from taskset import SIMULATION_TIME
+from model_store import load_model
+from sim_trace import open_trace, TRACE_EVENTS
+from timeline import Timeline
+from phase_timer import PhaseTimer, ARRIVAL, SORT, ASSIGN, EXECUTE, LOGGING
+from op_counters import OpCounter, MODEL
+from online_metrics import StreamingMetrics
+from quantile_sketch import PrioritySketches
+from results_store import ResultsWriter
 
 warnings.filterwarnings("ignore")
-model = joblib.load('../relaxation_rf_model.pkl')
+# Flattened forest arrays are memory-mapped when exported, otherwise the pickle is
+MODEL_PATH = '../relaxation_rf_model.pkl'
+FOREST_DIR = '../relaxation_rf_forest'
 
 NUM_CORES = 2
 CONTEXT_SWITCH_TIME = 1
 
-correct_predictions = 0
-total_predictions = 0
-grand_total_deadline_misses = 0
-grand_total_preemptions = 0
-grand_total_utilization = 0
-
-summary_log = []
-missed_priorities_log = []
-
-for taskset_id, taskset_ in enumerate(tasks):
-    unarrived_tasks = taskset_.copy()
-    current_time = 0
-    deadline_misses = 0
-    preemptions = 0
-    busy_time = 0
-    wcrt = 0  # ✅ Worst-case response time (completion - arrival) for this taskset
-    completed_tasks = []
-    missed_priorities = []
-
-    # Initialize task attributes
-    for task in unarrived_tasks:
-        task.remaining_time = task.burst_time
-        task.laxity = task.deadline - task.burst_time
-        task.completion_time = None
-
-    active_tasks = []
-    cores = [None] * NUM_CORES
-
-    print(f"\nEvaluating Taskset #{taskset_id}\n t  1  |  2\n------|---")
-
-    for current_time in range(SIMULATION_TIME):
-        # Move arrived tasks to active queue
-        for task in unarrived_tasks[:]:
-            if task.arrival_time == current_time:
-                active_tasks.append(task)
-                unarrived_tasks.remove(task)
-
-        # Sort active tasks by (deadline, laxity)
-        active_tasks.sort(key=lambda t: (t.deadline, t.laxity))
-
-        # Core assignment
-        for core_id in range(NUM_CORES):
-            if cores[core_id] is None and active_tasks:
-                task = active_tasks[0]  # Peek the first task
-
-                features = [[
-                    taskset_id,
-                    current_time,
-                    task.remaining_time,
-                    task.deadline,
-                    getattr(task, 'priority', 0),
-                    task.laxity
-                ]]
-
-                predicted_core = model.predict(features)[0]
-                assigned_core = None
-
-                if cores[predicted_core] is None:
-                    assigned_core = predicted_core
-                else:
-                    if cores[predicted_core].remaining_time > task.remaining_time:
-                        # Preempt the current task
-                        active_tasks.append(cores[predicted_core])
-                        cores[predicted_core] = None
-                        preemptions += 1
-                        task.remaining_time += CONTEXT_SWITCH_TIME
+# Event trace level and core occupancy timeline for runs of this script
+TRACE_LEVEL = TRACE_EVENTS
+RECORD_TIMELINE = True
+# Per-phase wall time of the tick loop, written to ../rf_phases.json
+PROFILE_PHASES = False
+# Heap, comparison, sort, laxity and model operation counts, written to ../rf_operations.json
+COUNT_OPERATIONS = False
+
+# Results are always appended to ../results; set to experiment_db.RESULTS_DB to mirror them into SQLite
+RESULTS_DB = None
+
+
+def simulate(tasksets, model, num_cores=NUM_CORES, simulation_time=SIMULATION_TIME, trace=None, timeline_file=None,
+             verbose=True, timer=None, counters=None, sketches=None):
+    """Run the RF core-assignment scheduler over every taskset.
+
+    Returns (summary_log, missed_priorities_log, (correct_predictions, total_predictions)).
+    """
+    correct_predictions = 0
+    total_predictions = 0
+    summary_log = []
+    missed_priorities_log = []
+
+    for taskset_id, taskset_ in enumerate(tasksets):
+        unarrived_tasks = taskset_.copy()
+        current_time = 0
+        preemptions = 0
+        metrics = StreamingMetrics(sketches)  # misses, busy cycles, makespan, WCRT and response times
+        missed_priorities = []
+
+        # Initialize task attributes
+        for task in unarrived_tasks:
+            task.remaining_time = task.burst_time
+            task.laxity = task.deadline - task.burst_time
+            task.completion_time = None
+
+        active_tasks = []
+        cores = [None] * num_cores
+
+        if verbose:
+            print(f"\nEvaluating Taskset #{taskset_id}")
+        if trace:
+            trace.taskset(taskset_id, len(taskset_), num_cores, simulation_time)
+        timeline = Timeline(num_cores) if timeline_file else None
+
+        if timer:
+            timer.start()
+
+        for current_time in range(simulation_time):
+            # Move arrived tasks to active queue
+            for task in unarrived_tasks[:]:
+                if task.arrival_time == current_time:
+                    active_tasks.append(task)
+                    unarrived_tasks.remove(task)
+                    if trace:
+                        trace.arrival(current_time, task)
+
+            if timer:
+                timer.lap(ARRIVAL)
+
+            # Sort active tasks by (deadline, laxity)
+            key = lambda t: (t.deadline, t.laxity)
+            active_tasks.sort(key=counters.sorted_key(key, len(active_tasks)) if counters else key)
+            if timer:
+                timer.lap(SORT)
+
+            # Core assignment
+            for core_id in range(num_cores):
+                if cores[core_id] is None and active_tasks:
+                    task = active_tasks[0]  # Peek the first task
+
+                    features = [[
+                        taskset_id,
+                        current_time,
+                        task.remaining_time,
+                        task.deadline,
+                        getattr(task, 'priority', 0),
+                        task.laxity
+                    ]]
+
+                    if counters:
+                        counters.add(MODEL)
+                    predicted_core = model.predict(features)[0]
+                    assigned_core = None
+                    task_out = None
+
+                    if cores[predicted_core] is None:
                         assigned_core = predicted_core
                     else:
-                        if cores[core_id] is None:
-                            assigned_core = core_id
-
-                if assigned_core is not None and cores[assigned_core] is None:
-                    # Sort again before popping
-                    active_tasks.sort(key=lambda t: (t.deadline, t.laxity))
-                    task = active_tasks.pop(0)
-                    task.remaining_time += CONTEXT_SWITCH_TIME
-                    cores[assigned_core] = task
-
-                    if assigned_core == predicted_core:
-                        correct_predictions += 1
-                    total_predictions += 1
-
-        # Execute tasks
-        for core_id in range(NUM_CORES):
-            task = cores[core_id]
-            if task:
-                task.remaining_time -= 1
-                busy_time += 1
-                if task.remaining_time <= 0:
-                    task.completion_time = current_time
-                    # ✅ Update WCRT upon completion
-                    try:
-                        rt = task.completion_time - task.arrival_time
-                        if rt > wcrt:
-                            wcrt = rt
-                    except Exception:
-                        pass
-
-                    completed_tasks.append(task)
-                    if current_time > task.deadline:
-                        deadline_misses += 1
-                        missed_priorities.append(getattr(task, 'priority', -1))
-                    cores[core_id] = None
-
-        # Print core status
-        core_status = [str(cores[i].id) if cores[i] else "-" for i in range(NUM_CORES)]
-        print(f"{current_time:02d}  {core_status[0]}  |  {core_status[1]}")
-
-    # Handle unfinished tasks
-    for task in active_tasks:
-        if task.remaining_time > 0:
-            deadline_misses += 1
-            missed_priorities.append(getattr(task, 'priority', -1))
-            print(f"⚠️ Task {task.id} did not complete and missed its deadline.")
-
-    # Makespan and Utilization
-    makespan = max((t.completion_time for t in completed_tasks), default=0)
-    utilization = (busy_time / (SIMULATION_TIME * NUM_CORES)) * 100
-
-    summary_log.append([
-        taskset_id,
-        len(taskset_),
-        preemptions,
-        deadline_misses,
-        0,  # No data transfer tracking
-        f"{utilization:.2f}",
-        makespan,
-        wcrt,  # ✅ include WCRT in the summary row
-    ])
-    missed_priorities_log.append((taskset_id, missed_priorities))
-
-    grand_total_deadline_misses += deadline_misses
-    grand_total_preemptions += preemptions
-    grand_total_utilization += busy_time
-
-# Final evaluation
-print("\nFinal Evaluation Results")
-print(f"Total Predictions: {total_predictions}")
-print(f"Correct Predictions: {correct_predictions}")
-accuracy = (correct_predictions / total_predictions) * 100 if total_predictions > 0 else 0
-print(f"Core Assignment Accuracy: {accuracy:.2f}%")
-
-print("\nFinal Grand Totals:")
-print(f"Grand Total Deadline Misses: {grand_total_deadline_misses}")
-print(f"Grand Total Preemptions: {grand_total_preemptions}")
-grand_total_utilization = (grand_total_utilization / (SIMULATION_TIME * NUM_CORES * len(tasks))) * 100
-print(f"Grand Total CPU Utilization: {grand_total_utilization:.2f}%")
-
-# Save summary to CSV
-with open('../RF_taskset_summary.csv', 'w', newline='') as f:
-    writer = csv.writer(f)
-    writer.writerow([
-        'Taskset_ID',
-        'Taskset Size',
-        'Preemptions',
-        'Deadline_Misses',
-        'Data_Transfers',
-        'CPU_Utilization(%)',
-        'Makespan',
-        'WCRT',  # ✅ header includes WCRT
-        'Missed_Task_Priorities'
-    ])
-    for summary, (_, priorities) in zip(summary_log, missed_priorities_log):
-        # ✅ do NOT append wcrt again; it's already in `summary`
-        writer.writerow(summary + [','.join(str(p) for p in priorities)])
-
-print("\n✅ Saved RF taskset summaries to 'RF_taskset_summary.csv'")
+                        if cores[predicted_core].remaining_time > task.remaining_time:
+                            # Preempt the current task
+                            task_out = cores[predicted_core]
+                            active_tasks.append(task_out)
+                            cores[predicted_core] = None
+                            preemptions += 1
+                            task.remaining_time += CONTEXT_SWITCH_TIME
+                            assigned_core = predicted_core
+                        else:
+                            if cores[core_id] is None:
+                                assigned_core = core_id
+
+                    if assigned_core is not None and cores[assigned_core] is None:
+                        # Sort again before popping
+                        active_tasks.sort(key=counters.sorted_key(key, len(active_tasks)) if counters else key)
+                        task = active_tasks.pop(0)
+                        task.remaining_time += CONTEXT_SWITCH_TIME
+                        cores[assigned_core] = task
+                        # The re-sort may put another task than the peeked one on the core
+                        if trace and task_out is not None:
+                            trace.preempt(current_time, assigned_core, task, task_out)
+                        elif trace:
+                            trace.dispatch(current_time, assigned_core, task)
+
+                        if assigned_core == predicted_core:
+                            correct_predictions += 1
+                        total_predictions += 1
+
+            if timer:
+                timer.lap(ASSIGN)
+
+            if timeline is not None:
+                timeline.observe(current_time, cores)
+            if timer:
+                timer.lap(LOGGING)
+
+            # Execute tasks
+            for core_id in range(num_cores):
+                task = cores[core_id]
+                if task:
+                    task.remaining_time -= 1
+                    metrics.busy()
+                    if task.remaining_time <= 0:
+                        task.completion_time = current_time
+                        metrics.complete(task, current_time)
+                        if trace:
+                            trace.complete(current_time, core_id, task)
+                        if current_time > task.deadline:
+                            metrics.miss()
+                            missed_priorities.append(getattr(task, 'priority', -1))
+                        cores[core_id] = None
+
+            if timer:
+                timer.lap(EXECUTE)
+                timer.tick()
+            if counters:
+                counters.tick()
+
+        if timeline is not None:
+            timeline.close(simulation_time)
+            timeline.write(timeline_file, taskset_id)
+
+        # Handle unfinished tasks
+        for task in active_tasks:
+            if task.remaining_time > 0:
+                metrics.miss()
+                missed_priorities.append(getattr(task, 'priority', -1))
+                if trace:
+                    trace.miss(current_time, task, getattr(task, 'priority', -1))
+
+        # Makespan and Utilization
+        makespan = metrics.makespan
+        utilization = metrics.utilization(simulation_time, num_cores)
+
+        summary_log.append([
+            taskset_id,
+            len(taskset_),
+            preemptions,
+            metrics.misses,
+            0,  # No data transfer tracking
+            f"{utilization:.2f}",
+            makespan,
+            metrics.wcrt,  # ✅ include WCRT in the summary row
+            metrics.mean_response,
+            metrics.response_std,
+        ])
+        missed_priorities_log.append((taskset_id, missed_priorities))
+        if timer:
+            timer.lap(LOGGING)
+        if counters:
+            counters.end_taskset(taskset_id)
+
+    return summary_log, missed_priorities_log, (correct_predictions, total_predictions)
+
+
+if __name__ == "__main__":
+    tasks = load_tasksets('aperiodic_task_sets')
+    model = load_model(MODEL_PATH, forest_dir=FOREST_DIR)
+
+    # Binary event trace; render it with `python render_trace.py ../rf_trace.bin`
+    trace = open_trace('../rf_trace.bin', TRACE_LEVEL)
+    # Run-length encoded core occupancy, one (core, task, start, end) segment per context switch
+    timeline_file = open('../rf_timeline.bin', 'wb') if RECORD_TIMELINE else None
+    timer = PhaseTimer() if PROFILE_PHASES else None
+    counters = OpCounter() if COUNT_OPERATIONS else None
+    # Response-time and lateness percentiles per priority, saved next to the results
+    sketches = PrioritySketches()
+
+    summary_log, missed_priorities_log, (correct_predictions, total_predictions) = simulate(
+        tasks, model, trace=trace, timeline_file=timeline_file, timer=timer,
+        counters=counters, sketches=sketches)
+
+    # Final evaluation
+    print("\nFinal Evaluation Results")
+    print(f"Total Predictions: {total_predictions}")
+    print(f"Correct Predictions: {correct_predictions}")
+    accuracy = (correct_predictions / total_predictions) * 100 if total_predictions > 0 else 0
+    print(f"Core Assignment Accuracy: {accuracy:.2f}%")
+
+    print("\nFinal Grand Totals:")
+    print(f"Grand Total Deadline Misses: {sum(row[3] for row in summary_log)}")
+    print(f"Grand Total Preemptions: {sum(row[2] for row in summary_log)}")
+    grand_total_utilization = sum(float(row[5]) for row in summary_log) / max(len(tasks), 1)
+    print(f"Grand Total CPU Utilization: {grand_total_utilization:.2f}%")
+
+    # Save summary to CSV
+    config = {'num_cores': NUM_CORES, 'context_switch_time': CONTEXT_SWITCH_TIME,
+              'simulation_time': SIMULATION_TIME, 'tasksets': 'aperiodic_task_sets',
+              'model': MODEL_PATH}
+    with ResultsWriter('rf', config, db=RESULTS_DB) as results:
+        for summary, (_, priorities) in zip(summary_log, missed_priorities_log):
+            results.append_summary(summary, priorities)
+        results.write_sketches(sketches)
+
+    print(f"\n✅ Appended RF taskset summaries to '{results.path}' (run {results.run_id})")
+    print(f"✅ Saved RF response-time percentiles to '{results.sketches_path}'")
+
+    if timeline_file:
+        timeline_file.close()
+        print("✅ Saved core occupancy timeline to 'rf_timeline.bin'")
+
+    if trace:
+        trace.close()
+        print("✅ Saved RF event trace to 'rf_trace.bin'")
+
+    if timer:
+        timer.print_report('RF phase timing')
+        timer.write('../rf_phases.json', scheduler='rf')
+        print("✅ Saved RF phase timing to 'rf_phases.json'")
+
+    if counters:
+        counters.print_report('RF operation counts')
+        counters.write('../rf_operations.json', scheduler='rf')
+        print("✅ Saved RF operation counts to 'rf_operations.json'")
@@ -0,0 +1,304 @@
+import os
+import sys
+import json
+import math
+import time
+import argparse
+import itertools
+import platform
+import subprocess
+import multiprocessing
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from taskset_store import COLUMNS
+from vector_taskset_generator import generate_columns
+
+# Default grid; each scheduler runs every (size, cores, horizon) case it can finish within BUDGET
+SCHEDULERS = ('edf', 'mllf', 'relax', 'env', 'rf', 'enfs')
+SIZES = (10, 100, 1000, 10**4, 10**5)
+CORES = (2, 8, 64, 1024)
+HORIZONS = (50, 500)
+
+# Small tasksets are batched so every case simulates about this many tasks
+TASKS_PER_CASE = 1000
+# Offered utilization per core
+LOAD = 0.9
+SEED = 2024
+REPEATS = 3
+# Seconds per case; a larger size is skipped once its projected time exceeds this
+BUDGET = 30.0
+# compare: flag throughput drops larger than this fraction
+THRESHOLD = 0.10
+
+BENCHMARK_DIR = '../benchmarks'
+# ENFS is event driven; its simulated ticks are the makespans rather than the horizon
+EVENT_DRIVEN = ('enfs',)
+
+
+def scheduler_runner(name):
+    """Import one scheduler and return (task class, run(tasksets, num_cores, horizon, **options) -> summary_log).
+
+    Options (timer, counters) are passed on to simulate(). Schedulers patch the shared Task
+    class on import, so each one runs in its own process.
+    """
+    if name == 'edf':
+        import EDF
+        return EDF.Task, lambda tasksets, cores, horizon, **options: EDF.simulate(
+            tasksets, cores, horizon, verbose=False, **options)[0]
+    if name == 'mllf':
+        import MLLF
+        return MLLF.Task, lambda tasksets, cores, horizon, **options: MLLF.simulate(
+            tasksets, cores, horizon, verbose=False, **options)[0]
+    if name == 'relax':
+        import Proposed_relaxation as relax
+        return relax.Task, lambda tasksets, cores, horizon, **options: relax.simulate(
+            tasksets, cores, horizon, verbose=False, **options)[0]
+    if name == 'env':
+        import Proposed_ENV as env
+        from taskset import Task
+        return Task, lambda tasksets, cores, horizon, **options: env.simulate(
+            tasksets, cores, horizon, verbose=False, **options)[0]
+    if name == 'rf':
+        import Random_Forest as rf
+        from taskset import Task
+        from model_store import load_model
+        forest = load_model(rf.MODEL_PATH, forest_dir=rf.FOREST_DIR)
+        return Task, lambda tasksets, cores, horizon, **options: rf.simulate(
+            tasksets, forest, cores, horizon, verbose=False, **options)[0]
+    if name == 'enfs':
+        import ENFS
+        # Fixed rule weights: the benchmark measures scheduling, not NSGA-II training
+        fnn = ENFS.FNN(np.random.default_rng(SEED).random(243))
+        return ENFS.Task, lambda tasksets, cores, horizon, **options: ENFS.simulate(
+            tasksets, fnn, cores, horizon, verbose=False, **options)[0]
+    raise ValueError(f"unknown scheduler {name!r}")
+
+
+def case_columns(size, num_cores, horizon, seed=SEED):
+    """The tasksets of one case as columns; the same for every scheduler and every run."""
+    num_tasksets = max(1, TASKS_PER_CASE // size)
+    rng = np.random.default_rng([seed, size, num_cores, horizon])
+    return generate_columns(rng, num_tasksets, size_range=(size, size), utilization=LOAD * num_cores,
+                            horizon=horizon)
+
+
+def build_tasksets(task_class, columns, sizes):
+    rows = zip(*(columns[name].tolist() for name in COLUMNS))
+    return [[task_class(*row) for row in itertools.islice(rows, size)] for size in sizes.tolist()]
+
+
+def time_case(name, task_class, run, size, num_cores, horizon, repeats=REPEATS, budget=BUDGET):
+    """Best-of-`repeats` wall time of one case; tasks are rebuilt outside the timed region.
+
+    A single taskset is timed first; returns None when the whole case would overrun the budget.
+    """
+    columns, sizes = case_columns(size, num_cores, horizon)
+    if len(sizes) > 1:
+        probe = build_tasksets(task_class, columns, sizes)[:1]
+        start = time.perf_counter()
+        run(probe, num_cores, horizon)
+        if (time.perf_counter() - start) * len(sizes) > budget:
+            return None
+
+    times = []
+    while len(times) < repeats and (not times or sum(times) + min(times) <= budget):
+        tasksets = build_tasksets(task_class, columns, sizes)
+        start = time.perf_counter()
+        summary_log = run(tasksets, num_cores, horizon)
+        times.append(time.perf_counter() - start)
+
+    seconds = min(times)
+    tasks = int(sizes.sum())
+    if name in EVENT_DRIVEN:
+        ticks = sum(row[6] for row in summary_log)
+    else:
+        ticks = len(sizes) * horizon
+    return {
+        'tasksets': len(sizes),
+        'tasks': tasks,
+        'ticks': ticks,
+        'seconds': seconds,
+        'mean_seconds': sum(times) / len(times),
+        'repeats': len(times),
+        'tasks_per_second': tasks / seconds if seconds > 0 else None,
+        'ticks_per_second': ticks / seconds if seconds > 0 else None,
+    }
+
+
+def _projection(history, size):
+    # Seconds per taskset extrapolated from the last two sizes' scaling exponent (linear until
+    # there are two), times the number of tasksets the case will batch
+    last_size, last_seconds = history[-1]
+    exponent = 1.0
+    if len(history) > 1:
+        prev_size, prev_seconds = history[-2]
+        if prev_seconds > 0 and last_seconds > prev_seconds:
+            exponent = max(1.0, math.log(last_seconds / prev_seconds) / math.log(last_size / prev_size))
+    return last_seconds * (size / last_size) ** exponent * max(1, TASKS_PER_CASE // size)
+
+
+def run_scheduler(name, sizes=SIZES, cores=CORES, horizons=HORIZONS, repeats=REPEATS, budget=BUDGET):
+    """Every case for one scheduler; meant to run in a fresh process."""
+    results = []
+    try:
+        task_class, run = scheduler_runner(name)
+    except (ImportError, OSError) as e:
+        return [dict(scheduler=name, size=size, cores=num_cores, horizon=horizon, skipped=str(e))
+                for num_cores in cores for horizon in horizons for size in sizes]
+
+    for num_cores in cores:
+        for horizon in horizons:
+            history = []
+            over_budget = False
+            for size in sorted(sizes):
+                case = dict(scheduler=name, size=size, cores=num_cores, horizon=horizon)
+                projected = _projection(history, size) if history else 0
+                if over_budget or projected > budget:
+                    # Larger sizes only get slower
+                    over_budget = True
+                    case.update(skipped='budget')
+                    if projected:
+                        case.update(projected_seconds=projected)
+                else:
+                    try:
+                        timing = time_case(name, task_class, run, size, num_cores, horizon, repeats, budget)
+                    except Exception as e:
+                        case.update(error=f"{type(e).__name__}: {e}")
+                    else:
+                        if timing is None:
+                            over_budget = True
+                            case.update(skipped='budget')
+                        else:
+                            case.update(timing)
+                            history.append((size, case['seconds'] / case['tasksets']))
+                results.append(case)
+                print(_describe(case), flush=True)
+    return results
+
+
+def _describe(case):
+    label = f"{case['scheduler']:<6} size={case['size']:<7} cores={case['cores']:<5} horizon={case['horizon']:<5}"
+    if 'skipped' in case:
+        return f"{label} skipped ({case['skipped']})"
+    if 'error' in case:
+        return f"{label} error: {case['error']}"
+    return (f"{label} {case['seconds']:9.4f}s  {case['tasks_per_second']:12.1f} tasks/s  "
+            f"{case['ticks_per_second']:12.1f} ticks/s")
+
+
+def _git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def report_meta(**params):
+    """Machine and revision details stored with every benchmark report, plus the run's parameters."""
+    return {
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'commit': _git_commit(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'cpu_count': os.cpu_count(),
+        **params,
+    }
+
+
+def run_benchmarks(schedulers=SCHEDULERS, sizes=SIZES, cores=CORES, horizons=HORIZONS, repeats=REPEATS,
+                   budget=BUDGET):
+    """Run every scheduler in its own spawned process and return the JSON report."""
+    results = []
+    context = multiprocessing.get_context('spawn')
+    for name in schedulers:
+        with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+            results.extend(pool.submit(run_scheduler, name, sizes, cores, horizons, repeats, budget).result())
+    meta = report_meta(seed=SEED, load=LOAD, tasks_per_case=TASKS_PER_CASE, repeats=repeats, budget=budget)
+    return {'meta': meta, 'results': results}
+
+
+def _key(case):
+    return case['scheduler'], case['size'], case['cores'], case['horizon']
+
+
+def compare(baseline, current, threshold=THRESHOLD):
+    """Cases whose tasks/second fell by more than `threshold` against the baseline report.
+
+    Returns (regressions, rows) where each row is (key, baseline tasks/s, current tasks/s, ratio).
+    """
+    measured = {_key(case): case for case in baseline['results'] if case.get('tasks_per_second')}
+    rows = []
+    regressions = []
+    for case in current['results']:
+        before = measured.get(_key(case))
+        if before is None or not case.get('tasks_per_second'):
+            continue
+        ratio = case['tasks_per_second'] / before['tasks_per_second']
+        row = (_key(case), before['tasks_per_second'], case['tasks_per_second'], ratio)
+        rows.append(row)
+        if ratio < 1 - threshold:
+            regressions.append(row)
+    return regressions, rows
+
+
+def print_comparison(regressions, rows, threshold=THRESHOLD):
+    for (name, size, num_cores, horizon), before, after, ratio in rows:
+        flag = '❌' if ratio < 1 - threshold else ('🚀' if ratio > 1 + threshold else '  ')
+        print(f"{flag} {name:<6} size={size:<7} cores={num_cores:<5} horizon={horizon:<5} "
+              f"{before:12.1f} -> {after:12.1f} tasks/s ({(ratio - 1) * 100:+.1f}%)")
+    if regressions:
+        print(f"\n❌ {len(regressions)} of {len(rows)} cases regressed by more than {threshold:.0%}")
+    else:
+        print(f"\n✅ No regressions over {threshold:.0%} in {len(rows)} comparable cases")
+
+
+def parse_ints(text):
+    return tuple(int(float(value)) for value in text.split(','))
+
+
+if __name__ == "__main__":
+    # python benchmark.py run [--schedulers edf,relax] [--sizes 10,100] [--cores 2,8] [--baseline old.json]
+    # python benchmark.py compare baseline.json current.json [--threshold 0.1]
+    parser = argparse.ArgumentParser(description="Scheduler throughput benchmarks")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run = commands.add_parser('run')
+    run.add_argument('--schedulers', type=lambda text: tuple(text.split(',')), default=SCHEDULERS)
+    run.add_argument('--sizes', type=parse_ints, default=SIZES)
+    run.add_argument('--cores', type=parse_ints, default=CORES)
+    run.add_argument('--horizons', type=parse_ints, default=HORIZONS)
+    run.add_argument('--repeats', type=int, default=REPEATS)
+    run.add_argument('--budget', type=float, default=BUDGET)
+    run.add_argument('--output')
+    run.add_argument('--baseline')
+    run.add_argument('--threshold', type=float, default=THRESHOLD)
+
+    diff = commands.add_parser('compare')
+    diff.add_argument('baseline')
+    diff.add_argument('current')
+    diff.add_argument('--threshold', type=float, default=THRESHOLD)
+
+    args = parser.parse_args()
+    if args.command == 'run':
+        report = run_benchmarks(args.schedulers, args.sizes, args.cores, args.horizons, args.repeats, args.budget)
+        output = args.output or os.path.join(BENCHMARK_DIR, f"{datetime.now():%Y%m%d-%H%M%S}.json")
+        os.makedirs(os.path.dirname(output) or '.', exist_ok=True)
+        with open(output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\n✅ Saved {len(report['results'])} benchmark cases to '{output}'")
+        if args.baseline is None:
+            sys.exit(0)
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        current = report
+    else:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        with open(args.current) as f:
+            current = json.load(f)
+
+    regressions, rows = compare(baseline, current, args.threshold)
+    print_comparison(regressions, rows, args.threshold)
+    sys.exit(1 if regressions else 0)
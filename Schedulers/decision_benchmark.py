@@ -0,0 +1,290 @@
+import os
+import json
+import math
+import time
+import heapq
+import argparse
+import multiprocessing
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from benchmark import BENCHMARK_DIR, SEED, parse_ints, report_meta
+
+# Latency of single scheduling decisions as a function of ready-set size (or core count for
+# victim selection); every operation runs against the scheduler module's own code
+SCHEDULERS = ('edf', 'mllf', 'relax', 'env', 'fnn', 'rf')
+SIZES = (1, 10, 100, 1000, 10**4, 10**5)
+SAMPLES = 1000
+# Seconds per (operation, size); larger sizes are skipped once the projected p50 exceeds this
+BUDGET = 2.0
+HORIZON = 100
+
+
+def ready_set(task_class, n, rng, now=0):
+    """n arrived tasks with 1-10 cycle bursts, up to HORIZON cycles of slack and priorities 1-5."""
+    burst = rng.integers(1, 11, n).tolist()
+    slack = rng.integers(0, HORIZON, n).tolist()
+    priority = rng.integers(1, 6, n).tolist()
+    return [task_class(i + 1, now, b, now + b + s, p) for i, (b, s, p) in enumerate(zip(burst, slack, priority))]
+
+
+def _unshuffle(rng, tasks):
+    # Undo for re-ranking: start every sample from an unsorted ready set
+    return lambda _: rng.shuffle(tasks)
+
+
+def _pop_front(tasks):
+    return (lambda: tasks.pop(0)), (lambda task: tasks.insert(0, task))
+
+
+# --- Operations: name -> (axis, setup(n, rng) -> (decision, undo or None)) ---
+
+def edf_operations():
+    import EDF
+
+    def pick(n, rng):
+        heap = ready_set(EDF.Task, n, rng)
+        heapq.heapify(heap)
+        return (lambda: heapq.heappop(heap)), (lambda task: heapq.heappush(heap, task))
+
+    def arrival(n, rng):
+        heap = ready_set(EDF.Task, n, rng)
+        heapq.heapify(heap)
+        incoming = ready_set(EDF.Task, 1, rng)[0]
+
+        def undo(_):
+            heap.remove(incoming)
+            heapq.heapify(heap)
+        return (lambda: heapq.heappush(heap, incoming)), undo
+
+    def victim(n, rng):
+        cores = ready_set(EDF.Task, n, rng)
+
+        def decision():
+            worst_core = None
+            max_remaining_time = -1
+            for core in range(len(cores)):
+                if cores[core] is not None and cores[core].remaining_time > max_remaining_time:
+                    max_remaining_time = cores[core].remaining_time
+                    worst_core = core
+            return worst_core
+        return decision, None
+
+    return {'pick': ('ready', pick), 'arrival': ('ready', arrival), 'victim': ('cores', victim)}
+
+
+def mllf_operations():
+    import MLLF
+
+    def pick(n, rng):
+        heap = ready_set(MLLF.Task, n, rng)
+        heapq.heapify(heap)
+        return (lambda: heapq.heappop(heap)), (lambda task: heapq.heappush(heap, task))
+
+    def victim(n, rng):
+        cores = ready_set(MLLF.Task, n, rng)
+
+        def decision():
+            worst_core = None
+            max_laxity = -1
+            for core in range(len(cores)):
+                if cores[core] is not None and cores[core].laxity > max_laxity:
+                    max_laxity = cores[core].laxity
+                    worst_core = core
+            return worst_core
+        return decision, None
+
+    return {'pick': ('ready', pick), 'victim': ('cores', victim)}
+
+
+def relax_operations():
+    import Proposed_relaxation as relax
+
+    def queue(n, rng):
+        ready = relax.ready_queue()
+        for task in ready_set(relax.Task, n, rng):
+            ready.push(task)
+        return ready
+
+    def arrival(n, rng):
+        ready = queue(n, rng)
+        incoming = ready_set(relax.Task, 1, rng)[0]
+        return (lambda: ready.push(incoming)), (lambda _: ready.remove(incoming))
+
+    def pick(n, rng):
+        ready = queue(n, rng)
+        return ready.pop, ready.push
+
+    def drop(n, rng):
+        ready = queue(n, rng)
+        task = ready.first()
+        return (lambda: ready.remove(task)), (lambda _: ready.push(task))
+
+    return {'arrival': ('ready', arrival), 'pick': ('ready', pick), 'drop': ('ready', drop)}
+
+
+def env_operations():
+    import Proposed_ENV as env
+    from taskset import Task
+    from environment import THETA
+
+    def rerank(n, rng):
+        tasks = ready_set(Task, n, rng)
+        laxities = [env.update_laxity(t, 0) for t in tasks]
+        prange = max(t.priority for t in tasks)
+        return (lambda: env.rank_ready(tasks, 0, THETA['clear'], min(laxities), max(laxities), prange)), \
+            _unshuffle(rng, tasks)
+
+    def pick(n, rng):
+        return _pop_front(ready_set(Task, n, rng))
+
+    return {'rerank': ('ready', rerank), 'pick': ('ready', pick)}
+
+
+def fnn_operations():
+    import ENFS
+    fnn = ENFS.FNN(np.random.default_rng(SEED).random(243))
+
+    def score(n, rng):
+        return (lambda: fnn.evaluate(0.5, 2 / 3, 0.5, 0.97, 20.0)), None
+
+    def select(n, rng):
+        tasks = ready_set(ENFS.Task, n, rng)
+        return (lambda: ENFS.select_task(tasks, set(), fnn, 0, 10, 5, ENFS.NUM_CORES)), None
+
+    def emergency_sort(n, rng):
+        tasks = ready_set(ENFS.Task, n, rng)
+        app_deadline = max(t.deadline for t in tasks)
+        return (lambda: ENFS.sort_ready_list_by_emergency(tasks, app_deadline)), None
+
+    return {'score': (None, score), 'select': ('ready', select), 'emergency_sort': ('ready', emergency_sort)}
+
+
+def rf_operations():
+    import Random_Forest as rf
+    from taskset import Task
+    from model_store import load_model
+    forest = load_model(rf.MODEL_PATH, forest_dir=rf.FOREST_DIR)
+
+    def features(task):
+        return [[0, 0, task.remaining_time, task.deadline, task.priority, task.laxity]]
+
+    def predict(n, rng):
+        row = features(ready_set(Task, 1, rng)[0])
+        return (lambda: forest.predict(row)), None
+
+    def assign(n, rng):
+        # Sort the active tasks by (deadline, laxity), then ask the forest for the head's core
+        tasks = ready_set(Task, n, rng)
+
+        def decision():
+            tasks.sort(key=lambda t: (t.deadline, t.laxity))
+            return forest.predict(features(tasks[0]))
+        return decision, _unshuffle(rng, tasks)
+
+    return {'predict': (None, predict), 'assign': ('ready', assign)}
+
+
+OPERATIONS = {
+    'edf': edf_operations,
+    'mllf': mllf_operations,
+    'relax': relax_operations,
+    'env': env_operations,
+    'fnn': fnn_operations,
+    'rf': rf_operations,
+}
+
+
+def percentile(sorted_values, q):
+    # Nearest rank
+    return sorted_values[min(len(sorted_values) - 1, max(0, math.ceil(q * len(sorted_values)) - 1))]
+
+
+def measure(decision, undo, samples=SAMPLES, budget=BUDGET):
+    """Per-decision latencies in nanoseconds; undo runs outside the timed region."""
+    latencies = []
+    deadline = time.perf_counter() + budget
+    while len(latencies) < samples and (not latencies or time.perf_counter() < deadline):
+        start = time.perf_counter_ns()
+        result = decision()
+        latencies.append(time.perf_counter_ns() - start)
+        if undo is not None:
+            undo(result)
+    return latencies
+
+
+def _projected(history, n):
+    # p50 at n extrapolated from the last two sizes' scaling exponent (linear until there are two)
+    last_n, last_ns = history[-1]
+    exponent = 1.0
+    if len(history) > 1:
+        prev_n, prev_ns = history[-2]
+        if prev_ns > 0 and last_ns > prev_ns and last_n > prev_n:
+            exponent = max(1.0, math.log(last_ns / prev_ns) / math.log(last_n / prev_n))
+    return last_ns * (n / last_n) ** exponent
+
+
+def run_scheduler(name, sizes=SIZES, samples=SAMPLES, budget=BUDGET):
+    """Latency percentiles of every operation of one scheduler; meant to run in a fresh process."""
+    try:
+        operations = OPERATIONS[name]()
+    except (ImportError, OSError) as e:
+        return [dict(scheduler=name, skipped=str(e))]
+
+    results = []
+    for operation, (axis, setup) in operations.items():
+        history = []
+        for n in (sorted(sizes) if axis else (1,)):
+            case = dict(scheduler=name, operation=operation, axis=axis, n=n)
+            if history and _projected(history, n) * 1e-9 > budget:
+                case.update(skipped='budget', projected_us=_projected(history, n) / 1000)
+            else:
+                rng = np.random.default_rng([SEED, n])
+                latencies = sorted(measure(*setup(n, rng), samples, budget))
+                case.update(
+                    samples=len(latencies),
+                    p50_us=percentile(latencies, 0.50) / 1000,
+                    p99_us=percentile(latencies, 0.99) / 1000,
+                    mean_us=sum(latencies) / len(latencies) / 1000,
+                    max_us=latencies[-1] / 1000,
+                )
+                history.append((n, percentile(latencies, 0.50)))
+            results.append(case)
+            print(_describe(case), flush=True)
+    return results
+
+
+def _describe(case):
+    label = f"{case['scheduler']:<6} {case['operation']:<15} {case['axis'] or '-':<6} n={case['n']:<7}"
+    if 'skipped' in case:
+        return f"{label} skipped ({case['skipped']})"
+    return (f"{label} p50 {case['p50_us']:12.2f} µs   p99 {case['p99_us']:12.2f} µs   "
+            f"({case['samples']} samples)")
+
+
+def run_microbenchmarks(schedulers=SCHEDULERS, sizes=SIZES, samples=SAMPLES, budget=BUDGET):
+    """Run every scheduler's operations in its own spawned process and return the JSON report."""
+    results = []
+    context = multiprocessing.get_context('spawn')
+    for name in schedulers:
+        with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+            results.extend(pool.submit(run_scheduler, name, sizes, samples, budget).result())
+    return {'meta': report_meta(seed=SEED, samples=samples, budget=budget), 'results': results}
+
+
+if __name__ == "__main__":
+    # python decision_benchmark.py [--schedulers edf,relax] [--sizes 1,10,100] [--output latency.json]
+    parser = argparse.ArgumentParser(description="Scheduling-decision latency microbenchmarks")
+    parser.add_argument('--schedulers', type=lambda text: tuple(text.split(',')), default=SCHEDULERS)
+    parser.add_argument('--sizes', type=parse_ints, default=SIZES)
+    parser.add_argument('--samples', type=int, default=SAMPLES)
+    parser.add_argument('--budget', type=float, default=BUDGET)
+    parser.add_argument('--output')
+    args = parser.parse_args()
+
+    report = run_microbenchmarks(args.schedulers, args.sizes, args.samples, args.budget)
+    output = args.output or os.path.join(BENCHMARK_DIR, f"decisions-{datetime.now():%Y%m%d-%H%M%S}.json")
+    os.makedirs(os.path.dirname(output) or '.', exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"\n✅ Saved {len(report['results'])} latency cases to '{output}'")
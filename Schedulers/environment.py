@@ -0,0 +1,93 @@
+import csv
+import json
+import math
+from bisect import bisect_right
+import numpy as np
+
+# Known driving conditions; a schedule may name others, which get the defaults below
+CONDITIONS = ('clear', 'rainy', 'foggy')
+# Laxity weight per condition (theta_lambda)
+THETA = {'clear': 1.25, 'rainy': 0.84, 'foggy': 0.54}
+DEFAULT_THETA = 4
+# Base priority -> effective priority per condition; unlisted priorities are unchanged
+PRIORITY_REMAP = {
+    'rainy': {1: 3, 3: 1},
+    'foggy': {1: 2, 2: 3, 3: 1},
+}
+# Condition outside every interval of a schedule
+DEFAULT_CONDITION = 'clear'
+
+
+class EnvironmentSchedule:
+    """Piecewise-constant environment condition over simulated time.
+
+    Built from an interval list [(start, end, condition), ...] with half-open, non-overlapping
+    [start, end) intervals. Conditions are coded as small ints (`names[code]`, the known
+    CONDITIONS first) so the per-condition theta and priority tables are arrays indexed by code.
+    condition_at() finds the interval by bisecting the start times; codes() unrolls the
+    schedule into one code per tick for a whole run.
+    """
+
+    def __init__(self, intervals):
+        intervals = sorted((start, end, condition) for start, end, condition in intervals)
+        for (_, end, _), (start, _, _) in zip(intervals, intervals[1:]):
+            if start < end:
+                raise ValueError(f"environment intervals overlap at t={start}")
+        self.names = list(CONDITIONS)
+        for _, _, condition in intervals:
+            if condition not in self.names:
+                self.names.append(condition)
+        self.starts = [start for start, _, _ in intervals]
+        self.ends = [end for _, end, _ in intervals]
+        self.interval_codes = [self.names.index(condition) for _, _, condition in intervals]
+        self.default_code = self.names.index(DEFAULT_CONDITION)
+
+    @classmethod
+    def thirds(cls, simulation_time):
+        """The original schedule: clear, rainy, then foggy for each third of the run."""
+        return cls([(-math.inf, simulation_time // 3, 'clear'),
+                    (simulation_time // 3, 2 * simulation_time // 3, 'rainy'),
+                    (2 * simulation_time // 3, math.inf, 'foggy')])
+
+    @classmethod
+    def load(cls, path):
+        """Read a schedule trace: a JSON list of [start, end, condition] or CSV rows start,end,condition."""
+        if path.endswith('.json'):
+            with open(path) as f:
+                return cls([(float(start), float(end), condition) for start, end, condition in json.load(f)])
+        with open(path, newline='') as f:
+            rows = [row for row in csv.reader(f) if row and not row[0].startswith('#')]
+        if rows and rows[0][0].strip().lower() == 'start':
+            rows = rows[1:]
+        return cls([(float(start), float(end), condition.strip()) for start, end, condition in rows])
+
+    def code_at(self, time):
+        index = bisect_right(self.starts, time) - 1
+        if index < 0 or time >= self.ends[index]:
+            return self.default_code
+        return self.interval_codes[index]
+
+    def condition_at(self, time):
+        return self.names[self.code_at(time)]
+
+    def codes(self, horizon):
+        """Condition code of every tick 0 .. horizon-1."""
+        codes = np.full(horizon, self.default_code, dtype=np.int64)
+        for start, end, code in zip(self.starts, self.ends, self.interval_codes):
+            first = 0 if start <= 0 else min(horizon, math.ceil(start))
+            last = horizon if end >= horizon else max(0, math.ceil(end))
+            codes[first:last] = code
+        return codes
+
+    def theta_table(self):
+        """theta_lambda per condition code."""
+        return np.array([THETA.get(name, DEFAULT_THETA) for name in self.names], dtype=np.float64)
+
+    def priority_table(self, max_priority):
+        """[code, base priority] -> effective priority, for base priorities 0 .. max_priority."""
+        table = np.tile(np.arange(max_priority + 1, dtype=np.int64), (len(self.names), 1))
+        for code, name in enumerate(self.names):
+            for base, priority in PRIORITY_REMAP.get(name, {}).items():
+                if base <= max_priority:
+                    table[code, base] = priority
+        return table
@@ -0,0 +1,145 @@
+import sys
+import json
+import sqlite3
+from datetime import datetime
+from taskset_catalog import catalog_records
+
+# Optional SQLite mirror of the results store for interactive queries across sweeps
+RESULTS_DB = '../experiments.sqlite'
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS configs (
+    config_hash     TEXT PRIMARY KEY,
+    scheduler       TEXT NOT NULL,
+    num_cores       INTEGER,
+    simulation_time INTEGER,
+    alpha           REAL,
+    beta            REAL,
+    config_json     TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS runs (
+    run_id      TEXT PRIMARY KEY,
+    scheduler   TEXT NOT NULL,
+    config_hash TEXT NOT NULL REFERENCES configs(config_hash),
+    source      TEXT,
+    started_at  TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS tasksets (
+    source       TEXT NOT NULL,
+    taskset_id   INTEGER NOT NULL,
+    size         INTEGER NOT NULL,
+    utilization  REAL,
+    tightness    REAL,
+    arrival_span REAL,
+    PRIMARY KEY (source, taskset_id)
+);
+CREATE TABLE IF NOT EXISTS metrics (
+    run_id            TEXT NOT NULL REFERENCES runs(run_id),
+    taskset_id        INTEGER NOT NULL,
+    preemptions       INTEGER,
+    deadline_misses   INTEGER,
+    data_transfers    INTEGER,
+    utilization       REAL,
+    makespan          REAL,
+    wcrt              REAL,
+    missed_priorities TEXT,
+    mean_response     REAL,
+    response_std      REAL,
+    PRIMARY KEY (run_id, taskset_id)
+);
+CREATE INDEX IF NOT EXISTS configs_scheduler_weights ON configs(scheduler, alpha, beta);
+CREATE INDEX IF NOT EXISTS runs_config ON runs(config_hash);
+CREATE INDEX IF NOT EXISTS tasksets_tightness ON tasksets(tightness);
+CREATE INDEX IF NOT EXISTS metrics_taskset ON metrics(taskset_id, deadline_misses);
+"""
+
+# metrics columns added after the first schema; databases created before them are migrated on open
+METRICS_ADDED = [('mean_response', 'REAL'), ('response_std', 'REAL')]
+METRICS_COLUMNS = ('run_id, taskset_id, preemptions, deadline_misses, data_transfers, utilization, makespan, wcrt, '
+                   'missed_priorities, mean_response, response_std')
+
+# Mean deadline misses of every (alpha, beta) in each tightness bucket, best first
+BEST_WEIGHTS_QUERY = """
+WITH scored AS (
+    SELECT CAST(t.tightness / :bucket AS INTEGER) * :bucket AS bucket,
+           c.alpha, c.beta,
+           AVG(m.deadline_misses) AS mean_misses,
+           COUNT(*) AS samples
+    FROM metrics m
+    JOIN runs r ON r.run_id = m.run_id
+    JOIN configs c ON c.config_hash = r.config_hash
+    JOIN tasksets t ON t.source = r.source AND t.taskset_id = m.taskset_id
+    WHERE c.scheduler = :scheduler AND c.alpha IS NOT NULL
+    GROUP BY bucket, c.alpha, c.beta
+)
+SELECT bucket, alpha, beta, mean_misses, samples
+FROM (SELECT *, ROW_NUMBER() OVER (PARTITION BY bucket ORDER BY mean_misses, alpha, beta) AS rank FROM scored)
+WHERE rank = 1
+ORDER BY bucket
+"""
+
+
+class ExperimentDB:
+    def __init__(self, path=RESULTS_DB):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.executescript(SCHEMA)
+        existing = {row[1] for row in self.conn.execute('PRAGMA table_info(metrics)')}
+        with self.conn:
+            for name, kind in METRICS_ADDED:
+                if name not in existing:
+                    self.conn.execute(f'ALTER TABLE metrics ADD COLUMN {name} {kind}')
+
+    def record_run(self, run_id, scheduler, config_hash, config):
+        # Tasksets first, so a source that cannot be read leaves no run behind
+        if config.get('tasksets'):
+            self.register_tasksets(config['tasksets'])
+        with self.conn:
+            self.conn.execute(
+                'INSERT OR IGNORE INTO configs VALUES (?, ?, ?, ?, ?, ?, ?)',
+                (config_hash, scheduler, config.get('num_cores'), config.get('simulation_time'),
+                 config.get('alpha'), config.get('beta'), json.dumps(config, sort_keys=True, default=str)))
+            self.conn.execute(
+                'INSERT INTO runs VALUES (?, ?, ?, ?, ?)',
+                (run_id, scheduler, config_hash, config.get('tasksets'), datetime.now().isoformat()))
+
+    def insert_metrics(self, rows):
+        """rows: (run_id, taskset_id, preemptions, misses, transfers, utilization, makespan, wcrt, priorities,
+        mean_response, response_std)."""
+        # One transaction per batch keeps inserts off the sweep's critical path
+        with self.conn:
+            self.conn.executemany(
+                f'INSERT OR REPLACE INTO metrics ({METRICS_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)', rows)
+
+    def register_tasksets(self, source):
+        """Store per-taskset metadata once per source, copied from the source store's catalog."""
+        records = catalog_records(source)
+        known = self.conn.execute('SELECT COUNT(*) FROM tasksets WHERE source = ?', (source,)).fetchone()[0]
+        if known == len(records):
+            return
+        with self.conn:
+            self.conn.executemany(
+                'INSERT OR REPLACE INTO tasksets VALUES (?, ?, ?, ?, ?, ?)',
+                zip([source] * len(records), range(len(records)), records['size'].tolist(),
+                    records['utilization'].tolist(), records['tightness'].tolist(),
+                    records['arrival_span'].tolist()))
+
+    def best_weights_per_tightness(self, scheduler='relax', bucket=0.1):
+        rows = self.conn.execute(BEST_WEIGHTS_QUERY, {'scheduler': scheduler, 'bucket': bucket})
+        return rows.fetchall()
+
+    def close(self):
+        self.conn.close()
+
+
+if __name__ == "__main__":
+    # python experiment_db.py [scheduler] [bucket]
+    db = ExperimentDB()
+    scheduler = sys.argv[1] if len(sys.argv) > 1 else 'relax'
+    bucket = float(sys.argv[2]) if len(sys.argv) > 2 else 0.1
+    print(f"Best ALPHA/BETA per tightness bucket for {scheduler}:")
+    for bucket_start, alpha, beta, mean_misses, samples in db.best_weights_per_tightness(scheduler, bucket):
+        print(f"Tightness {bucket_start:.2f}: ALPHA={alpha}, BETA={beta} -> {mean_misses:.2f} misses ({samples} tasksets)")
+    db.close()
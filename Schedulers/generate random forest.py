@@ -29,7 +29,9 @@ print("\n📋 Classification Report:\n", classification_report(y_test, y_pred))
 print("\n🔎 Confusion Matrix:\n", confusion_matrix(y_test, y_pred))
 
 # Step 6: Save the model if needed
-import joblib
-joblib.dump(model, '../relaxation_rf_model.pkl')
+# Uncompressed pickle plus flattened tree arrays, both loadable with mmap_mode='r'
+from model_store import save_model, export_forest
+save_model(model, '../relaxation_rf_model.pkl')
+export_forest(model, '../relaxation_rf_forest')
 
-print("\n✅ Model saved as 'relaxation_rf_model.pkl'")
+print("\n✅ Model saved as 'relaxation_rf_model.pkl' and 'relaxation_rf_forest/'")
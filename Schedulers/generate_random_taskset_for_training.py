@@ -1,4 +1,5 @@
 import random
+from taskset_store import write_tasksets, store_path
 
 class Task:
     def __init__(self, id, arrival_time, burst_time, deadline, priority):
@@ -11,7 +12,7 @@ class Task:
         self.completion_time = None
         self.laxity = deadline - burst_time  # (you can recompute elsewhere if needed)
 
-def generate_random_taskset(
+def iter_random_tasksets(
     num_tasks=10,
     arrival_time_range=(0, 40),
     burst_time_range=(1, 14),
@@ -21,46 +22,40 @@ def generate_random_taskset(
     seed=None,
 ):
     """
-    Generate a list of tasksets. Each taskset is a list of tuples:
+    Yield tasksets one at a time; each is a list of tuples
     (task_id, arrival_time, burst_time, deadline, priority).
+    With num_tasksets=None the stream is unbounded.
     """
-    if seed is not None:
-        random.seed(seed)
+    rng = random.Random(seed)
 
-    all_tasksets = []
-    for _ in range(num_tasksets):
+    produced = 0
+    while num_tasksets is None or produced < num_tasksets:
         taskset = []
         # Number of tasks in this set (at least 4, at most num_tasks)
-        setsize = random.randint(4, num_tasks)
+        setsize = rng.randint(4, num_tasks)
         for task_id in range(1, setsize + 1):
-            arrival_time = random.randint(*arrival_time_range)
-            burst_time = random.randint(*burst_time_range)
-            slack = random.randint(*deadline_slack_range)
+            arrival_time = rng.randint(*arrival_time_range)
+            burst_time = rng.randint(*burst_time_range)
+            slack = rng.randint(*deadline_slack_range)
             # Deadline after the task would complete + some slack
             deadline = arrival_time + burst_time + slack
-            priority = random.randint(*priority_range)
+            priority = rng.randint(*priority_range)
 
             task = (task_id, arrival_time, burst_time, deadline, priority)
             taskset.append(task)
-        all_tasksets.append(taskset)
-    return all_tasksets
+        yield taskset
+        produced += 1
 
-# Generate random tasksets
-random_tasksets = generate_random_taskset()
+def generate_random_taskset(**kwargs):
+    """
+    Generate a list of tasksets. Each taskset is a list of tuples:
+    (task_id, arrival_time, burst_time, deadline, priority).
+    """
+    return list(iter_random_tasksets(**kwargs))
 
-# Save to a Python file that other simulators can import
-filename = 'random_taskset.py'
-with open(filename, 'w') as f:
-    f.write("from taskset import Task\n")
-    f.write("tasks = [\n")
-    for taskset in random_tasksets:
-        f.write("    [\n")
-        for (task_id, arrival_time, burst_time, deadline, priority) in taskset:
-            f.write(
-                f"        Task({task_id}, {arrival_time}, {burst_time}, {deadline}, {priority}),\n"
-            )
-        f.write("    ],\n")
-    f.write("]\n\n")
-    f.write("SIMULATION_TIME = 100\n")
+# Stream random tasksets into the binary taskset store that other simulators load
+# with load_tasksets('random_taskset'); nothing is kept in memory between tasksets
+path = store_path('random_taskset')
+count = write_tasksets(iter_random_tasksets(), path)
 
-print(f"✅ Saved random tasksets to {filename}!")
+print(f"✅ Saved {count} random tasksets to {path}!")
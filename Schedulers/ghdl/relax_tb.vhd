@@ -0,0 +1,138 @@
+-- Streams tasksets from a text file into relax_scheduler and writes its ports after every clock edge.
+--
+-- Stimulus, per taskset: a line "<taskset> <tasks>", then one line per task in arrival order,
+-- "<arrival> <task_in as 74 binary digits>". Each taskset starts from a reset. sys_time is the
+-- cycle number; the next task is offered from its arrival cycle on and task_valid is held
+-- until an edge where task_ready is high (the protocol relax_hw_model.run_model follows).
+--
+-- Results, one line per taskset and cycle:
+-- "<taskset> <cycle> <accepted> <deadline_misses> <cpu_util> <core 0 id> ... <core N-1 id>"
+library IEEE;
+use IEEE.STD_LOGIC_1164.ALL;
+use IEEE.NUMERIC_STD.ALL;
+use STD.TEXTIO.ALL;
+
+entity relax_tb is
+    generic (
+        NUM_CORES : integer := 2;
+        MAX_TASKS : integer := 16;
+        CYCLES    : integer := 50;
+        STIMULUS  : string  := "stimulus.txt";
+        RESULTS   : string  := "results.txt"
+    );
+end relax_tb;
+
+architecture sim of relax_tb is
+    constant TASK_ID_WIDTH : integer := 8;
+    constant PERIOD        : time := 10 ns;
+
+    signal clk             : std_logic := '0';
+    signal reset           : std_logic := '1';
+    signal sys_time        : std_logic_vector(31 downto 0) := (others => '0');
+    signal task_in         : std_logic_vector(73 downto 0) := (others => '0');
+    signal task_valid      : std_logic := '0';
+    signal task_ready      : std_logic;
+    signal core_status     : std_logic_vector(NUM_CORES*TASK_ID_WIDTH-1 downto 0);
+    signal deadline_misses : std_logic_vector(31 downto 0);
+    signal cpu_util        : std_logic_vector(31 downto 0);
+    signal done            : boolean := false;
+begin
+    dut : entity work.relax_scheduler
+        generic map (
+            NUM_CORES => NUM_CORES,
+            MAX_TASKS => MAX_TASKS
+        )
+        port map (
+            clk             => clk,
+            reset           => reset,
+            sys_time        => sys_time,
+            task_in         => task_in,
+            task_valid      => task_valid,
+            task_ready      => task_ready,
+            core_status     => core_status,
+            deadline_misses => deadline_misses,
+            cpu_util        => cpu_util
+        );
+
+    -- task_ready is an inout port; only the scheduler drives it
+    task_ready <= 'Z';
+
+    clk <= not clk after PERIOD / 2 when not done else '0';
+
+    stream : process
+        file stim            : text open read_mode is STIMULUS;
+        file res             : text open write_mode is RESULTS;
+        variable in_line     : line;
+        variable out_line    : line;
+        variable taskset_id  : integer;
+        variable tasks_left  : integer;
+        variable arrival     : integer;
+        variable word        : std_logic_vector(73 downto 0);
+        variable pending     : boolean;
+        variable accepted    : integer;
+    begin
+        while not endfile(stim) loop
+            readline(stim, in_line);
+            read(in_line, taskset_id);
+            read(in_line, tasks_left);
+            pending := false;
+
+            reset <= '1';
+            task_valid <= '0';
+            wait until rising_edge(clk);
+            wait until rising_edge(clk);
+            wait for 1 ns;
+            reset <= '0';
+
+            for cycle in 0 to CYCLES-1 loop
+                if not pending and tasks_left > 0 then
+                    readline(stim, in_line);
+                    read(in_line, arrival);
+                    read(in_line, word);
+                    tasks_left := tasks_left - 1;
+                    pending := true;
+                end if;
+                sys_time <= std_logic_vector(to_unsigned(cycle, 32));
+                task_in <= word;
+                if pending and arrival <= cycle then
+                    task_valid <= '1';
+                else
+                    task_valid <= '0';
+                end if;
+
+                wait until rising_edge(clk);
+                -- The scheduler samples on this edge; task_ready still shows the value it saw
+                accepted := 0;
+                if task_valid = '1' and task_ready = '1' then
+                    accepted := 1;
+                    pending := false;
+                end if;
+                wait for 1 ns;
+
+                write(out_line, taskset_id);
+                write(out_line, string'(" "));
+                write(out_line, cycle);
+                write(out_line, string'(" "));
+                write(out_line, accepted);
+                write(out_line, string'(" "));
+                write(out_line, to_integer(unsigned(deadline_misses)));
+                write(out_line, string'(" "));
+                write(out_line, to_integer(unsigned(cpu_util)));
+                for j in 0 to NUM_CORES-1 loop
+                    write(out_line, string'(" "));
+                    write(out_line, to_integer(unsigned(core_status((j+1)*TASK_ID_WIDTH-1 downto j*TASK_ID_WIDTH))));
+                end loop;
+                writeline(res, out_line);
+            end loop;
+
+            -- Tasks not offered within the horizon
+            while tasks_left > 0 loop
+                readline(stim, in_line);
+                tasks_left := tasks_left - 1;
+            end loop;
+        end loop;
+
+        done <= true;
+        wait;
+    end process;
+end sim;
@@ -0,0 +1,28 @@
+-- Stand-in for the Xilinx UNISIM library under GHDL: only the BUFG that Relax.vhd instantiates.
+-- Analyze it into library unisim: ghdl -a --std=08 --work=unisim unisim_bufg.vhd
+library IEEE;
+use IEEE.STD_LOGIC_1164.ALL;
+
+entity BUFG is
+    port (
+        I : in  std_logic;
+        O : out std_logic
+    );
+end BUFG;
+
+architecture Behavioral of BUFG is
+begin
+    O <= I;
+end Behavioral;
+
+library IEEE;
+use IEEE.STD_LOGIC_1164.ALL;
+
+package VComponents is
+    component BUFG
+        port (
+            I : in  std_logic;
+            O : out std_logic
+        );
+    end component;
+end package VComponents;
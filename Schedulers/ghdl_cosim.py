@@ -0,0 +1,209 @@
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import subprocess
+import numpy as np
+from benchmark import SCHEDULERS
+from taskset_store import load_tasksets
+from relax_hw_model import (NUM_CORES, MAX_TASKS, HORIZON, TASK_IN_WIDTH, ID_MASK, offers, pack_task, run_model,
+                            running_tasks, software_run, divergent_ticks)
+
+# Co-simulate Relax.vhd under GHDL against the cycle model and the Python schedulers
+GHDL = 'ghdl'
+GHDL_FLAGS = ['--std=08']
+# Relax.vhd converts 'U' current_time on the first edge after reset; numeric_std warns about it
+RUN_FLAGS = ['--ieee-asserts=disable']
+HERE = os.path.dirname(os.path.abspath(__file__))
+DESIGN = os.path.join(HERE, 'Relax.vhd')
+UNISIM_STUB = os.path.join(HERE, 'ghdl', 'unisim_bufg.vhd')
+TESTBENCH = os.path.join(HERE, 'ghdl', 'relax_tb.vhd')
+TOP = 'relax_tb'
+WORK_DIR = '../ghdl_work'
+COSIM_FILE = '../relax_cosim.json'
+TRACE_FIELDS = ('accepted', 'deadline_misses', 'cpu_util', 'core_status')
+
+
+def write_stimulus(tasksets, path):
+    """Stimulus file for relax_tb: a '<taskset> <tasks>' line, then '<arrival> <task_in bits>' per task."""
+    arrival, fields, count, _ = offers(tasksets)
+    with open(path, 'w') as f:
+        for b in range(len(tasksets)):
+            f.write(f"{b} {count[b]}\n")
+            f.writelines(f"{arrival[b, k]} {pack_task(*fields[b, k].tolist()):0{TASK_IN_WIDTH}b}\n"
+                         for k in range(count[b]))
+
+
+def read_results(path, num_tasksets, cycles, num_cores):
+    """relax_tb's results file as run_model's trace arrays."""
+    data = np.loadtxt(path, dtype=np.int64, ndmin=2).reshape(num_tasksets, cycles, 5 + num_cores)
+    return {
+        'accepted': data[:, :, 2].astype(bool),
+        'deadline_misses': data[:, :, 3],
+        'cpu_util': data[:, :, 4],
+        'core_status': data[:, :, 5:],
+    }
+
+
+def _ghdl(*args, cwd):
+    result = subprocess.run([GHDL, *args], cwd=cwd, capture_output=True, text=True)
+    if result.returncode:
+        raise RuntimeError(f"ghdl {args[0]} failed:\n{result.stdout}{result.stderr}")
+    return result
+
+
+def build(work_dir=WORK_DIR):
+    """Analyze the UNISIM stub into library unisim, then Relax.vhd and the testbench, and elaborate."""
+    if shutil.which(GHDL) is None:
+        raise RuntimeError(f"'{GHDL}' not found on PATH; install GHDL to co-simulate Relax.vhd")
+    os.makedirs(work_dir, exist_ok=True)
+    paths = ['--workdir=.', '-P.']
+    _ghdl('-a', *GHDL_FLAGS, *paths, '--work=unisim', UNISIM_STUB, cwd=work_dir)
+    _ghdl('-a', *GHDL_FLAGS, *paths, DESIGN, TESTBENCH, cwd=work_dir)
+    _ghdl('-e', *GHDL_FLAGS, *paths, TOP, cwd=work_dir)
+
+
+def run_ghdl(tasksets, cycles=HORIZON, num_cores=NUM_CORES, max_tasks=MAX_TASKS, work_dir=WORK_DIR):
+    """Simulate every taskset in one GHDL run; returns (trace, seconds) with the trace as in read_results()."""
+    build(work_dir)
+    stimulus = os.path.abspath(os.path.join(work_dir, 'stimulus.txt'))
+    results = os.path.abspath(os.path.join(work_dir, 'results.txt'))
+    write_stimulus(tasksets, stimulus)
+    start = time.perf_counter()
+    _ghdl('-r', *GHDL_FLAGS, '--workdir=.', '-P.', TOP, f'-gNUM_CORES={num_cores}', f'-gMAX_TASKS={max_tasks}',
+          f'-gCYCLES={cycles}', f'-gSTIMULUS={stimulus}', f'-gRESULTS={results}', *RUN_FLAGS, cwd=work_dir)
+    seconds = time.perf_counter() - start
+    return read_results(results, len(tasksets), cycles, num_cores), seconds
+
+
+def first_mismatch(trace, reference):
+    """(taskset, cycle, field) of the earliest difference between two traces, or None."""
+    found = None
+    for name in TRACE_FIELDS:
+        differs = trace[name] != reference[name]
+        if differs.ndim == 3:
+            differs = differs.any(axis=2)
+        if differs.any():
+            b, cycle = np.argwhere(differs)[0].tolist()
+            if found is None or (b, cycle) < found[:2]:
+                found = (b, cycle, name)
+    return found
+
+
+def hardware_running(trace, reference, slot_task, tasksets):
+    """(batch, cycles, cores) positions of the tasks GHDL runs, -1 idle.
+
+    core_status only shows a task's low 8 bits, with 0 for idle, so on its own it cannot tell
+    task 0 from an idle core or two tasks sharing those bits. While the GHDL trace matches the
+    model's, the model's slots give the exact positions. After a taskset's first mismatch the
+    ids are mapped back instead: the first task with that id, and 0 taken as idle.
+    """
+    agrees = np.ones(trace['accepted'].shape, bool)
+    for name in TRACE_FIELDS:
+        same = trace[name] == reference[name]
+        agrees &= same.all(axis=2) if same.ndim == 3 else same
+    agrees = np.logical_and.accumulate(agrees, axis=1)
+
+    by_id = np.full(trace['core_status'].shape, -1, np.int64)
+    for b, taskset_ in enumerate(tasksets):
+        position = np.full(ID_MASK + 1, -1, np.int64)
+        for k in reversed(range(len(taskset_))):
+            position[taskset_[k].id & ID_MASK] = k
+        position[0] = -1
+        by_id[b] = position[trace['core_status'][b] & ID_MASK]
+    return np.where(agrees[:, :, None], running_tasks(reference['slots'], slot_task), by_id)
+
+
+def dispatch_latency(running, tasksets):
+    """Per taskset, cycles from arrival to first dispatch of every task that ran, from (batch, cycles, cores) positions."""
+    latencies = []
+    for b, taskset_ in enumerate(tasksets):
+        first = {}
+        for cycle, positions in enumerate(running[b].tolist()):
+            for position in positions:
+                if position >= 0 and position not in first:
+                    first[position] = cycle
+        latencies.append([first[k] - taskset_[k].arrival_time for k in sorted(first)])
+    return latencies
+
+
+def cosimulate(tasksets, cycles=HORIZON, num_cores=NUM_CORES, max_tasks=MAX_TASKS, scheduler='relax',
+               work_dir=WORK_DIR):
+    """Run Relax.vhd under GHDL and compare it with the cycle model and a Python scheduler.
+
+    The GHDL trace has to match relax_hw_model cycle for cycle. Against the software scheduler
+    it reports, per taskset, final deadline_misses and cpu_util next to the scheduler's misses
+    and utilization, the ticks where the two run a different set of tasks, and the dispatch
+    latency of both: cycles from a task's arrival to its first cycle on a core. Both sides are
+    compared as task positions (see hardware_running()), as relax_hw_model.divergences() does,
+    so the two reports agree whenever GHDL matches the model.
+    """
+    trace, ghdl_seconds = run_ghdl(tasksets, cycles, num_cores, max_tasks, work_dir)
+    start = time.perf_counter()
+    _, slot_task, reference = run_model(tasksets, cycles, num_cores, max_tasks)
+    model_seconds = time.perf_counter() - start
+    mismatch = first_mismatch(trace, reference)
+
+    summary_log, occupancy = software_run(scheduler, tasksets, cycles, num_cores)
+    hw_running = hardware_running(trace, reference, slot_task, tasksets)
+    hw_latency = dispatch_latency(hw_running, tasksets)
+    sw_latency = dispatch_latency(occupancy, tasksets)
+
+    rows = []
+    for b, taskset_ in enumerate(tasksets):
+        differs = divergent_ticks(hw_running[b], occupancy[b])
+        rows.append({
+            'taskset': b, 'tasks': len(taskset_), 'accepted': int(trace['accepted'][b].sum()),
+            'hw_misses': int(trace['deadline_misses'][b, -1]), 'sw_misses': summary_log[b][3],
+            'hw_cpu_util': int(trace['cpu_util'][b, -1]), 'sw_utilization': float(summary_log[b][5]),
+            'divergent_ticks': len(differs), 'first_divergence': differs[0] if differs else None,
+            'hw_latency': float(np.mean(hw_latency[b])) if hw_latency[b] else None,
+            'sw_latency': float(np.mean(sw_latency[b])) if sw_latency[b] else None,
+        })
+    return {
+        'scheduler': scheduler, 'num_cores': num_cores, 'max_tasks': max_tasks, 'cycles': cycles,
+        'ghdl_seconds': ghdl_seconds, 'model_seconds': model_seconds,
+        'model_mismatch': dict(zip(('taskset', 'cycle', 'field'), mismatch)) if mismatch else None,
+        'tasksets': rows,
+    }
+
+
+if __name__ == "__main__":
+    # python ghdl_cosim.py [--against relax] [--cores 2] [--max-tasks 16] [--horizon 50] [--tasksets 20]
+    parser = argparse.ArgumentParser(description="Co-simulate Relax.vhd under GHDL")
+    parser.add_argument('--against', choices=SCHEDULERS, default='relax', help="Python scheduler to compare with")
+    parser.add_argument('--cores', type=int, default=NUM_CORES)
+    parser.add_argument('--max-tasks', type=int, default=MAX_TASKS)
+    parser.add_argument('--horizon', type=int, default=HORIZON)
+    parser.add_argument('--tasksets', type=int, help="only the first N of aperiodic_task_sets")
+    parser.add_argument('--work-dir', default=WORK_DIR)
+    args = parser.parse_args()
+
+    store = load_tasksets('aperiodic_task_sets')
+    tasksets = [store[i] for i in range(min(args.tasksets or len(store), len(store)))]
+    try:
+        report = cosimulate(tasksets, args.horizon, args.cores, args.max_tasks, args.against, args.work_dir)
+    except RuntimeError as e:
+        sys.exit(f"❌ {e}")
+
+    print(f"{'Taskset':>7} {'Accepted':>8} {'HW miss':>7} {'SW miss':>7} {'HW util':>7} {'SW util':>7} "
+          f"{'Diverge':>7} {'HW lat':>6} {'SW lat':>6}")
+    for row in report['tasksets']:
+        latency = [f"{row[k]:6.2f}" if row[k] is not None else f"{'-':>6}" for k in ('hw_latency', 'sw_latency')]
+        print(f"{row['taskset']:>7} {row['accepted']:>8} {row['hw_misses']:>7} {row['sw_misses']:>7} "
+              f"{row['hw_cpu_util']:>7} {row['sw_utilization']:>7.2f} {row['divergent_ticks']:>7} "
+              f"{latency[0]} {latency[1]}")
+
+    mismatch = report['model_mismatch']
+    if mismatch:
+        print(f"\n❌ GHDL and relax_hw_model differ first at taskset {mismatch['taskset']}, "
+              f"cycle {mismatch['cycle']} ({mismatch['field']})")
+    else:
+        print("\n✅ GHDL matches relax_hw_model on every cycle")
+    print(f"⏱️ GHDL {report['ghdl_seconds']:.2f}s, model {report['model_seconds']:.3f}s "
+          f"for {len(tasksets)} tasksets x {args.horizon} cycles")
+    with open(COSIM_FILE, 'w') as f:
+        json.dump(report, f, indent=2)
+    print("✅ Saved co-simulation report to 'relax_cosim.json'")
@@ -0,0 +1,96 @@
+import heapq
+from itertools import count
+
+# Rebuild the heaps once they hold this many times more entries than live tasks
+COMPACT_RATIO = 2
+COMPACT_MIN = 64
+
+
+def laxity_key(task):
+    """deadline - remaining_time: laxity at time t is this minus t while the task is not running."""
+    return task.deadline - task.remaining_time
+
+
+class LaxityBounds:
+    """Smallest and largest laxity over a changing set of tasks that are not running.
+
+    A task that is not on a core keeps its remaining time, so its laxity falls by one per tick
+    like every other waiting task's and the order by laxity_key() never changes. The bounds
+    are therefore the tasks at the top of a min-heap and a max-heap of keys, read in O(1)
+    per tick instead of recomputing every laxity. Removal is lazy: discard() forgets the
+    task's entry token and stale entries are skipped when they reach the top. The key is
+    read when the task is added, so a task whose remaining time changes (it ran) has to be
+    discarded and added again.
+    """
+
+    def __init__(self, tasks=()):
+        self._seq = count()
+        self._live = {}
+        self._min = []
+        self._max = []
+        for task in tasks:
+            key, seq = self._track(task)
+            self._min.append((key, seq, task))
+            self._max.append((-key, seq, task))
+        heapq.heapify(self._min)
+        heapq.heapify(self._max)
+
+    def _track(self, task):
+        seq = next(self._seq)
+        self._live[id(task)] = seq
+        return laxity_key(task), seq
+
+    def __len__(self):
+        return len(self._live)
+
+    def __contains__(self, task):
+        return id(task) in self._live
+
+    def add(self, task):
+        key, seq = self._track(task)
+        heapq.heappush(self._min, (key, seq, task))
+        heapq.heappush(self._max, (-key, seq, task))
+
+    def discard(self, task):
+        if self._live.pop(id(task), None) is None:
+            return
+        if len(self._min) > max(COMPACT_MIN, COMPACT_RATIO * len(self._live)):
+            self._compact()
+
+    def _compact(self):
+        self._min = [entry for entry in self._min if self._live.get(id(entry[2])) == entry[1]]
+        self._max = [entry for entry in self._max if self._live.get(id(entry[2])) == entry[1]]
+        heapq.heapify(self._min)
+        heapq.heapify(self._max)
+
+    def _top(self, heap):
+        while heap and self._live.get(id(heap[0][2])) != heap[0][1]:
+            heapq.heappop(heap)
+        return heap[0][2] if heap else None
+
+    def first(self):
+        """Task with the least laxity, or None."""
+        return self._top(self._min)
+
+    def last(self):
+        """Task with the most laxity, or None."""
+        return self._top(self._max)
+
+    def bounds(self, current_time, laxity, default=(0, 1)):
+        """(min, max) of laxity(task, current_time) over the set, or `default` when it is empty."""
+        if not self._live:
+            return default
+        return laxity(self.first(), current_time), laxity(self.last(), current_time)
+
+    def pop_expired(self, current_time, laxity):
+        """Remove and return the tasks whose laxity(task, current_time) is negative, least laxity first.
+
+        Only the expired tasks and the first one still ahead of its deadline are looked at.
+        """
+        expired = []
+        task = self.first()
+        while task is not None and laxity(task, current_time) < 0:
+            self.discard(task)
+            expired.append(task)
+            task = self.first()
+        return expired
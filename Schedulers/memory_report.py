@@ -0,0 +1,153 @@
+import sys
+import json
+import tracemalloc
+from phase_timer import PHASES
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# Frames kept per traced allocation; 1 attributes each block to the line that allocated it
+TRACE_FRAMES = 1
+TOP_ALLOCATORS = 15
+# Top allocators are re-taken whenever growth over the baseline rises this fraction (and at least
+# SNAPSHOT_STEP bytes) past the last snapshot
+SNAPSHOT_GROWTH = 0.10
+SNAPSHOT_STEP = 64 * 1024
+
+
+def peak_rss():
+    """Process high-water resident set size in bytes, or None where getrusage is unavailable."""
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    return rss if sys.platform == 'darwin' else rss * 1024
+
+
+def _top(snapshot, baseline, limit):
+    # Growth per source line since the baseline, leaving out the tracker's own bookkeeping
+    snapshot = snapshot.filter_traces([tracemalloc.Filter(False, tracemalloc.__file__),
+                                       tracemalloc.Filter(False, __file__)])
+    stats = snapshot.compare_to(baseline, 'lineno')
+    return [{'location': f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}",
+             'bytes': stat.size_diff, 'blocks': stat.count_diff}
+            for stat in stats[:limit] if stat.size_diff > 0]
+
+
+class MemoryBudgetExceeded(MemoryError):
+    """Traced memory went over the budget; carries the phase and the top allocators at that point."""
+
+    def __init__(self, phase, traced, budget, top):
+        super().__init__(f"{traced / 2**20:.1f} MiB traced in phase '{phase}' exceeds the "
+                         f"{budget / 2**20:.1f} MiB budget")
+        self.phase = phase
+        self.traced = traced
+        self.budget = budget
+        self.top = top
+
+
+class MemoryTracker:
+    """Charges traced allocations and RSS growth to tick phases, like PhaseTimer does wall time.
+
+    Pass it to simulate() as `timer`. Tracing starts when the tracker is created, so create it
+    before building the tasksets; what is live when the first taskset starts (imports, the
+    tasksets) is the baseline. Each lap records the net bytes the phase left behind and the
+    highest traced total reached during it. The top allocators are snapshotted as traced
+    memory climbs, so the report shows what was live near the peak rather than after the
+    run freed it. With a budget, a lap whose peak exceeds it raises MemoryBudgetExceeded.
+    tracemalloc slows the simulators several times over, so this is a report mode only.
+    """
+
+    def __init__(self, budget=None, frames=TRACE_FRAMES):
+        self.budget = budget
+        self.net = [0] * len(PHASES)
+        self.peak = [0] * len(PHASES)
+        self.rss_growth = [0] * len(PHASES)
+        self.calls = [0] * len(PHASES)
+        self.ticks = 0
+        self._started_tracing = not tracemalloc.is_tracing()
+        if self._started_tracing:
+            tracemalloc.start(frames)
+        self.baseline = None
+        self.baseline_bytes = 0
+        self.peak_top = []
+        self._snapshot_bytes = 0
+
+    def start(self):
+        if self.baseline is None:
+            self.baseline = tracemalloc.take_snapshot()
+            self.baseline_bytes = self._snapshot_bytes = tracemalloc.get_traced_memory()[0]
+        self.last = tracemalloc.get_traced_memory()[0]
+        self.last_rss = peak_rss()
+        tracemalloc.reset_peak()
+
+    def lap(self, phase):
+        current, peak = tracemalloc.get_traced_memory()
+        self.net[phase] += current - self.last
+        self.peak[phase] = max(self.peak[phase], peak)
+        self.calls[phase] += 1
+        self.last = current
+        tracemalloc.reset_peak()
+        if self.last_rss is not None:
+            rss = peak_rss()
+            self.rss_growth[phase] += rss - self.last_rss
+            self.last_rss = rss
+        if self.budget is not None and peak > self.budget:
+            raise MemoryBudgetExceeded(PHASES[phase], peak, self.budget, self.top_allocators())
+        growth = self._snapshot_bytes - self.baseline_bytes
+        if current > self._snapshot_bytes + max(SNAPSHOT_STEP, growth * SNAPSHOT_GROWTH):
+            self.peak_top = self.top_allocators()
+            self._snapshot_bytes = current
+
+    def tick(self):
+        self.ticks += 1
+
+    def top_allocators(self, limit=TOP_ALLOCATORS):
+        """Source lines holding the most memory allocated since the baseline."""
+        if self.baseline is None:
+            return []
+        return _top(tracemalloc.take_snapshot(), self.baseline, limit)
+
+    def stop(self):
+        if self._started_tracing and tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+    def report(self, top=None):
+        phases = {}
+        for phase, name in enumerate(PHASES):
+            if self.calls[phase]:
+                phases[name] = {
+                    'net_bytes': self.net[phase],
+                    'peak_traced_bytes': self.peak[phase],
+                    'rss_growth_bytes': self.rss_growth[phase],
+                    'calls': self.calls[phase],
+                }
+        return {
+            'baseline_bytes': self.baseline_bytes,
+            'peak_traced_bytes': max(self.peak, default=0),
+            'peak_rss_bytes': peak_rss(),
+            'budget_bytes': self.budget,
+            'ticks': self.ticks,
+            'phases': phases,
+            'top_allocators': top if top is not None else self.peak_top,
+        }
+
+    def write(self, path, top=None, **meta):
+        with open(path, 'w') as f:
+            json.dump({**meta, **self.report(top)}, f, indent=2)
+
+    def print_report(self, title, top=None):
+        report = self.report(top)
+        rss = report['peak_rss_bytes']
+        print(f"\n🧠 {title}: peak traced {report['peak_traced_bytes'] / 2**20:.2f} MiB, "
+              f"baseline {report['baseline_bytes'] / 2**20:.2f} MiB"
+              + (f", peak RSS {rss / 2**20:.1f} MiB" if rss is not None else ""))
+        for name, phase in report['phases'].items():
+            print(f"{name:<11} net {phase['net_bytes'] / 1024:11.1f} KiB  "
+                  f"peak {phase['peak_traced_bytes'] / 2**20:9.2f} MiB  "
+                  f"rss +{phase['rss_growth_bytes'] / 2**20:.1f} MiB")
+        print("Top allocators near the peak, since baseline:")
+        for entry in report['top_allocators']:
+            print(f"  {entry['bytes'] / 1024:11.1f} KiB {entry['blocks']:>9} blocks  {entry['location']}")
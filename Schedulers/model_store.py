@@ -0,0 +1,99 @@
+import os
+import sys
+import numpy as np
+import joblib
+
+# Flattened forest layout: every tree's node arrays concatenated, child indices made absolute
+FOREST_ARRAYS = ['children_left', 'children_right', 'feature', 'threshold', 'value', 'roots', 'classes']
+
+
+def save_model(model, path):
+    # Uncompressed so the numpy buffers inside the pickle can be memory-mapped on load
+    joblib.dump(model, path, compress=0)
+
+
+def export_forest(model, directory):
+    """Write a fitted RandomForestClassifier as flat .npy arrays that load with mmap_mode='r'."""
+    os.makedirs(directory, exist_ok=True)
+
+    children_left = []
+    children_right = []
+    feature = []
+    threshold = []
+    value = []
+    roots = []
+    offset = 0
+
+    for estimator in model.estimators_:
+        tree = estimator.tree_
+        left = tree.children_left.astype(np.int64)
+        right = tree.children_right.astype(np.int64)
+        # Leaves stay at -1, internal nodes point into the concatenated arrays
+        children_left.append(np.where(left == -1, -1, left + offset))
+        children_right.append(np.where(right == -1, -1, right + offset))
+        feature.append(tree.feature.astype(np.int64))
+        threshold.append(tree.threshold.astype(np.float64))
+        # Class probabilities of each leaf (single-output classifier)
+        counts = tree.value[:, 0, :].astype(np.float64)
+        totals = counts.sum(axis=1, keepdims=True)
+        totals[totals == 0] = 1
+        value.append(counts / totals)
+        roots.append(offset)
+        offset += tree.node_count
+
+    arrays = {
+        'children_left': np.concatenate(children_left),
+        'children_right': np.concatenate(children_right),
+        'feature': np.concatenate(feature),
+        'threshold': np.concatenate(threshold),
+        'value': np.concatenate(value),
+        'roots': np.array(roots, dtype=np.int64),
+        'classes': np.asarray(model.classes_),
+    }
+    for name, array in arrays.items():
+        np.save(os.path.join(directory, f'{name}.npy'), array)
+
+
+class FlatForest:
+    """Predict-only forest over memory-mapped arrays written by export_forest().
+
+    Worker processes that open the same directory share one page-cached copy.
+    """
+
+    def __init__(self, directory):
+        for name in FOREST_ARRAYS:
+            setattr(self, name, np.load(os.path.join(directory, f'{name}.npy'), mmap_mode='r'))
+
+    def predict_proba(self, features):
+        # sklearn compares float32 inputs against float64 thresholds
+        X = np.asarray(features, dtype=np.float32).astype(np.float64)
+        rows = np.arange(len(X))[:, None]
+        nodes = np.broadcast_to(self.roots, (len(X), len(self.roots))).copy()
+
+        # Walk every tree for every row at once, one level per iteration
+        while True:
+            left = self.children_left[nodes]
+            internal = left != -1
+            if not internal.any():
+                break
+            go_left = X[rows, np.where(internal, self.feature[nodes], 0)] <= self.threshold[nodes]
+            nodes = np.where(internal, np.where(go_left, left, self.children_right[nodes]), nodes)
+
+        return self.value[nodes].mean(axis=1)
+
+    def predict(self, features):
+        return self.classes[np.argmax(self.predict_proba(features), axis=1)]
+
+
+def load_model(path, forest_dir=None):
+    # Prefer the flattened arrays when they have been exported, else mmap the pickle
+    if forest_dir is not None and os.path.isdir(forest_dir):
+        return FlatForest(forest_dir)
+    return joblib.load(path, mmap_mode='r')
+
+
+if __name__ == "__main__":
+    # Convert an existing pickle: python model_store.py ../relaxation_rf_model.pkl ../relaxation_rf_forest
+    source, target = sys.argv[1], sys.argv[2]
+    export_forest(joblib.load(source), target)
+    print(f"✅ Exported {source} to {target}")
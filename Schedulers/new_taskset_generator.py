@@ -1,5 +1,6 @@
 import random
 from pathlib import Path
+from taskset_store import write_tasksets, store_path
 
 class Task:
     def __init__(self, id, arrival_time, burst_time, deadline, priority):
@@ -19,28 +20,40 @@ def generate_task(task_id):
     burst_time = random.randint(1, 20)
     deadline = random.randint(burst_time + 5, burst_time + 30)
     priority = random.randint(1, 5)
-    return f"Task({task_id}, {arrival_time}, {burst_time}, {deadline}, {priority})"
+    return (task_id, arrival_time, burst_time, deadline, priority)
 
 def generate_task_set(size, offset=0):
     return [generate_task(i + offset) for i in range(size)]
 
-def save_to_python_file(filename="aperiodic_task_sets.py"):
+def iter_task_sets():
+    # 3 sets for each size from 6 to 54, generated on demand
+    for size in range(6, 55):
+        for set_num in range(1, 4):
+            yield generate_task_set(size, offset=0)
+
+def generate_task_sets():
+    return list(iter_task_sets())
+
+def save_to_python_file(task_sets, filename="aperiodic_task_sets.py"):
     with open(filename, "w") as f:
         f.write("from __main__ import Task\n\n")
         f.write("tasks = [\n")
 
-        for size in range(6, 55):
-            for set_num in range(1, 4):  # generate 3 sets per size
-                f.write(f"    # Task set with size = {size}, set #{set_num}\n")
-                task_list = generate_task_set(size, offset=0)
-                f.write("    [\n")
-                for task_str in task_list:
-                    f.write(f"        {task_str},\n")
-                f.write("    ],\n\n")
+        for index, task_list in enumerate(task_sets):
+            f.write(f"    # Task set with size = {len(task_list)}, set #{index % 3 + 1}\n")
+            f.write("    [\n")
+            for task in task_list:
+                f.write(f"        Task{task},\n")
+            f.write("    ],\n\n")
 
         f.write("]\n")
 
-    print(f"Saved 3 task sets for each size from 6 to 54 in {filename}")
+    print(f"Saved {len(task_sets)} task sets in {filename}")
+
+def save_to_store(task_sets, name="aperiodic_task_sets"):
+    path = store_path(name)
+    count = write_tasksets(task_sets, path)
+    print(f"Saved {count} task sets (3 for each size from 6 to 54) in {path}")
 
 if __name__ == "__main__":
-    save_to_python_file()
+    save_to_store(iter_task_sets())
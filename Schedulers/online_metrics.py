@@ -0,0 +1,98 @@
+import math
+
+
+class StreamingMetrics:
+    """Per-taskset scheduling metrics updated on every event, in O(1) memory.
+
+    Replaces keeping every completed task until the end of the run: makespan and WCRT are
+    running maxima, misses and busy cycles are counts, and response time (completion -
+    arrival) keeps a Welford mean and variance. merge() combines the metrics of runs done
+    in different workers exactly (Chan et al.'s pairwise update), so the merged mean and
+    variance equal those of a single pass over all completions.
+
+    With `sketches` (a quantile_sketch.PrioritySketches, usually one shared by every taskset
+    of a run) each completion is also added to the response-time and lateness percentiles.
+    """
+
+    __slots__ = ('completions', 'misses', 'busy_time', 'makespan', 'wcrt', 'mean_response', '_m2', 'sketches')
+
+    def __init__(self, sketches=None):
+        self.completions = 0
+        self.misses = 0
+        self.busy_time = 0
+        self.makespan = 0
+        self.wcrt = 0
+        self.mean_response = 0.0
+        self._m2 = 0.0
+        self.sketches = sketches
+
+    def complete(self, task, now):
+        """A task finished at `now`."""
+        self.completions += 1
+        if now > self.makespan:
+            self.makespan = now
+        response = now - task.arrival_time
+        if response > self.wcrt:
+            self.wcrt = response
+        delta = response - self.mean_response
+        self.mean_response += delta / self.completions
+        self._m2 += delta * (response - self.mean_response)
+        if self.sketches is not None:
+            self.sketches.record(task, now)
+
+    def miss(self, count=1):
+        self.misses += count
+
+    def busy(self, cycles=1):
+        self.busy_time += cycles
+
+    @property
+    def response_variance(self):
+        """Population variance of response time; 0 with fewer than two completions."""
+        return self._m2 / self.completions if self.completions > 1 else 0.0
+
+    @property
+    def response_std(self):
+        return math.sqrt(self.response_variance)
+
+    def utilization(self, simulation_time, num_cores):
+        """Busy share of all core cycles, in percent."""
+        return (self.busy_time / (simulation_time * num_cores)) * 100
+
+    def merge(self, other):
+        """Fold another worker's metrics into these."""
+        total = self.completions + other.completions
+        if total:
+            delta = other.mean_response - self.mean_response
+            self._m2 += other._m2 + delta * delta * self.completions * other.completions / total
+            self.mean_response += delta * other.completions / total
+        self.completions = total
+        self.misses += other.misses
+        self.busy_time += other.busy_time
+        self.makespan = max(self.makespan, other.makespan)
+        self.wcrt = max(self.wcrt, other.wcrt)
+        # Tasksets of one run share a sketch; only fold in another worker's
+        if other.sketches is not None and other.sketches is not self.sketches:
+            if self.sketches is None:
+                self.sketches = type(other.sketches)(other.sketches.relative_accuracy)
+            self.sketches.merge(other.sketches)
+        return self
+
+    def as_dict(self):
+        return {
+            'completions': self.completions,
+            'misses': self.misses,
+            'busy_time': self.busy_time,
+            'makespan': self.makespan,
+            'wcrt': self.wcrt,
+            'mean_response': self.mean_response,
+            'response_std': self.response_std,
+        }
+
+
+def merge_all(metrics):
+    """One StreamingMetrics combining an iterable of them (e.g. one per worker)."""
+    merged = StreamingMetrics()
+    for part in metrics:
+        merged.merge(part)
+    return merged
@@ -0,0 +1,132 @@
+import json
+import heapq
+
+# Algorithmic work done by a scheduler, independent of wall time
+HEAP_PUSH, HEAP_POP, COMPARISONS, SORTS, SORTED, LAXITY, MODEL = range(7)
+OPERATIONS = ('heap_push', 'heap_pop', 'comparisons', 'sorts', 'sorted_elements', 'laxity_updates',
+              'model_calls')
+
+
+class _Compared:
+    # Sort key wrapper; list.sort and heapq only ever call __lt__
+    __slots__ = ('value', 'counts')
+
+    def __init__(self, value, counts):
+        self.value = value
+        self.counts = counts
+
+    def __lt__(self, other):
+        self.counts[COMPARISONS] += 1
+        return self.value < other.value
+
+
+class OpCounter:
+    """Operation counts per tick, per taskset and per run.
+
+    Counts come from two places: explicit add() calls at sort and model call sites, and
+    watch(), which wraps a method, property or module function for the length of a run
+    (Task.__lt__, Task.update_laxity, heapq.heappush, ...) and counts every call to it.
+    The simulators guard both with `if counters:`, so a run without a counter pays one
+    check per call site and none of the wrapping.
+    """
+
+    def __init__(self):
+        self.current = [0] * len(OPERATIONS)
+        self.totals = [0] * len(OPERATIONS)
+        self.ticks = []        # one count tuple per tick
+        self.tasksets = []     # (taskset_id, first tick, end tick, count tuple)
+        self._taskset_start = 0
+        self._taskset_counts = [0] * len(OPERATIONS)
+        self._watched = []
+
+    def add(self, op, n=1):
+        self.current[op] += n
+
+    def sorted_key(self, key, n):
+        """Record one sort of n elements and return key wrapped to count its comparisons."""
+        self.current[SORTS] += 1
+        self.current[SORTED] += n
+        counts = self.current
+        return lambda item: _Compared(key(item), counts)
+
+    def watch(self, owner, name, op):
+        """Count calls to owner.name (or reads of it, for a property) under op until unwatch()."""
+        original = vars(owner).get(name)
+        target = original if original is not None else getattr(owner, name)
+        counter = self
+
+        if isinstance(target, property):
+            def getter(obj, fget=target.fget):
+                counter.current[op] += 1
+                return fget(obj)
+            wrapped = property(getter, target.fset, target.fdel, target.__doc__)
+        else:
+            def wrapped(*args, **kwargs):
+                counter.current[op] += 1
+                return target(*args, **kwargs)
+        setattr(owner, name, wrapped)
+        self._watched.append((owner, name, original))
+
+    def watch_class(self, cls, name, op):
+        """watch() cls.name once per class, for task classes only known from the tasks themselves."""
+        if hasattr(cls, name) and not any(owner is cls and watched == name for owner, watched, _ in self._watched):
+            self.watch(cls, name, op)
+
+    def watch_heap(self):
+        self.watch(heapq, 'heappush', HEAP_PUSH)
+        self.watch(heapq, 'heappop', HEAP_POP)
+
+    def unwatch(self):
+        for owner, name, original in reversed(self._watched):
+            if original is None:
+                delattr(owner, name)
+            else:
+                setattr(owner, name, original)
+        self._watched = []
+
+    def tick(self):
+        """Close the current tick (or event step, for event-driven schedulers)."""
+        self.ticks.append(tuple(self.current))
+        for op, n in enumerate(self.current):
+            self.totals[op] += n
+            self._taskset_counts[op] += n
+            self.current[op] = 0
+
+    def end_taskset(self, taskset_id):
+        # Work done between ticks (end-of-run sorts, leftovers) is charged to the last tick
+        if any(self.current):
+            self.tick()
+        self.tasksets.append((taskset_id, self._taskset_start, len(self.ticks), tuple(self._taskset_counts)))
+        self._taskset_start = len(self.ticks)
+        self._taskset_counts = [0] * len(OPERATIONS)
+
+    def per_tick(self, op):
+        return [counts[op] for counts in self.ticks]
+
+    def report(self, per_tick=False):
+        """Run totals, per-taskset totals and the per-tick mean and max of every operation."""
+        ticks = len(self.ticks)
+        report = {
+            'ticks': ticks,
+            'totals': dict(zip(OPERATIONS, self.totals)),
+            'per_tick_mean': {name: self.totals[op] / ticks if ticks else 0.0
+                              for op, name in enumerate(OPERATIONS)},
+            'per_tick_max': {name: max(self.per_tick(op), default=0) for op, name in enumerate(OPERATIONS)},
+            'tasksets': [{'taskset_id': taskset_id, 'ticks': end - start, **dict(zip(OPERATIONS, counts))}
+                         for taskset_id, start, end, counts in self.tasksets],
+        }
+        if per_tick:
+            report['per_tick'] = {name: self.per_tick(op) for op, name in enumerate(OPERATIONS)}
+        return report
+
+    def write(self, path, per_tick=False, **meta):
+        with open(path, 'w') as f:
+            json.dump({**meta, **self.report(per_tick)}, f, indent=2)
+
+    def print_report(self, title):
+        report = self.report()
+        print(f"\n🔢 {title} over {report['ticks']} ticks:")
+        for name in OPERATIONS:
+            if report['totals'][name]:
+                print(f"{name:<16} {report['totals'][name]:>12}  "
+                      f"{report['per_tick_mean'][name]:10.2f}/tick  max {report['per_tick_max'][name]}")
@@ -0,0 +1,66 @@
+import json
+from time import perf_counter
+
+# Phases of one simulation tick, in loop order
+ARRIVAL, DROP, RELAXATION, SORT, ASSIGN, PREEMPT, EXECUTE, LOGGING = range(8)
+PHASES = ('arrival', 'drop', 'relaxation', 'sort', 'assign', 'preempt', 'execute', 'logging')
+
+
+class PhaseTimer:
+    """Wall time and call counts per tick phase.
+
+    The simulators call lap(phase) at the end of each phase, charging the time since the
+    previous lap to it, behind `if timer:` -- with no timer the only cost is that check.
+    Trace records are emitted inside the phases and count towards them; LOGGING covers the
+    timeline and the per-taskset bookkeeping after the tick loop.
+    """
+
+    def __init__(self):
+        self.seconds = [0.0] * len(PHASES)
+        self.calls = [0] * len(PHASES)
+        self.ticks = 0
+        self.last = perf_counter()
+
+    def start(self):
+        """Restart the clock without charging anything (call before each taskset's tick loop)."""
+        self.last = perf_counter()
+
+    def lap(self, phase):
+        now = perf_counter()
+        self.seconds[phase] += now - self.last
+        self.calls[phase] += 1
+        self.last = now
+
+    def tick(self):
+        self.ticks += 1
+
+    def merge(self, other):
+        for phase in range(len(PHASES)):
+            self.seconds[phase] += other.seconds[phase]
+            self.calls[phase] += other.calls[phase]
+        self.ticks += other.ticks
+
+    def report(self):
+        """Per-phase seconds, calls, mean microseconds per call and share of the timed total."""
+        total = sum(self.seconds)
+        phases = {}
+        for phase, name in enumerate(PHASES):
+            if self.calls[phase]:
+                phases[name] = {
+                    'seconds': self.seconds[phase],
+                    'calls': self.calls[phase],
+                    'mean_us': self.seconds[phase] / self.calls[phase] * 1e6,
+                    'share': self.seconds[phase] / total if total else 0.0,
+                }
+        return {'total_seconds': total, 'ticks': self.ticks, 'phases': phases}
+
+    def write(self, path, **meta):
+        with open(path, 'w') as f:
+            json.dump({**meta, **self.report()}, f, indent=2)
+
+    def print_report(self, title):
+        report = self.report()
+        print(f"\n⏱️ {title}: {report['total_seconds']:.3f}s over {report['ticks']} ticks")
+        for name, phase in report['phases'].items():
+            print(f"{name:<11} {phase['seconds']:9.4f}s  {phase['share'] * 100:5.1f}%  "
+                  f"{phase['calls']:>9} calls  {phase['mean_us']:9.2f} µs/call")
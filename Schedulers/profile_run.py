@@ -0,0 +1,151 @@
+import os
+import sys
+import time
+import pstats
+import cProfile
+import argparse
+import threading
+from collections import Counter
+from benchmark import SCHEDULERS, scheduler_runner, case_columns, build_tasksets
+from taskset_store import load_tasksets
+from memory_report import MemoryTracker, MemoryBudgetExceeded
+
+# Profile one (scheduler, taskset) run, without module import or the rest of the experiment
+PROFILE_DIR = '../profiles'
+TASKSETS = 'aperiodic_task_sets'
+NUM_CORES = 8
+HORIZON = 50
+# Sampling period in seconds
+INTERVAL = 0.001
+
+
+class StackSampler:
+    """Samples the profiled thread's Python stack from a background thread.
+
+    Stacks are cut at the frame that started the run and counted in collapsed form
+    ('EDF.py:simulate;heapq:heappush 12'), which flamegraph.pl, inferno and speedscope
+    read directly. The interpreter switch interval is lowered to the sampling period
+    while sampling, otherwise the sampler only gets the GIL every 5 ms.
+    """
+
+    def __init__(self, interval=INTERVAL):
+        self.interval = interval
+        self.stacks = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+
+    def _sample(self, thread_id, root):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(thread_id)
+            if self._stop.is_set():
+                break
+            stack = []
+            while frame is not None and frame is not root:
+                code = frame.f_code
+                stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                frame = frame.f_back
+            if stack:
+                self.stacks[';'.join(reversed(stack))] += 1
+                self.samples += 1
+
+    def run(self, func, *args):
+        switch_interval = sys.getswitchinterval()
+        sys.setswitchinterval(min(switch_interval, self.interval))
+        thread = threading.Thread(target=self._sample, args=(threading.get_ident(), sys._getframe()),
+                                  daemon=True)
+        thread.start()
+        try:
+            return func(*args)
+        finally:
+            self._stop.set()
+            thread.join()
+            sys.setswitchinterval(switch_interval)
+
+    def write_collapsed(self, path):
+        with open(path, 'w') as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+
+def load_case(name, taskset=None, size=None, num_cores=NUM_CORES, horizon=HORIZON):
+    """(run, tasksets, label): one stored taskset by index, or one synthetic taskset of `size` tasks."""
+    task_class, run = scheduler_runner(name)
+    if size is None:
+        tasksets = [load_tasksets(TASKSETS)[taskset or 0]]
+        label = f"{name}-ts{taskset or 0}-c{num_cores}-h{horizon}"
+    else:
+        columns, sizes = case_columns(size, num_cores, horizon)
+        tasksets = build_tasksets(task_class, columns, sizes[:1])
+        label = f"{name}-n{size}-c{num_cores}-h{horizon}"
+    return run, tasksets, label
+
+
+def profile_run(name, taskset=None, size=None, num_cores=NUM_CORES, horizon=HORIZON, mode='sample',
+                interval=INTERVAL, output_dir=PROFILE_DIR, budget=None):
+    """Profile one run and write its output files; returns their paths.
+
+    mode 'sample' writes <label>.collapsed; mode 'cprofile' writes <label>.pstats (for snakeviz
+    or gprof2dot) and a <label>.txt summary sorted by cumulative time; mode 'memory' writes
+    <label>.memory.json with traced memory per phase, peak RSS and the top allocators, and
+    stops the run early if traced memory exceeds `budget` bytes.
+    """
+    # Traced from before the tasksets are built, so they count towards the budget
+    tracker = MemoryTracker(budget) if mode == 'memory' else None
+    run, tasksets, label = load_case(name, taskset, size, num_cores, horizon)
+    os.makedirs(output_dir, exist_ok=True)
+    base = os.path.join(output_dir, label)
+
+    start = time.perf_counter()
+    if mode == 'sample':
+        sampler = StackSampler(interval)
+        sampler.run(run, tasksets, num_cores, horizon)
+        sampler.write_collapsed(base + '.collapsed')
+        paths = [base + '.collapsed']
+        print(f"📸 {sampler.samples} samples of {label} in {time.perf_counter() - start:.2f}s")
+    elif mode == 'cprofile':
+        profiler = cProfile.Profile()
+        profiler.runcall(run, tasksets, num_cores, horizon)
+        profiler.dump_stats(base + '.pstats')
+        with open(base + '.txt', 'w') as f:
+            pstats.Stats(profiler, stream=f).sort_stats('cumulative').print_stats(40)
+        paths = [base + '.pstats', base + '.txt']
+        print(f"📸 Profiled {label} in {time.perf_counter() - start:.2f}s")
+    elif mode == 'memory':
+        exceeded = {}
+        top = None
+        try:
+            run(tasksets, num_cores, horizon, timer=tracker)
+        except MemoryBudgetExceeded as e:
+            exceeded = {'budget_exceeded': {'phase': e.phase, 'traced_bytes': e.traced}}
+            top = e.top
+            print(f"❌ {label}: {e}")
+        tracker.print_report(f"{label} memory", top)
+        tracker.write(base + '.memory.json', top, scheduler=name, label=label, **exceeded)
+        tracker.stop()
+        paths = [base + '.memory.json']
+    else:
+        raise ValueError(f"unknown profiling mode {mode!r}")
+    return paths
+
+
+if __name__ == "__main__":
+    # python profile_run.py relax [--taskset 3 | --size 1000] [--cores 8] [--horizon 50] [--mode cprofile]
+    # python profile_run.py enfs --size 100000 --mode memory --budget 512
+    # flamegraph.pl ../profiles/relax-ts3-c8-h50.collapsed > relax.svg
+    parser = argparse.ArgumentParser(description="Profile a single scheduler run")
+    parser.add_argument('scheduler', choices=SCHEDULERS)
+    case = parser.add_mutually_exclusive_group()
+    case.add_argument('--taskset', type=int, help=f"index into {TASKSETS} (default 0)")
+    case.add_argument('--size', type=int, help="one synthetic taskset of this many tasks instead")
+    parser.add_argument('--cores', type=int, default=NUM_CORES)
+    parser.add_argument('--horizon', type=int, default=HORIZON)
+    parser.add_argument('--mode', choices=('sample', 'cprofile', 'memory'), default='sample')
+    parser.add_argument('--interval', type=float, default=INTERVAL)
+    parser.add_argument('--output-dir', default=PROFILE_DIR)
+    parser.add_argument('--budget', type=float, help="memory mode: traced MiB at which the run is stopped")
+    args = parser.parse_args()
+
+    budget = int(args.budget * 2**20) if args.budget else None
+    for path in profile_run(args.scheduler, args.taskset, args.size, args.cores, args.horizon, args.mode,
+                            args.interval, args.output_dir, budget):
+        print(f"✅ Saved '{path}'")
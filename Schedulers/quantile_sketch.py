@@ -0,0 +1,182 @@
+import json
+import math
+
+# Every quantile estimate is within this relative error of the true value
+RELATIVE_ACCURACY = 0.01
+QUANTILES = (0.5, 0.9, 0.95, 0.99)
+# Values closer to zero than this share one bucket (response times and lateness are in cycles)
+MIN_INDEXABLE = 1e-9
+METRICS = ('response', 'lateness')
+
+
+class DDSketch:
+    """Mergeable quantile sketch with relative-error guarantees (Masson et al., VLDB 2019).
+
+    Values fall into logarithmic buckets of ratio gamma = (1 + a) / (1 - a), so any quantile
+    comes back within relative accuracy `a` of the exact one. Negative values (tasks finishing
+    before their deadline have negative lateness) go to a mirrored store. Two sketches with the
+    same accuracy merge by adding bucket counts, which is exact: the merged sketch is the one a
+    single pass over both inputs would have built. Buckets are never collapsed; at a = 1% a
+    range of 1 to 10^6 cycles needs about 700 of them.
+    """
+
+    def __init__(self, relative_accuracy=RELATIVE_ACCURACY):
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.positive = {}
+        self.negative = {}
+        self.zeros = 0
+        self.count = 0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def _key(self, value):
+        return math.ceil(math.log(value) / self._log_gamma)
+
+    def _value(self, key):
+        return 2 * self.gamma ** key / (self.gamma + 1)
+
+    def add(self, value, count=1):
+        if value > MIN_INDEXABLE:
+            key = self._key(value)
+            self.positive[key] = self.positive.get(key, 0) + count
+        elif value < -MIN_INDEXABLE:
+            key = self._key(-value)
+            self.negative[key] = self.negative.get(key, 0) + count
+        else:
+            self.zeros += count
+        self.count += count
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+    def merge(self, other):
+        if other.relative_accuracy != self.relative_accuracy:
+            raise ValueError("cannot merge sketches with different relative accuracy")
+        for store, other_store in ((self.positive, other.positive), (self.negative, other.negative)):
+            for key, count in other_store.items():
+                store[key] = store.get(key, 0) + count
+        self.zeros += other.zeros
+        self.count += other.count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        return self
+
+    def quantile(self, q):
+        """Estimated q-quantile (0 <= q <= 1), or None for an empty sketch."""
+        if not self.count:
+            return None
+        rank = q * (self.count - 1)
+        seen = 0
+        # Most negative first: larger keys hold larger magnitudes
+        for key in sorted(self.negative, reverse=True):
+            seen += self.negative[key]
+            if seen > rank:
+                return max(self.min, -self._value(key))
+        seen += self.zeros
+        if seen > rank:
+            return 0.0
+        for key in sorted(self.positive):
+            seen += self.positive[key]
+            if seen > rank:
+                return min(self.max, self._value(key))
+        return self.max
+
+    def to_dict(self):
+        return {
+            'relative_accuracy': self.relative_accuracy,
+            'count': self.count,
+            'zeros': self.zeros,
+            'min': self.min if self.count else None,
+            'max': self.max if self.count else None,
+            'positive': {str(key): count for key, count in self.positive.items()},
+            'negative': {str(key): count for key, count in self.negative.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        sketch = cls(data['relative_accuracy'])
+        sketch.positive = {int(key): count for key, count in data['positive'].items()}
+        sketch.negative = {int(key): count for key, count in data['negative'].items()}
+        sketch.zeros = data['zeros']
+        sketch.count = data['count']
+        if sketch.count:
+            sketch.min = data['min']
+            sketch.max = data['max']
+        return sketch
+
+
+class PrioritySketches:
+    """Response-time and lateness sketches of completed tasks, one pair per priority.
+
+    Response time is completion - arrival and lateness is completion - deadline. Tasks dropped
+    or left unfinished never complete, so they appear in the miss counts but not here.
+    """
+
+    def __init__(self, relative_accuracy=RELATIVE_ACCURACY):
+        self.relative_accuracy = relative_accuracy
+        self.by_priority = {}
+
+    def _sketches(self, priority):
+        sketches = self.by_priority.get(priority)
+        if sketches is None:
+            sketches = self.by_priority[priority] = {name: DDSketch(self.relative_accuracy) for name in METRICS}
+        return sketches
+
+    def record(self, task, now):
+        sketches = self._sketches(getattr(task, 'priority', -1))
+        sketches['response'].add(now - task.arrival_time)
+        sketches['lateness'].add(now - task.deadline)
+
+    def merge(self, other):
+        for priority, other_sketches in other.by_priority.items():
+            sketches = self._sketches(priority)
+            for name in METRICS:
+                sketches[name].merge(other_sketches[name])
+        return self
+
+    def overall(self, metric):
+        """One sketch of `metric` over every priority."""
+        merged = DDSketch(self.relative_accuracy)
+        for sketches in self.by_priority.values():
+            merged.merge(sketches[metric])
+        return merged
+
+    def quantile_rows(self, quantiles=QUANTILES):
+        """[{'priority', 'metric', 'count', 'p50', ...}] per priority, then over all priorities."""
+        groups = [(priority, self.by_priority[priority]) for priority in sorted(self.by_priority)]
+        groups.append(('all', {name: self.overall(name) for name in METRICS}))
+        rows = []
+        for priority, sketches in groups:
+            for name in METRICS:
+                sketch = sketches[name]
+                row = {'priority': priority, 'metric': name, 'count': sketch.count}
+                for q in quantiles:
+                    row[f"p{q * 100:g}"] = sketch.quantile(q)
+                rows.append(row)
+        return rows
+
+    def to_dict(self):
+        return {
+            'relative_accuracy': self.relative_accuracy,
+            'priorities': {str(priority): {name: sketch.to_dict() for name, sketch in sketches.items()}
+                           for priority, sketches in self.by_priority.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        sketches = cls(data['relative_accuracy'])
+        for priority, by_metric in data['priorities'].items():
+            sketches.by_priority[int(priority)] = {name: DDSketch.from_dict(by_metric[name]) for name in METRICS}
+        return sketches
+
+    def write(self, path, **meta):
+        with open(path, 'w') as f:
+            json.dump({**meta, 'quantiles': self.quantile_rows(), **self.to_dict()}, f, indent=2)
+
+    @classmethod
+    def read(cls, path):
+        with open(path) as f:
+            return cls.from_dict(json.load(f))
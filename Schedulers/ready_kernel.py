@@ -0,0 +1,42 @@
+import numpy as np
+
+
+def gather(tasks, now):
+    """(laxity, priority) arrays of `tasks` at time `now`, in list order."""
+    n = len(tasks)
+    laxity = np.fromiter((t.deadline for t in tasks), np.float64, n) - now \
+        - np.fromiter((t.remaining_time for t in tasks), np.float64, n)
+    priority = np.fromiter((t.priority for t in tasks), np.float64, n)
+    return laxity, priority
+
+
+def top_k(scores, k):
+    """Indices of the k lowest scores, lowest first; ties keep index order, as a stable sort would.
+
+    Only the k selected entries are sorted: argpartition finds the k-th lowest score, and the
+    entries tied with it are cut off in index order.
+    """
+    n = len(scores)
+    if k >= n:
+        return np.argsort(scores, kind='stable')
+    if k <= 0:
+        return np.empty(0, dtype=np.intp)
+    kth = scores[np.argpartition(scores, k - 1)[k - 1]]
+    below = np.flatnonzero(scores < kth)
+    chosen = np.concatenate((below, np.flatnonzero(scores == kth)[:k - len(below)]))
+    chosen.sort()
+    return chosen[np.argsort(scores[chosen], kind='stable')]
+
+
+def rank(tasks, scores, k=None):
+    """Reorder `tasks` in place: the k lowest-scoring first, lowest first, then the rest in their old order.
+
+    Returns the scores in the new order. With k None every task is ranked.
+    """
+    order = top_k(scores, len(tasks) if k is None else k)
+    if len(order) < len(tasks):
+        rest = np.ones(len(tasks), dtype=bool)
+        rest[order] = False
+        order = np.concatenate((order, np.flatnonzero(rest)))
+    tasks[:] = [tasks[i] for i in order.tolist()]
+    return scores[order]
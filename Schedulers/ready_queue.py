@@ -0,0 +1,73 @@
+import heapq
+
+# Rebuild the heap once it holds this many times more entries than queued tasks
+COMPACT_RATIO = 2
+COMPACT_MIN = 64
+
+
+class ReadyQueue:
+    """Ready tasks ordered by a fixed key(task), lowest first; equal keys in push order.
+
+    A heap of [key, push number, task] entries, so push(), pop() and first() are O(log n)
+    and remove() is O(1): it blanks the task's entry, which is skipped once it reaches the
+    top. The key is read on push(); task.relaxation is set to it.
+
+    The relaxation scheduler used to keep a list, append arrivals and preempted tasks to it
+    and stable-sort it once per tick. Iteration and position() give that list's order: the
+    tasks queued at the last settle() by key, then the tasks pushed since, in push order.
+    """
+
+    def __init__(self, key):
+        self.key = key
+        self._heap = []
+        self._entries = {}
+        self._pushes = 0
+        self._settled = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, task):
+        return id(task) in self._entries
+
+    def __iter__(self):
+        return iter(sorted((entry[2] for entry in self._entries.values()), key=self.position))
+
+    def push(self, task):
+        task.relaxation = self.key(task)
+        entry = [task.relaxation, self._pushes, task]
+        self._pushes += 1
+        self._entries[id(task)] = entry
+        heapq.heappush(self._heap, entry)
+
+    def _top(self):
+        while self._heap and self._heap[0][2] is None:
+            heapq.heappop(self._heap)
+        return self._heap[0] if self._heap else None
+
+    def first(self):
+        """Lowest-key task, or None."""
+        entry = self._top()
+        return entry[2] if entry else None
+
+    def pop(self):
+        """Remove and return the lowest-key task."""
+        self._top()
+        task = heapq.heappop(self._heap)[2]
+        del self._entries[id(task)]
+        return task
+
+    def remove(self, task):
+        self._entries.pop(id(task))[2] = None
+        if len(self._heap) > max(COMPACT_MIN, COMPACT_RATIO * len(self._entries)):
+            self._heap = list(self._entries.values())
+            heapq.heapify(self._heap)
+
+    def settle(self):
+        """Mark every queued task as ranked, where the old scheduler sorted its list."""
+        self._settled = self._pushes
+
+    def position(self, task):
+        """Sort key of a queued task's place in the old scheduler's list."""
+        key, pushed, _ = self._entries[id(task)]
+        return (0, key, pushed) if pushed < self._settled else (1, 0, pushed)
@@ -0,0 +1,381 @@
+import io
+import json
+import math
+import time
+import argparse
+import numpy as np
+from timeline import SEGMENT
+from taskset_store import load_tasksets
+
+# relax_scheduler generics and relaxation weights, as in Relax.vhd
+NUM_CORES = 2
+MAX_TASKS = 16
+TASK_ID_WIDTH = 8
+TIME_WIDTH = 32
+PRIORITY_WIDTH = 2
+ALPHA_NUM, ALPHA_DEN = 7, 10
+BETA_NUM, BETA_DEN = 3, 10
+
+INT_MAX = 2**31 - 1
+TIME_MASK = 2**TIME_WIDTH - 1
+ID_MASK = 2**TASK_ID_WIDTH - 1
+PRIORITY_MASK = 2**PRIORITY_WIDTH - 1
+# task_in: ID[7:0], Priority[9:8], Burst[41:10], Deadline[73:42]
+TASK_IN_WIDTH = 74
+HORIZON = 50
+DIVERGENCE_FILE = '../relax_hw_divergence.json'
+# Instances per timed run; each numpy call then advances enough of them to outweigh its overhead
+THROUGHPUT_BATCH = 2048
+
+
+def to_hardware(task):
+    """(id, priority, burst, deadline) of a task as relax_scheduler takes them.
+
+    Times are whole cycles: burst is rounded up and the deadline down, so the hardware never
+    sees more slack than the task has. Fields are cut to their port widths.
+    """
+    return (task.id & ID_MASK, task.priority & PRIORITY_MASK,
+            math.ceil(task.burst_time) & TIME_MASK, math.floor(task.deadline) & TIME_MASK)
+
+
+def pack_task(task_id, priority, burst, deadline):
+    """The 74-bit task_in word."""
+    return (task_id & ID_MASK) | (priority & PRIORITY_MASK) << 8 | (burst & TIME_MASK) << 10 \
+        | (deadline & TIME_MASK) << 42
+
+
+def unpack_task(word):
+    return word & ID_MASK, word >> 8 & PRIORITY_MASK, word >> 10 & TIME_MASK, word >> 42 & TIME_MASK
+
+
+def _tdiv(a, d):
+    # VHDL integer division truncates toward zero, as the float to int cast does; exact while
+    # |a| < 2**53, far above anything 32-bit times times a 4-bit weight reach
+    return (a / d).astype(np.int64)
+
+
+def _any_rows(mask):
+    # ndarray.any(axis=1) is slow on rows this short; OR-ing the columns is not
+    rows = mask[:, 0].copy()
+    for column in range(1, mask.shape[1]):
+        rows |= mask[:, column]
+    return rows
+
+
+class RelaxSchedulerModel:
+    """Cycle-accurate model of relax_scheduler, for a batch of independent instances at once.
+
+    step() is one rising edge of clk_bufg (reset already applied). Like the VHDL process,
+    every read sees the signal values from before the edge and the last assignment to a
+    signal wins, which the hardware behaviour depends on:
+      - current_time is the previous cycle's sys_time, while an accepted task's arrival is
+        this cycle's;
+      - a slot's laxity and relaxation are first computed the cycle after it is accepted
+        (until then they hold their reset value 0);
+      - every free core sees the same state, so all of them take the same task in a cycle;
+      - a core freed this cycle is only reassigned on the next one;
+      - deadline_misses and total_busy grow by at most one task per cycle;
+      - slots are never freed, so after MAX_TASKS accepted tasks task_ready stays low.
+    The priority term (3 * priority) / 10 truncates to 0 for 2-bit priorities. Integers are
+    int64 here, where the VHDL would overflow its 32-bit integers for very large times.
+    Each instance is a row of the state arrays, so one numpy operation advances the whole batch;
+    sys_time is shared, so current_time is a single number for all of them.
+    """
+
+    def __init__(self, batch, num_cores=NUM_CORES, max_tasks=MAX_TASKS):
+        self.batch = batch
+        self.num_cores = num_cores
+        self.max_tasks = max_tasks
+        shape = (batch, max_tasks)
+        self.id = np.zeros(shape, np.int64)
+        self.priority = np.zeros(shape, np.int64)
+        self.arrival = np.zeros(shape, np.int64)
+        self.burst = np.zeros(shape, np.int64)
+        self.deadline = np.zeros(shape, np.int64)
+        self.remaining = np.zeros(shape, np.int64)
+        self.assigned_core = np.full(shape, -1, np.int64)
+        self.running = np.zeros(shape, bool)
+        self.started = np.zeros(shape, bool)
+        self.finished = np.zeros(shape, bool)
+        self.priority_term = np.zeros(shape, np.int64)
+        self.laxity = np.zeros(shape, np.int64)
+        self.relaxation = np.zeros(shape, np.int64)
+        self.valid = np.zeros(shape, bool)
+        self.task_idx = np.full((batch, num_cores), -1, np.int64)
+        self.busy_until = np.zeros((batch, num_cores), np.int64)
+        self.active = np.zeros((batch, num_cores), bool)
+        self.tick = np.zeros(batch, np.int64)
+        self.deadline_miss_cnt = np.zeros(batch, np.int64)
+        self.total_busy = np.zeros(batch, np.int64)
+        # Not reset in the VHDL; reads as 0 until the first edge sets it
+        self.current_time = 0
+        self._rows = np.arange(batch)
+        # Row starts in the flattened slot arrays, for gathering each core's slot with np.take
+        self._row_starts = self._rows[:, None] * max_tasks
+        # Scratch for the per-slot arithmetic of step(): fresh (batch, max_tasks) temporaries
+        # every edge cost more than the arithmetic itself once the batch is large
+        self._laxity = np.zeros(shape, np.int64)
+        self._relaxation = np.zeros(shape, np.int64)
+        self._quotient = np.zeros(shape, np.float64)
+        self._key = np.zeros(shape, np.int64)
+
+    @property
+    def task_ready(self):
+        return ~self.valid[:, -1]
+
+    def step(self, sys_time, task_valid, task_in):
+        """One clock edge. `task_valid` is (batch,) bool; `task_in` is (batch, 4) of id, priority, burst, deadline."""
+        ct = self.current_time
+
+        # Reads: everything the process looks at, as it was before the edge
+        accept = np.flatnonzero(task_valid & ~self.valid[:, -1])
+        slot = np.argmax(~self.valid[accept], axis=1)
+        live = self.valid & ~self.finished
+        laxity = np.subtract(self.deadline, self.remaining, out=self._laxity)
+        laxity -= ct
+        relaxation = np.multiply(laxity, ALPHA_NUM, out=self._relaxation)
+        # Truncating division, as _tdiv
+        np.copyto(relaxation, np.true_divide(relaxation, ALPHA_DEN, out=self._quotient), casting='unsafe')
+        relaxation += self.priority_term
+        on_core = self.active & (self.task_idx != -1)
+        # Flat index of the slot on each core
+        flat = self._row_starts + np.where(on_core, self.task_idx, 0)
+        remaining = np.take(self.remaining, flat)
+        done = on_core & np.take(self.valid, flat) & ((remaining == 0) | (self.busy_until <= ct))
+        late = _any_rows(done & (np.take(self.deadline, flat) < ct))
+        eligible = live & ~self.running & (self.arrival <= ct) & (self.laxity >= 0) & (self.relaxation < INT_MAX)
+        # Every idle core takes the same task: the lowest relaxation, lowest slot on ties.
+        # Eligible slots have relaxation < INT_MAX, so the rest are keyed INT_MAX
+        key = np.subtract(self.relaxation, INT_MAX, out=self._key)
+        key *= eligible
+        key += INT_MAX
+        sel = np.argmin(key, axis=1)
+        assign = ~self.active & (key[self._rows, sel] < INT_MAX)[:, None]
+        advance = on_core & (remaining > 0)
+
+        # Writes, in the order of the process
+        if len(accept):
+            fields = task_in[accept]
+            self.id[accept, slot] = fields[:, 0] & ID_MASK
+            self.priority[accept, slot] = fields[:, 1] & PRIORITY_MASK
+            self.priority_term[accept, slot] = _tdiv(BETA_NUM * (fields[:, 1] & PRIORITY_MASK), BETA_DEN)
+            self.burst[accept, slot] = fields[:, 2] & TIME_MASK
+            self.arrival[accept, slot] = sys_time
+            self.deadline[accept, slot] = fields[:, 3] & TIME_MASK
+            self.remaining[accept, slot] = fields[:, 2] & TIME_MASK
+            self.assigned_core[accept, slot] = -1
+            self.running[accept, slot] = False
+            self.started[accept, slot] = False
+            self.finished[accept, slot] = False
+            self.valid[accept, slot] = True
+
+        # Only live slots are updated: x += (new - x) * live, cheaper than a masked copy
+        laxity -= self.laxity
+        laxity *= live
+        self.laxity += laxity
+        relaxation -= self.relaxation
+        relaxation *= live
+        self.relaxation += relaxation
+
+        if done.any():
+            np.put(self.finished, flat[done], True)
+            np.put(self.running, flat[done], False)
+            self.task_idx[done] = -1
+            self.active[done] = False
+            self.deadline_miss_cnt[late] += 1
+
+        if assign.any():
+            r = np.flatnonzero(_any_rows(assign))
+            burst = self.burst[self._rows, sel]
+            # The highest idle core assigns last
+            last_core = self.num_cores - 1 - np.argmax(assign[r, ::-1], axis=1)
+            self.assigned_core[r, sel[r]] = last_core
+            self.running[r, sel[r]] = True
+            self.started[r, sel[r]] = True
+            self.active[assign] = True
+            self.task_idx[assign] = np.broadcast_to(sel[:, None], assign.shape)[assign]
+            self.busy_until[assign] = np.broadcast_to(((ct + burst) & TIME_MASK)[:, None], assign.shape)[assign]
+            self.total_busy[r] += burst[r]
+
+        if advance.any():
+            np.put(self.remaining, flat[advance], remaining[advance] - 1)
+
+        self.tick += 1
+        self.current_time = sys_time & TIME_MASK
+
+    def core_status(self):
+        """(batch, cores) task ids on each core, 0 for idle, as on the core_status port."""
+        ids = np.take_along_axis(self.id, np.where(self.task_idx >= 0, self.task_idx, 0), 1)
+        return np.where(self.task_idx >= 0, ids, 0)
+
+    def deadline_misses(self):
+        return self.deadline_miss_cnt & 0xFFFFFFFF
+
+    def cpu_util(self):
+        # total_busy(31 downto 0) * 100 / (tick + 1), resized to 32 bits
+        return ((self.total_busy & 0xFFFFFFFF) * 100 // ((self.tick + 1) & TIME_MASK)) & 0xFFFFFFFF
+
+
+def offers(tasksets):
+    """Stimulus for a batch: each taskset's tasks by arrival, padded to one array per field.
+
+    Returns (arrival, fields, count, order): fields is (batch, n, 4) of to_hardware() values
+    and order[b, k] the position in tasksets[b] of its k-th offered task.
+    """
+    longest = max((len(ts) for ts in tasksets), default=0)
+    arrival = np.full((len(tasksets), longest), np.iinfo(np.int64).max, np.int64)
+    fields = np.zeros((len(tasksets), longest, 4), np.int64)
+    order = np.full((len(tasksets), longest), -1, np.int64)
+    for b, taskset_ in enumerate(tasksets):
+        by_arrival = sorted(range(len(taskset_)), key=lambda k: taskset_[k].arrival_time)
+        for k, position in enumerate(by_arrival):
+            task = taskset_[position]
+            arrival[b, k] = task.arrival_time
+            fields[b, k] = to_hardware(task)
+            order[b, k] = position
+    return arrival, fields, np.array([len(ts) for ts in tasksets], np.int64), order
+
+
+def run_model(tasksets, cycles, num_cores=NUM_CORES, max_tasks=MAX_TASKS, record=True):
+    """Drive one model instance per taskset for `cycles` clock edges.
+
+    Stimulus protocol, shared with the GHDL testbench: sys_time is the cycle number, and
+    tasks are offered one per cycle in arrival order from their arrival cycle on, with
+    task_valid held until an edge where task_ready is high.
+
+    Returns (model, slot_task, trace): slot_task[b, slot] is the position in tasksets[b] of
+    the task accepted into that slot. With `record`, trace holds the ports after every
+    edge as (batch, cycles[, cores]) arrays: 'accepted' (the offered task was taken on
+    that edge), 'core_status', 'deadline_misses' and 'cpu_util', plus 'slots' (the slot on
+    each core, -1 idle). Without it trace is None.
+    """
+    model = RelaxSchedulerModel(len(tasksets), num_cores, max_tasks)
+    arrival, fields, count, order = offers(tasksets)
+    head = np.zeros(len(tasksets), np.int64)
+    slot_task = np.full((len(tasksets), max_tasks), -1, np.int64)
+    rows = np.arange(len(tasksets))
+    pad = np.zeros((len(tasksets), 1, 4), np.int64)
+    fields = np.concatenate((fields, pad), axis=1)
+    arrival = np.concatenate((arrival, np.full((len(tasksets), 1), np.iinfo(np.int64).max)), axis=1)
+    trace = None
+    if record:
+        shape = (len(tasksets), cycles)
+        trace = {
+            'accepted': np.zeros(shape, bool),
+            'core_status': np.zeros(shape + (num_cores,), np.int64),
+            'deadline_misses': np.zeros(shape, np.int64),
+            'cpu_util': np.zeros(shape, np.int64),
+            'slots': np.full(shape + (num_cores,), -1, np.int16),
+        }
+
+    for cycle in range(cycles):
+        task_valid = (head < count) & (arrival[rows, head] <= cycle)
+        taken = task_valid & model.task_ready
+        if taken.any():
+            slot_task[taken, model.valid[taken].sum(axis=1)] = order[taken, head[taken]]
+        model.step(cycle, task_valid, fields[rows, head])
+        head += taken
+        if record:
+            trace['accepted'][:, cycle] = taken
+            trace['core_status'][:, cycle] = model.core_status()
+            trace['deadline_misses'][:, cycle] = model.deadline_misses()
+            trace['cpu_util'][:, cycle] = model.cpu_util()
+            trace['slots'][:, cycle] = model.task_idx
+    return model, slot_task, trace
+
+
+def software_run(scheduler, tasksets, cycles, num_cores):
+    """(summary_log, occupancy) of a Python scheduler on copies of `tasksets`.
+
+    occupancy is (batch, cycles, cores): the position in its taskset of the task each core
+    runs during each tick, -1 idle, taken from the scheduler's core timeline.
+    """
+    from benchmark import scheduler_runner
+    task_class, run = scheduler_runner(scheduler)
+    copies = [[task_class(t.id, t.arrival_time, t.burst_time, t.deadline, t.priority) for t in ts]
+              for ts in tasksets]
+    timeline_file = io.BytesIO()
+    summary_log = run(copies, num_cores, cycles, timeline_file=timeline_file)
+    occupancy = np.full((len(tasksets), cycles, num_cores), -1, np.int64)
+    positions = [{task.id: k for k, task in enumerate(ts)} for ts in tasksets]
+    for taskset_id, core, task, start, end, _ in SEGMENT.iter_unpack(timeline_file.getvalue()):
+        occupancy[taskset_id, int(start):int(end), core] = positions[taskset_id][task]
+    return summary_log, occupancy
+
+
+def running_tasks(slots, slot_task):
+    """Map recorded slots to task positions in each taskset (-1 idle)."""
+    flat = np.maximum(slots, 0).astype(np.int64).reshape(len(slot_task), -1)
+    return np.where(slots >= 0, np.take_along_axis(slot_task, flat, 1).reshape(slots.shape), -1)
+
+
+def divergent_ticks(hardware, software):
+    """Ticks where two (cycles, cores) occupancies run different sets of tasks."""
+    return [t for t in range(len(hardware))
+            if set(hardware[t][hardware[t] >= 0].tolist()) != set(software[t][software[t] >= 0].tolist())]
+
+
+def divergences(tasksets, cycles=HORIZON, num_cores=NUM_CORES, max_tasks=MAX_TASKS, scheduler='relax'):
+    """Compare the model with a Python scheduler (Proposed_relaxation by default) on the same tasksets.
+
+    Per taskset: misses and utilization from both, how many tasks the hardware accepted,
+    and the ticks where the two run a different set of tasks (cycle t of the model against
+    tick t of the software scheduler).
+    """
+    model, slot_task, trace = run_model(tasksets, cycles, num_cores, max_tasks)
+    running = running_tasks(trace['slots'], slot_task)
+    summary_log, occupancy = software_run(scheduler, tasksets, cycles, num_cores)
+    hw_util = model.cpu_util()
+    hw_misses = model.deadline_misses()
+    accepted = trace['accepted'].sum(axis=1)
+    rows = []
+    for b, taskset_ in enumerate(tasksets):
+        differs = divergent_ticks(running[b], occupancy[b])
+        rows.append({
+            'taskset': b, 'tasks': len(taskset_), 'accepted': int(accepted[b]),
+            'hw_misses': int(hw_misses[b]), 'sw_misses': summary_log[b][3],
+            'hw_cpu_util': int(hw_util[b]), 'sw_utilization': float(summary_log[b][5]),
+            'divergent_ticks': len(differs), 'first_divergence': differs[0] if differs else None,
+        })
+    return rows
+
+
+def throughput(tasksets, cycles, num_cores=NUM_CORES, max_tasks=MAX_TASKS, batch=THROUGHPUT_BATCH):
+    """Instance cycles per second without recording, over `batch` instances cycling through `tasksets`."""
+    instances = [tasksets[i % len(tasksets)] for i in range(batch)]
+    start = time.perf_counter()
+    run_model(instances, cycles, num_cores, max_tasks, record=False)
+    return batch * cycles / (time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    # python relax_hw_model.py [--cores 2] [--max-tasks 16] [--horizon 50] [--cycles 100000]
+    parser = argparse.ArgumentParser(description="Cycle-accurate model of Relax.vhd against Proposed_relaxation")
+    parser.add_argument('--cores', type=int, default=NUM_CORES)
+    parser.add_argument('--max-tasks', type=int, default=MAX_TASKS)
+    parser.add_argument('--horizon', type=int, default=HORIZON)
+    parser.add_argument('--cycles', type=int, default=0, help="also time a run of this many cycles")
+    args = parser.parse_args()
+
+    tasksets = load_tasksets('aperiodic_task_sets')
+    tasksets = [tasksets[i] for i in range(len(tasksets))]
+    rows = divergences(tasksets, args.horizon, args.cores, args.max_tasks)
+
+    print(f"{'Taskset':>7} {'Tasks':>6} {'Accepted':>8} {'HW miss':>7} {'SW miss':>7} "
+          f"{'HW util':>7} {'SW util':>7} {'Diverge':>7} {'First':>5}")
+    for row in rows:
+        first = row['first_divergence'] if row['first_divergence'] is not None else '-'
+        print(f"{row['taskset']:>7} {row['tasks']:>6} {row['accepted']:>8} {row['hw_misses']:>7} "
+              f"{row['sw_misses']:>7} {row['hw_cpu_util']:>7} {row['sw_utilization']:>7.2f} "
+              f"{row['divergent_ticks']:>7} {first:>5}")
+    diverged = sum(1 for row in rows if row['divergent_ticks'])
+    print(f"\n🔍 {diverged}/{len(rows)} tasksets diverge from Proposed_relaxation within {args.horizon} ticks")
+
+    result = {'num_cores': args.cores, 'max_tasks': args.max_tasks, 'horizon': args.horizon, 'tasksets': rows}
+    if args.cycles:
+        rate = throughput(tasksets, args.cycles, args.cores, args.max_tasks)
+        result['cycles_per_second'] = rate
+        print(f"⏱️ {rate / 1e6:.2f}M model cycles/s ({THROUGHPUT_BATCH} instances x {args.cycles} cycles)")
+    with open(DIVERGENCE_FILE, 'w') as f:
+        json.dump(result, f, indent=2)
+    print("✅ Saved hardware model divergences to 'relax_hw_divergence.json'")
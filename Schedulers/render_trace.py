@@ -0,0 +1,74 @@
+import sys
+from sim_trace import (read_trace, TASKSET, ARRIVAL, DISPATCH, PREEMPT, COMPLETE, DROP, MISS)
+
+
+def fmt(value):
+    return f"{value:g}"
+
+
+def split_tasksets(records):
+    # Group events under the TASKSET record that opened them
+    current = None
+    for record in records:
+        kind, core, taskset_id, task, other, time, value = record
+        if kind == TASKSET:
+            if current is not None:
+                yield current
+            current = {'id': taskset_id, 'size': task, 'cores': other, 'horizon': int(value), 'events': []}
+        elif current is not None:
+            current['events'].append(record)
+    if current is not None:
+        yield current
+
+
+# The simulators used to print only the first two cores, whatever NUM_CORES was
+TABLE_CORES = 2
+
+
+def render_core_table(section, all_cores=False):
+    # Rebuild the per-tick core status lines the simulators used to print
+    cores = ["-"] * section['cores']
+    shown = section['cores'] if all_cores else min(TABLE_CORES, section['cores'])
+    events = section['events']
+    index = 0
+    print(" t  " + "  |  ".join(str(i + 1) for i in range(shown)))
+    print("------" + "|---" * (shown - 1))
+    for t in range(section['horizon']):
+        while index < len(events) and events[index][5] <= t:
+            kind, core, _, task, _, _, _ = events[index]
+            if kind in (DISPATCH, PREEMPT):
+                cores[core] = str(task)
+            elif kind == COMPLETE:
+                cores[core] = "-"
+            index += 1
+        print(f"{t}  " + "  |  ".join(cores[:shown]))
+
+
+def render(path, ticks=True, all_cores=False):
+    for section in split_tasksets(read_trace(path)):
+        print(f"\nTaskset #{section['id']} ({section['size']} tasks, {section['cores']} cores)")
+        if ticks and section['horizon'] > 0:
+            render_core_table(section, all_cores)
+
+        print("\n📜 Preemption History:")
+        for kind, core, _, task, other, time, value in section['events']:
+            if kind == PREEMPT:
+                print(f"Time {fmt(time)}: Task {task} (Deadline: {fmt(value)}) preempted Task {other} on Core {core}")
+
+        print("\n🎯 Completion Summary:")
+        for kind, core, _, task, other, time, value in section['events']:
+            if kind == ARRIVAL:
+                print(f"➡️ ARRIVE: Task {task} at {fmt(time)} with deadline {fmt(value)}")
+            elif kind == COMPLETE and time > value:
+                print(f"❌ MISS: Task {task} completed at {fmt(time)} after deadline {fmt(value)}")
+            elif kind == COMPLETE:
+                print(f"✅ DONE: Task {task} completed at {fmt(time)} before deadline {fmt(value)}")
+            elif kind == DROP:
+                print(f"🗑️ DROP: Task {task} (priority {fmt(value)}) dropped at {fmt(time)} with negative laxity")
+            elif kind == MISS:
+                print(f"⚠️ Task {task} (priority {fmt(value)}) did not complete and missed deadline.")
+
+
+if __name__ == "__main__":
+    # python render_trace.py ../edf_trace.bin [--no-ticks] [--all-cores]
+    render(sys.argv[1], ticks='--no-ticks' not in sys.argv[2:], all_cores='--all-cores' in sys.argv[2:])
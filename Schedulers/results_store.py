@@ -0,0 +1,211 @@
+import os
+import sys
+import csv
+import json
+import uuid
+import hashlib
+from datetime import datetime
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pyarrow.dataset as ds
+from experiment_db import ExperimentDB
+from quantile_sketch import PrioritySketches
+
+# Every run appends its own Parquet file under RESULTS_DIR/<scheduler>/, so earlier runs are
+# never overwritten and the whole directory reads back as one dataset in a single scan.
+RESULTS_DIR = '../results'
+BATCH_ROWS = 4096
+
+SUMMARY_SCHEMA = pa.schema([
+    ('run_id', pa.string()),
+    ('scheduler', pa.string()),
+    ('config_hash', pa.string()),
+    ('taskset_id', pa.int64()),
+    ('taskset_size', pa.int64()),
+    ('preemptions', pa.int64()),
+    ('deadline_misses', pa.int64()),
+    ('data_transfers', pa.int64()),
+    ('cpu_utilization', pa.float64()),
+    ('makespan', pa.float64()),
+    ('wcrt', pa.float64()),
+    ('missed_priorities', pa.list_(pa.int64())),
+    # Response time (completion - arrival) of completed tasks; null in runs from before they were kept
+    ('mean_response', pa.float64()),
+    ('response_std', pa.float64()),
+])
+
+# Column order of the old per-script CSV files, for export_csv()
+CSV_HEADER = ['Taskset_ID', 'Taskset Size', 'Preemptions', 'Deadline_Misses', 'Data_Transfers',
+              'CPU_Utilization(%)', 'Makespan', 'WCRT', 'Missed_Task_Priorities']
+
+
+def config_hash(config):
+    return hashlib.sha1(json.dumps(config, sort_keys=True, default=str).encode()).hexdigest()[:16]
+
+
+def _number(value):
+    # Makespan and WCRT are stored as floats; integral values print like the old CSVs
+    if value is not None and float(value).is_integer():
+        return int(value)
+    return value
+
+
+def _priority(value):
+    # Missing priorities were logged as 'N/A'
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return -1
+
+
+class ResultsWriter:
+    """Appends typed summary rows for one run of one scheduler as Parquet row groups.
+
+    With `db` (a path or an ExperimentDB) every batch is also inserted into SQLite.
+    """
+
+    def __init__(self, scheduler, config, root=RESULTS_DIR, batch_rows=BATCH_ROWS, db=None):
+        self.scheduler = scheduler
+        self.config = config
+        self.config_hash = config_hash(config)
+        self.run_id = f"{datetime.now():%Y%m%d-%H%M%S}-{uuid.uuid4().hex[:8]}"
+        self.batch_rows = batch_rows
+        self.rows = {name: [] for name in SUMMARY_SCHEMA.names}
+
+        # The database row comes first: nothing is written to disk for a run it rejects
+        self.owns_db = isinstance(db, str)
+        self.db = ExperimentDB(db) if self.owns_db else db
+        if self.db is not None:
+            self.db.record_run(self.run_id, scheduler, self.config_hash, config)
+
+        os.makedirs(os.path.join(root, scheduler), exist_ok=True)
+        os.makedirs(os.path.join(root, 'configs'), exist_ok=True)
+        with open(os.path.join(root, 'configs', f'{self.config_hash}.json'), 'w') as f:
+            json.dump(config, f, indent=2, sort_keys=True, default=str)
+
+        self.path = os.path.join(root, scheduler, f'{self.run_id}.parquet')
+        # Kept out of the Parquet directories so dataset scans never see them
+        self.sketches_path = os.path.join(root, 'sketches', scheduler, f'{self.run_id}.json')
+        self.writer = pq.ParquetWriter(self.path, SUMMARY_SCHEMA)
+
+    def append(self, taskset_id, taskset_size, preemptions, deadline_misses, data_transfers,
+               cpu_utilization, makespan, wcrt=None, missed_priorities=(), mean_response=None, response_std=None):
+        row = {
+            'run_id': self.run_id,
+            'scheduler': self.scheduler,
+            'config_hash': self.config_hash,
+            'taskset_id': taskset_id,
+            'taskset_size': taskset_size,
+            'preemptions': preemptions,
+            'deadline_misses': deadline_misses,
+            'data_transfers': data_transfers,
+            'cpu_utilization': float(cpu_utilization),
+            'makespan': makespan,
+            'wcrt': wcrt,
+            'missed_priorities': [_priority(p) for p in missed_priorities],
+            'mean_response': mean_response,
+            'response_std': response_std,
+        }
+        for name, value in row.items():
+            self.rows[name].append(value)
+        if len(self.rows['run_id']) >= self.batch_rows:
+            self.flush()
+
+    def append_summary(self, summary, missed_priorities):
+        """Append one of the simulators' summary_log rows; WCRT and the response-time mean and
+        standard deviation are optional trailing columns."""
+        taskset_id, taskset_size, preemptions, deadline_misses, data_transfers, utilization, makespan = summary[:7]
+        wcrt, mean_response, response_std = (list(summary[7:10]) + [None] * 3)[:3]
+        self.append(taskset_id, taskset_size, preemptions, deadline_misses, data_transfers,
+                    utilization, makespan, wcrt, missed_priorities, mean_response, response_std)
+
+    def write_sketches(self, sketches):
+        """Save the run's response-time and lateness sketches (quantile_sketch.PrioritySketches)."""
+        os.makedirs(os.path.dirname(self.sketches_path), exist_ok=True)
+        sketches.write(self.sketches_path, run_id=self.run_id, scheduler=self.scheduler,
+                       config_hash=self.config_hash)
+
+    def flush(self):
+        if self.rows['run_id']:
+            self.writer.write_batch(pa.record_batch(self.rows, schema=SUMMARY_SCHEMA))
+            if self.db is not None:
+                self.db.insert_metrics(zip(
+                    self.rows['run_id'], self.rows['taskset_id'], self.rows['preemptions'],
+                    self.rows['deadline_misses'], self.rows['data_transfers'], self.rows['cpu_utilization'],
+                    self.rows['makespan'], self.rows['wcrt'],
+                    [','.join(str(p) for p in priorities) for priorities in self.rows['missed_priorities']],
+                    self.rows['mean_response'], self.rows['response_std'],
+                ))
+            self.rows = {name: [] for name in SUMMARY_SCHEMA.names}
+
+    def close(self):
+        self.flush()
+        self.writer.close()
+        if self.owns_db:
+            self.db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def read_results(root=RESULTS_DIR, scheduler=None, columns=None, filter=None):
+    """Every appended run as one Arrow table; `filter` is a pyarrow.dataset expression."""
+    dataset = ds.dataset(root if scheduler is None else os.path.join(root, scheduler),
+                         format='parquet', schema=SUMMARY_SCHEMA, exclude_invalid_files=True)
+    return dataset.to_table(columns=columns, filter=filter)
+
+
+def read_sketches(root=RESULTS_DIR, scheduler=None, run_ids=None):
+    """Merge the sketches of every saved run (or of `run_ids`) into one PrioritySketches."""
+    merged = PrioritySketches()
+    base = os.path.join(root, 'sketches')
+    if not os.path.isdir(base):
+        return merged
+    for name in [scheduler] if scheduler else sorted(os.listdir(base)):
+        directory = os.path.join(base, name)
+        if not os.path.isdir(directory):
+            continue
+        for filename in sorted(os.listdir(directory)):
+            if run_ids is None or os.path.splitext(filename)[0] in run_ids:
+                merged.merge(PrioritySketches.read(os.path.join(directory, filename)))
+    return merged
+
+
+def export_csv(table, path):
+    """Write results in the old per-script CSV layout."""
+    with open(path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(CSV_HEADER)
+        for row in table.to_pylist():
+            writer.writerow([
+                row['taskset_id'], row['taskset_size'], row['preemptions'], row['deadline_misses'],
+                row['data_transfers'], f"{row['cpu_utilization']:.2f}", _number(row['makespan']), _number(row['wcrt']),
+                ','.join(str(p) for p in row['missed_priorities']),
+            ])
+
+
+if __name__ == "__main__":
+    # python results_store.py export edf ../edf_taskset_summary.csv [run_id]
+    # python results_store.py percentiles edf [run_id ...]
+    if len(sys.argv) >= 4 and sys.argv[1] == 'export':
+        scheduler, target = sys.argv[2], sys.argv[3]
+        run_filter = ds.field('run_id') == sys.argv[4] if len(sys.argv) > 4 else None
+        table = read_results(scheduler=scheduler, filter=run_filter)
+        export_csv(table, target)
+        print(f"✅ Exported {table.num_rows} {scheduler} rows to {target}")
+    elif len(sys.argv) >= 3 and sys.argv[1] == 'percentiles':
+        sketches = read_sketches(scheduler=sys.argv[2], run_ids=set(sys.argv[3:]) or None)
+        for row in sketches.quantile_rows():
+            values = '  '.join(f"{key} {value:8.2f}" for key, value in row.items()
+                               if key.startswith('p') and key != 'priority' and value is not None)
+            print(f"priority {row['priority']!s:<4} {row['metric']:<9} n={row['count']:<8} {values}")
+    else:
+        summary = read_results().group_by(['scheduler', 'config_hash']).aggregate([
+            ('run_id', 'count_distinct'), ('deadline_misses', 'sum'), ('cpu_utilization', 'mean'),
+        ])
+        for row in summary.to_pylist():
+            print(f"{row['scheduler']:<8} {row['config_hash']}  runs: {row['run_id_count_distinct']}  "
+                  f"misses: {row['deadline_misses_sum']}  utilization: {row['cpu_utilization_mean']:.2f}%")
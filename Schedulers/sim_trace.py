@@ -0,0 +1,106 @@
+import struct
+
+# Verbosity levels. open_trace() returns None for TRACE_OFF, so simulators guard every
+# call with `if trace:` and pay nothing when tracing is off.
+TRACE_OFF = 0
+TRACE_EVENTS = 1  # dispatch, preempt, complete, drop, miss
+TRACE_ALL = 2     # plus arrivals
+
+# Event kinds
+TASKSET = 0   # task = taskset size, other = number of cores, value = simulation horizon
+ARRIVAL = 1
+DISPATCH = 2
+PREEMPT = 3   # task = incoming task, other = preempted task
+COMPLETE = 4  # value = deadline
+DROP = 5      # value = priority
+MISS = 6      # value = priority
+EVENT_NAMES = ['taskset', 'arrival', 'dispatch', 'preempt', 'complete', 'drop', 'miss']
+
+# kind, core, taskset, task, other, time, value -- 32 bytes per event
+RECORD = struct.Struct('<Bxhiiidd')
+BUFFER_RECORDS = 65536
+
+
+class Trace:
+    """Typed scheduler events packed into a fixed-size binary buffer.
+
+    With a path, the buffer is flushed to the file whenever it fills. Without one, it is a
+    ring buffer that keeps the most recent `capacity` events in memory.
+    """
+
+    def __init__(self, path=None, level=TRACE_EVENTS, capacity=BUFFER_RECORDS):
+        self.path = path
+        self.level = level
+        self.capacity = capacity
+        self.buffer = bytearray(capacity * RECORD.size)
+        self.next = 0       # next slot to write
+        self.count = 0      # events held in the buffer
+        self.taskset_id = -1
+        self.file = open(path, 'wb') if path is not None else None
+
+    def emit(self, kind, time, task=-1, core=-1, other=-1, value=0.0):
+        RECORD.pack_into(self.buffer, self.next * RECORD.size,
+                         kind, core, self.taskset_id, task, other, time, value)
+        self.next += 1
+        if self.count < self.capacity:
+            self.count += 1
+        if self.next == self.capacity:
+            if self.file is not None:
+                self.flush()
+            else:
+                self.next = 0
+
+    def flush(self):
+        if self.file is not None and self.count:
+            self.file.write(self.buffer[:self.next * RECORD.size])
+            self.next = 0
+            self.count = 0
+
+    def close(self):
+        if self.file is not None:
+            self.flush()
+            self.file.close()
+            self.file = None
+
+    # --- Typed helpers ---
+
+    def taskset(self, taskset_id, size, num_cores, horizon=0):
+        self.taskset_id = taskset_id
+        self.emit(TASKSET, 0, task=size, other=num_cores, value=horizon)
+
+    def arrival(self, time, task):
+        if self.level >= TRACE_ALL:
+            self.emit(ARRIVAL, time, task=task.id, value=task.deadline)
+
+    def dispatch(self, time, core, task):
+        self.emit(DISPATCH, time, task=task.id, core=core, value=task.deadline)
+
+    def preempt(self, time, core, task_in, task_out):
+        self.emit(PREEMPT, time, task=task_in.id, core=core, other=task_out.id, value=task_in.deadline)
+
+    def complete(self, time, core, task):
+        self.emit(COMPLETE, time, task=task.id, core=core, value=task.deadline)
+
+    def drop(self, time, task, priority):
+        self.emit(DROP, time, task=task.id, value=priority)
+
+    def miss(self, time, task, priority):
+        self.emit(MISS, time, task=task.id, value=priority)
+
+    def records(self):
+        """Events still held in memory, oldest first."""
+        start = self.next - self.count if self.file is not None else (self.next - self.count) % self.capacity
+        for i in range(self.count):
+            yield RECORD.unpack_from(self.buffer, ((start + i) % self.capacity) * RECORD.size)
+
+
+def open_trace(path=None, level=TRACE_EVENTS, capacity=BUFFER_RECORDS):
+    if level <= TRACE_OFF:
+        return None
+    return Trace(path, level, capacity)
+
+
+def read_trace(path):
+    with open(path, 'rb') as f:
+        data = f.read()
+    return RECORD.iter_unpack(data[:len(data) - len(data) % RECORD.size])
@@ -0,0 +1,130 @@
+import os
+import sys
+import numpy as np
+from taskset_store import TasksetStore, CATALOG_FILE, load_tasksets
+
+# One record per taskset, saved as catalog.npy inside the store directory; TasksetWriter removes it
+CATALOG_DTYPE = np.dtype([
+    ('size', '<i8'),
+    ('utilization', '<f8'),   # total burst time over the window [min arrival, max deadline]
+    ('tightness', '<f8'),     # mean (deadline - arrival) / burst, as in "deadline tightness 0.50"
+    ('arrival_span', '<f8'),  # max arrival - min arrival
+    ('seed', '<i8'),          # generator block, -1 when unknown; meta.json sources hold each append's root entropy
+])
+
+
+def _reduce(ufunc, values, starts, nonempty):
+    # reduceat misbehaves on empty segments, so only reduce the non-empty ones
+    out = np.zeros(len(starts), dtype=np.float64)
+    if nonempty.any():
+        out[nonempty] = ufunc.reduceat(values, starts[nonempty])
+    return out
+
+
+def build_catalog(store):
+    """Per-taskset metadata computed in bulk from the store columns."""
+    return _build(store.offsets, store.columns, store.seeds)
+
+
+def _build(offsets, columns, seeds):
+    offsets = np.asarray(offsets)
+    sizes = np.diff(offsets)
+    starts = offsets[:-1]
+    nonempty = sizes > 0
+
+    arrival = np.asarray(columns['arrival_time'], dtype=np.float64)
+    burst = np.asarray(columns['burst_time'], dtype=np.float64)
+    deadline = np.asarray(columns['deadline'], dtype=np.float64)
+    ratio = (deadline - arrival) / np.where(burst > 0, burst, 1)
+
+    first_arrival = _reduce(np.minimum, arrival, starts, nonempty)
+    window = _reduce(np.maximum, deadline, starts, nonempty) - first_arrival
+
+    catalog = np.zeros(len(sizes), dtype=CATALOG_DTYPE)
+    catalog['size'] = sizes
+    catalog['utilization'] = _reduce(np.add, burst, starts, nonempty) / np.maximum(window, 1)
+    catalog['tightness'] = _reduce(np.add, ratio, starts, nonempty) / np.maximum(sizes, 1)
+    catalog['arrival_span'] = _reduce(np.maximum, arrival, starts, nonempty) - first_arrival
+    catalog['seed'] = seeds
+    return catalog
+
+
+class Catalog:
+    """Queryable index over a taskset store; only matching tasksets are ever materialized."""
+
+    def __init__(self, store):
+        self.store = store if isinstance(store, TasksetStore) else TasksetStore(store)
+        path = os.path.join(self.store.path, CATALOG_FILE)
+
+        records = np.load(path, mmap_mode='r') if os.path.exists(path) else None
+        if records is None or len(records) != len(self.store):
+            # Missing: TasksetWriter removes it whenever it rewrites or appends to the store
+            np.save(path, build_catalog(self.store))
+            records = np.load(path, mmap_mode='r')
+        self.records = records
+
+    def __len__(self):
+        return len(self.records)
+
+    def __getitem__(self, index):
+        record = self.records[index]
+        return {name: record[name].item() for name in CATALOG_DTYPE.names}
+
+    def select(self, **ranges):
+        """Indices of tasksets whose fields fall in the given inclusive (low, high) ranges.
+
+        catalog.select(tightness=(0.8, None), size=(None, 20))
+        """
+        mask = np.ones(len(self.records), dtype=bool)
+        for name, (low, high) in ranges.items():
+            if name not in CATALOG_DTYPE.names:
+                raise KeyError(f'unknown catalog field {name!r}')
+            if low is not None:
+                mask &= self.records[name] >= low
+            if high is not None:
+                mask &= self.records[name] <= high
+        return np.flatnonzero(mask)
+
+    def iter_select(self, **ranges):
+        for index in self.select(**ranges):
+            yield int(index), self.store[int(index)]
+
+
+def load_catalog(name):
+    tasksets = load_tasksets(name)
+    if not isinstance(tasksets, TasksetStore):
+        raise FileNotFoundError(f'{name} has no taskset store; convert it with taskset_store.py first')
+    return Catalog(tasksets)
+
+
+def catalog_records(name):
+    """Catalog records for a generated module name; computed from the module's tasks when it has no store."""
+    tasksets = load_tasksets(name)
+    if isinstance(tasksets, TasksetStore):
+        return Catalog(tasksets).records
+    offsets = np.concatenate(([0], np.cumsum([len(taskset) for taskset in tasksets])))
+    tasks = [task for taskset in tasksets for task in taskset]
+    columns = {name: [getattr(task, name) for task in tasks] for name in ('arrival_time', 'burst_time', 'deadline')}
+    return _build(offsets, columns, np.full(len(tasksets), -1))
+
+
+def _parse_range(text):
+    # "0.8:" -> (0.8, None), ":20" -> (None, 20), "0.5:0.9" -> (0.5, 0.9)
+    low, _, high = text.partition(':')
+    return (float(low) if low else None, float(high) if high else None)
+
+
+if __name__ == "__main__":
+    # python taskset_catalog.py aperiodic_task_sets tightness=0.8: size=:20
+    catalog = load_catalog(sys.argv[1])
+    ranges = {}
+    for arg in sys.argv[2:]:
+        name, _, text = arg.partition('=')
+        ranges[name] = _parse_range(text)
+
+    matches = catalog.select(**ranges)
+    print(f"{len(matches)} of {len(catalog)} tasksets match")
+    for index in matches:
+        record = catalog[int(index)]
+        print(f"Taskset {index}: size {record['size']}, utilization {record['utilization']:.2f}, "
+              f"tightness {record['tightness']:.2f}, arrival span {record['arrival_span']:g}, seed {record['seed']}")
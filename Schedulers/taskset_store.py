@@ -0,0 +1,222 @@
+import os
+import sys
+import json
+import importlib
+import numpy as np
+# Build tasks from the class the generated modules import, so a store and the module it
+# was converted from give the schedulers the same Task objects (and the same patches).
+from Schedulers.taskset import Task
+
+# Binary columnar taskset store: a directory holding one raw little-endian file per task
+# column, an offsets file (taskset i is rows offsets[i]:offsets[i + 1]), the generator
+# seed of every taskset (-1 when unknown) and meta.json.
+COLUMNS = ['id', 'arrival_time', 'burst_time', 'deadline', 'priority']
+STORE_SUFFIX = '.tasks'
+STORE_VERSION = 1
+# Per-taskset index kept next to the columns by taskset_catalog
+CATALOG_FILE = 'catalog.npy'
+
+
+def _column_path(path, name):
+    return os.path.join(path, f'{name}.bin')
+
+
+def _as_row(task):
+    if hasattr(task, 'arrival_time'):
+        return (task.id, task.arrival_time, task.burst_time, task.deadline, task.priority)
+    return tuple(task)
+
+
+def _infer_dtype(values):
+    # Integer columns stay integers so materialized tasks look like the generated ones
+    if all(float(v).is_integer() for v in values):
+        return '<i8'
+    return '<f8'
+
+
+def _column_bytes(name, values, dtype):
+    values = np.asarray(values)
+    if np.dtype(dtype).kind == 'i' and values.dtype.kind == 'f' and np.any(values != np.trunc(values)):
+        raise ValueError(f"{name} holds non-integer values but the store column is {dtype}")
+    return values.astype(dtype).tobytes()
+
+
+class TasksetStore:
+    """Read-only view of a store; tasksets are built into Task objects only when accessed."""
+
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, 'meta.json')) as f:
+            self.meta = json.load(f)
+        self.num_tasksets = self.meta['num_tasksets']
+        self.num_tasks = self.meta['num_tasks']
+        self.offsets = self._map('offsets', '<i8', self.num_tasksets + 1)
+        self.columns = {
+            name: self._map(name, self.meta['columns'][name], self.num_tasks)
+            for name in COLUMNS
+        }
+        self.seeds = self._map('seed', '<i8', self.num_tasksets)
+        # How each run of appended tasksets was generated, oldest first (see TasksetWriter.add_source)
+        self.sources = self.meta.get('sources', [])
+
+    def source(self, index):
+        """The generator record the taskset at `index` was appended under, or None."""
+        found = None
+        for source in self.sources:
+            if source['first_taskset'] <= index:
+                found = source
+        return found
+
+    def _map(self, name, dtype, length):
+        if length == 0:
+            return np.zeros(0, dtype=dtype)
+        return np.memmap(_column_path(self.path, name), dtype=dtype, mode='r', shape=(length,))
+
+    def __len__(self):
+        return self.num_tasksets
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += self.num_tasksets
+        if not 0 <= index < self.num_tasksets:
+            raise IndexError(f'taskset {index} out of range')
+        start, end = int(self.offsets[index]), int(self.offsets[index + 1])
+        rows = zip(*(self.columns[name][start:end].tolist() for name in COLUMNS))
+        return [Task(*row) for row in rows]
+
+    def __iter__(self):
+        for index in range(self.num_tasksets):
+            yield self[index]
+
+    def sizes(self):
+        return np.diff(self.offsets)
+
+
+class TasksetWriter:
+    """Appends tasksets to a store; meta.json is rewritten on close().
+
+    Values are never truncated: writing a non-integral value into an integer column raises
+    ValueError.
+    """
+
+    def __init__(self, path, dtypes=None, append=False):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+        meta_path = os.path.join(path, 'meta.json')
+
+        if append and os.path.exists(meta_path):
+            with open(meta_path) as f:
+                meta = json.load(f)
+            self.dtypes = meta['columns']
+            self.num_tasksets = meta['num_tasksets']
+            self.num_tasks = meta['num_tasks']
+            self.sources = meta.get('sources', [])
+            mode = 'ab'
+        else:
+            # Without explicit dtypes the first batch written decides them
+            self.dtypes = dict(dtypes) if dtypes else None
+            self.num_tasksets = 0
+            self.num_tasks = 0
+            self.sources = []
+            mode = 'wb'
+
+        # The catalog describes the old contents; taskset_catalog rebuilds it on next use
+        if os.path.exists(os.path.join(path, CATALOG_FILE)):
+            os.remove(os.path.join(path, CATALOG_FILE))
+
+        self.files = {name: open(_column_path(path, name), mode) for name in COLUMNS}
+        self.offsets = open(_column_path(path, 'offsets'), mode)
+        self.seeds = open(_column_path(path, 'seed'), mode)
+        if mode == 'wb':
+            self.offsets.write(np.zeros(1, dtype='<i8').tobytes())
+
+    def add_source(self, **source):
+        """Record how the tasksets appended from now on are generated; kept in meta.json."""
+        self.sources.append(dict(source, first_taskset=self.num_tasksets))
+
+    def append(self, taskset, seed=-1):
+        rows = [_as_row(task) for task in taskset]
+        columns = list(zip(*rows)) if rows else [()] * len(COLUMNS)
+        self.append_columns(dict(zip(COLUMNS, columns)), [len(rows)], seeds=[seed])
+
+    def append_columns(self, columns, sizes, seeds=None):
+        """Bulk append: columns hold every task of the batch, sizes the task count per taskset."""
+        if self.dtypes is None:
+            self.dtypes = {name: _infer_dtype(np.asarray(columns[name]).ravel()) for name in COLUMNS}
+        for name in COLUMNS:
+            self.files[name].write(_column_bytes(name, columns[name], self.dtypes[name]))
+        if seeds is None:
+            seeds = np.full(len(sizes), -1)
+        self.seeds.write(np.asarray(seeds, dtype='<i8').tobytes())
+        ends = self.num_tasks + np.cumsum(np.asarray(sizes, dtype='<i8'))
+        self.offsets.write(ends.astype('<i8').tobytes())
+        self.num_tasksets += len(sizes)
+        if len(ends):
+            self.num_tasks = int(ends[-1])
+
+    def close(self):
+        for f in self.files.values():
+            f.close()
+        self.offsets.close()
+        self.seeds.close()
+        meta = {
+            'version': STORE_VERSION,
+            'num_tasksets': self.num_tasksets,
+            'num_tasks': self.num_tasks,
+            'columns': self.dtypes or {name: '<i8' for name in COLUMNS},
+            'sources': self.sources,
+        }
+        with open(os.path.join(self.path, 'meta.json'), 'w') as f:
+            json.dump(meta, f, indent=2)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def save_tasksets(tasksets, path, seeds=None):
+    """Write a list of tasksets (Task objects or (id, arrival, burst, deadline, priority) tuples)."""
+    rows = [[_as_row(task) for task in taskset] for taskset in tasksets]
+    flat = [row for taskset in rows for row in taskset]
+    dtypes = {name: _infer_dtype([row[i] for row in flat]) for i, name in enumerate(COLUMNS)}
+
+    with TasksetWriter(path, dtypes=dtypes) as writer:
+        for index, taskset in enumerate(rows):
+            writer.append(taskset, seed=-1 if seeds is None else seeds[index])
+    return path
+
+
+def write_tasksets(tasksets, path, dtypes=None):
+    """Stream any iterable of tasksets into a store without holding more than one in memory.
+
+    Without dtypes, column types come from the first taskset; a later non-integral value in an
+    integer column raises ValueError.
+    """
+    count = 0
+    with TasksetWriter(path, dtypes=dtypes) as writer:
+        for taskset in tasksets:
+            writer.append(taskset)
+            count += 1
+    return count
+
+
+def store_path(name):
+    return os.path.join(os.path.dirname(os.path.abspath(__file__)), name + STORE_SUFFIX)
+
+
+def load_tasksets(name):
+    """Tasksets for a generated module name, read from its store when one exists."""
+    path = store_path(name)
+    if os.path.isdir(path):
+        return TasksetStore(path)
+    return importlib.import_module(name).tasks
+
+
+if __name__ == "__main__":
+    # Convert generated modules: python taskset_store.py aperiodic_task_sets random_taskset_for_training
+    for module_name in sys.argv[1:]:
+        module = importlib.import_module(module_name)
+        target = save_tasksets(module.tasks, store_path(module_name))
+        print(f"✅ Saved {len(module.tasks)} tasksets from {module_name} to {target}")
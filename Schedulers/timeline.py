@@ -0,0 +1,103 @@
+import math
+import struct
+from array import array
+
+# taskset, core, task, start, end, completion -- one record per segment in a timeline file
+SEGMENT = struct.Struct('<iiiddd')
+IDLE = -1
+# Completion of a segment that ended in a preemption, a drop or the end of the simulation
+NOT_COMPLETED = math.nan
+
+
+class Timeline:
+    """Run-length encoded core occupancy.
+
+    Instead of one entry per core per tick, a segment (core, task, start, end) is stored
+    each time a core changes what it runs, so memory grows with context switches only.
+    Segments cover [start, end) in ticks; idle stretches are not stored. A segment that
+    ended because its task finished also keeps the completion time the simulator reports
+    (the last tick it ran, end - 1); the others keep NOT_COMPLETED.
+    """
+
+    def __init__(self, num_cores):
+        self.num_cores = num_cores
+        self.running = [IDLE] * num_cores
+        self.started = [0] * num_cores
+        self.current = [None] * num_cores
+        self.cores = array('i')
+        self.tasks = array('i')
+        self.starts = array('d')
+        self.ends = array('d')
+        self.completions = array('d')
+
+    def _close(self, core, now):
+        if self.running[core] != IDLE and now > self.started[core]:
+            # The task last ran during tick now - 1; it left the core then if it finished
+            completion = now - 1 if self.current[core].remaining_time <= 0 else NOT_COMPLETED
+            self.add(core, self.running[core], self.started[core], now, completion)
+
+    def observe(self, now, cores):
+        """Record what each core runs during tick `now` (call after assignment, before execution)."""
+        for core, task in enumerate(cores):
+            task_id = task.id if task is not None else IDLE
+            if task_id != self.running[core]:
+                self._close(core, now)
+                self.running[core] = task_id
+                self.started[core] = now
+                self.current[core] = task
+
+    def add(self, core, task_id, start, end, completion=NOT_COMPLETED):
+        # Event-driven simulators already know whole segments
+        self.cores.append(core)
+        self.tasks.append(task_id)
+        self.starts.append(start)
+        self.ends.append(end)
+        self.completions.append(completion)
+        return len(self.cores) - 1
+
+    def complete(self, index, completion):
+        """Mark segment `index` (as returned by add()) as ended by its task finishing."""
+        self.completions[index] = completion
+
+    def close(self, now):
+        """Close the segments still open at the end of the simulation."""
+        for core in range(self.num_cores):
+            self._close(core, now)
+            self.running[core] = IDLE
+            self.current[core] = None
+
+    def segments(self):
+        return zip(self.cores, self.tasks, self.starts, self.ends, self.completions)
+
+    def segment_count(self):
+        return len(self.cores)
+
+    # --- Metrics straight from the segments ---
+
+    def busy_time(self):
+        return sum(end - start for start, end in zip(self.starts, self.ends))
+
+    def utilization(self, horizon):
+        return (self.busy_time() / (horizon * self.num_cores)) * 100 if horizon > 0 else 0
+
+    def makespan(self):
+        """Latest completion, as in the simulators' summaries; 0 when nothing finished."""
+        return max((c for c in self.completions if not math.isnan(c)), default=0)
+
+    def context_switches(self):
+        return len(self.cores)
+
+    def write(self, f, taskset_id):
+        for core, task, start, end, completion in self.segments():
+            f.write(SEGMENT.pack(taskset_id, core, task, start, end, completion))
+
+
+def read_timelines(path, num_cores):
+    """Timelines keyed by taskset id from a file written with Timeline.write()."""
+    timelines = {}
+    with open(path, 'rb') as f:
+        data = f.read()
+    records = SEGMENT.iter_unpack(data[:len(data) - len(data) % SEGMENT.size])
+    for taskset_id, core, task, start, end, completion in records:
+        timelines.setdefault(taskset_id, Timeline(num_cores)).add(core, task, start, end, completion)
+    return timelines
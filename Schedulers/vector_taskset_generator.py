@@ -0,0 +1,125 @@
+import itertools
+import numpy as np
+from taskset import Task
+from taskset_store import COLUMNS, TasksetWriter, store_path
+
+# Defaults follow generate_random_taskset_for_training.py
+HORIZON = 40
+SIZE_RANGE = (4, 10)
+UTILIZATION = 1.0
+TIGHTNESS_RANGE = (1.2, 3.0)
+PRIORITY_RANGE = (1, 5)
+# Tasksets drawn from one SeedSequence stream; creating a generator per taskset costs
+# about as much as drawing a whole block, so streams are per block
+BLOCK_SIZE = 1024
+
+
+def uunifast(rng, sizes, utilization):
+    """UUniFast split of `utilization` into sizes[i] shares for every taskset at once.
+
+    Returns the flattened shares; each taskset's shares sum to its target utilization.
+    """
+    sizes = np.asarray(sizes, dtype=np.int64)
+    utilization = np.broadcast_to(np.asarray(utilization, dtype=np.float64), sizes.shape)
+    width = int(sizes.max(initial=1))
+
+    # sum_{i+1} = sum_i * r^(1 / (n - i)), done column by column over every taskset
+    remaining = utilization.copy()
+    shares = np.zeros((len(sizes), width))
+    for i in range(width - 1):
+        exponent = 1.0 / np.maximum(sizes - i - 1, 1)
+        next_remaining = remaining * rng.random(len(sizes)) ** exponent
+        active = i < sizes - 1
+        shares[:, i] = np.where(active, remaining - next_remaining, 0)
+        remaining = np.where(active, next_remaining, remaining)
+    shares[np.arange(len(sizes)), sizes - 1] = remaining
+
+    mask = np.arange(width) < sizes[:, None]
+    return shares[mask]
+
+
+def generate_columns(rng, num_tasksets, size_range=SIZE_RANGE, utilization=UTILIZATION,
+                     tightness_range=TIGHTNESS_RANGE, horizon=HORIZON, priority_range=PRIORITY_RANGE):
+    """Draw `num_tasksets` tasksets from one generator; returns (columns, sizes).
+
+    Burst times are the UUniFast shares of `utilization` times `horizon`, relative deadlines
+    are burst * tightness and every task arrives early enough to meet its deadline in the horizon.
+    """
+    sizes = rng.integers(size_range[0], size_range[1] + 1, size=num_tasksets)
+    n = int(sizes.sum())
+
+    burst = np.maximum(np.rint(uunifast(rng, sizes, utilization) * horizon), 1).astype(np.int64)
+    tightness = rng.uniform(tightness_range[0], tightness_range[1], size=n)
+    relative_deadline = np.maximum(np.ceil(burst * tightness), 1).astype(np.int64)
+    latest_arrival = np.maximum(horizon - relative_deadline, 0)
+    arrival = np.floor(rng.random(n) * (latest_arrival + 1)).astype(np.int64)
+
+    starts = np.repeat(np.cumsum(sizes) - sizes, sizes)
+    columns = {
+        'id': np.arange(n) - starts + 1,
+        'arrival_time': arrival,
+        'burst_time': burst,
+        'deadline': arrival + relative_deadline,
+        'priority': rng.integers(priority_range[0], priority_range[1] + 1, size=n),
+    }
+    return columns, sizes
+
+
+def block_rng(entropy, block):
+    # Block b is SeedSequence child (b,) of the root, independent of how many were spawned before
+    return np.random.default_rng(np.random.SeedSequence(entropy, spawn_key=(block,)))
+
+
+def generate_blocks(start_block=0, stop_block=None, seed=None, **params):
+    """Yield (block, columns, sizes) for blocks start_block..stop_block-1 of the sequence rooted at `seed`.
+
+    Each block of BLOCK_SIZE tasksets is drawn in bulk from its own stream, so block b is the
+    same whatever order or process generates it. With stop_block=None the stream never ends.
+    """
+    entropy = np.random.SeedSequence(seed).entropy
+    blocks = itertools.count(start_block) if stop_block is None else range(start_block, stop_block)
+    for block in blocks:
+        columns, sizes = generate_columns(block_rng(entropy, block), BLOCK_SIZE, **params)
+        yield block, columns, sizes
+
+
+def stream_tasksets(seed=None, start_block=0, stop_block=None, **params):
+    """Lazily yield tasksets as lists of Task; only the current block is ever held in memory."""
+    for block, columns, sizes in generate_blocks(start_block, stop_block, seed, **params):
+        rows = zip(*(columns[name].tolist() for name in COLUMNS))
+        for size in sizes.tolist():
+            yield [Task(*row) for row in itertools.islice(rows, size)]
+
+
+def generate_tasksets(num_blocks, path, seed=None, start_block=0, append=False, **params):
+    """Write blocks start_block..start_block+num_blocks-1 straight into a taskset store.
+
+    Parallel workers can each take a range of blocks (start_block) and reproduce exactly the
+    tasksets a single run would. The catalog seed column records each taskset's block and the
+    store's meta.json records the root entropy and parameters of every append, so any stored
+    taskset can be drawn again with regenerate().
+    """
+    entropy = np.random.SeedSequence(seed).entropy
+    with TasksetWriter(path, append=append) as writer:
+        writer.add_source(generator='vector_taskset_generator', entropy=entropy, start_block=start_block,
+                          num_blocks=num_blocks, block_size=BLOCK_SIZE, params=params)
+        for block, columns, sizes in generate_blocks(start_block, start_block + num_blocks, entropy, **params):
+            writer.append_columns(columns, sizes, seeds=np.full(len(sizes), block))
+    return entropy
+
+
+def regenerate(store, index):
+    """Draw the taskset at `index` of a store written by generate_tasksets() again."""
+    source = store.source(index)
+    block = int(store.seeds[index])
+    position = index - source['first_taskset'] - (block - source['start_block']) * source['block_size']
+    _, columns, sizes = next(generate_blocks(block, block + 1, source['entropy'], **source['params']))
+    start = int(sizes[:position].sum())
+    rows = zip(*(columns[name][start:start + sizes[position]].tolist() for name in COLUMNS))
+    return [Task(*row) for row in rows]
+
+
+if __name__ == "__main__":
+    # About a million tasks: 150 blocks of 1024 tasksets with 4-10 tasks each
+    entropy = generate_tasksets(150, store_path('random_taskset'), utilization=1.5)
+    print(f"✅ Saved {150 * BLOCK_SIZE} tasksets to {store_path('random_taskset')} (root seed {entropy})")